@@ -0,0 +1,114 @@
+"""
+Admission control for consultation runs.
+
+A run is admitted before any LLM call is made, by reserving:
+- one unit of the user's quota (`consultations_limit`, -1 = unlimited), held
+  as pending until the run completes, so parallel requests cannot overspend;
+- one running slot for the user (cap per subscription);
+- one slot of the server-wide cap. Free/starter runs may only use the slots
+  not kept back for paid plans (`reserved_paid_slots`).
+
+On success the reservation is committed (`consultations_used` += 1); on
+failure or cancellation it is released and nothing is charged. Rejections for
+capacity carry a Retry-After estimate from recent run durations.
+
+All state lives on the event loop thread, so reserve/commit/release are
+atomic without locks (there is no await between check and update).
+"""
+import math
+import time
+from typing import Dict, List, Optional
+
+UNLIMITED = -1
+PAID_PLANS = {"pro", "enterprise"}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Reservation:
+    __slots__ = ("user_id", "started", "done")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.started = time.monotonic()
+        self.done = False
+
+
+class AdmissionController:
+    def __init__(
+            self,
+            user_concurrency: Dict[str, int],
+            max_running: int = 8,
+            reserved_paid_slots: int = 2,
+            default_run_seconds: float = 60.0,
+    ):
+        self.user_concurrency = user_concurrency
+        self.max_running = max(1, max_running)
+        self.reserved_paid_slots = max(0, min(reserved_paid_slots, self.max_running - 1))
+        self._running: Dict[str, List[Reservation]] = {}
+        self._total = 0
+        # Exponential moving average of completed run durations (Retry-After estimates)
+        self._avg_run_seconds = default_run_seconds
+
+    @property
+    def running(self) -> int:
+        return self._total
+
+    def reserve(self, user: dict) -> Reservation:
+        """Admit one run for `user` or raise AdmissionRejected (403 quota, 429 capacity)."""
+        user_id = user["id"]
+        plan = (user.get("subscription") or "free").lower()
+        mine = self._running.get(user_id, [])
+
+        limit = int(user.get("consultations_limit", 0))
+        if limit != UNLIMITED and int(user.get("consultations_used", 0)) + len(mine) >= limit:
+            raise AdmissionRejected(403, "Consultation limit reached for your plan. Upgrade to run more consultations.")
+
+        if len(mine) >= self.user_concurrency.get(plan, 1):
+            raise AdmissionRejected(
+                429, "Too many consultations running; wait for one to finish.", self._retry_after(mine),
+            )
+
+        capacity = self.max_running if plan in PAID_PLANS else self.max_running - self.reserved_paid_slots
+        if self._total >= capacity:
+            oldest = [r for runs in self._running.values() for r in runs]
+            raise AdmissionRejected(429, "The service is busy; please retry shortly.", self._retry_after(oldest))
+
+        reservation = Reservation(user_id)
+        self._running.setdefault(user_id, []).append(reservation)
+        self._total += 1
+        return reservation
+
+    def commit(self, reservation: Reservation, user: dict) -> None:
+        """The run completed: charge the quota and free the slot."""
+        if self._free(reservation):
+            user["consultations_used"] = int(user.get("consultations_used", 0)) + 1
+            elapsed = time.monotonic() - reservation.started
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+
+    def release(self, reservation: Reservation) -> None:
+        """The run failed or was cancelled: free the slot without charging. No-op after commit."""
+        self._free(reservation)
+
+    def _free(self, reservation: Reservation) -> bool:
+        if reservation.done:
+            return False
+        reservation.done = True
+        runs = self._running.get(reservation.user_id, [])
+        runs.remove(reservation)
+        if not runs:
+            self._running.pop(reservation.user_id, None)
+        self._total -= 1
+        return True
+
+    def _retry_after(self, running: List[Reservation]) -> int:
+        """Seconds until the oldest of `running` is expected to finish."""
+        now = time.monotonic()
+        elapsed = max((now - r.started for r in running), default=0.0)
+        return max(1, math.ceil(self._avg_run_seconds - elapsed))
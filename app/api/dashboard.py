@@ -0,0 +1,129 @@
+"""
+Per-user dashboard aggregates, maintained incrementally.
+
+The dashboard needs counts by status, the average processing time, the
+rating distribution, the newest consultations and recent activity. Instead of
+scanning every consultation on each load, `DashboardStats.track()` is called
+whenever a consultation is created or changes state (completed, cancelled,
+failed, feedback) and `forget()` when it is deleted. Each call diffs a tiny
+per-consultation snapshot (status, processing time, rating) against the one
+it replaces and adjusts the user's counters, so `summary()` is O(1) in the
+number of consultations.
+
+Newest-first ids are kept in a sorted list (ids are time-ordered ULIDs, so
+inserts are appends) and recent activity in a bounded deque. All state lives
+on the event loop thread.
+"""
+import bisect
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+STATUSES = ("processing", "completed", "failed", "cancelled")
+RATINGS = (1, 2, 3, 4, 5)
+ACTIVITY_LIMIT = 20
+
+
+class _UserStats:
+    __slots__ = ("by_status", "processing_seconds", "processed", "ratings", "ids", "activity")
+
+    def __init__(self, activity_limit: int = ACTIVITY_LIMIT):
+        self.by_status: Dict[str, int] = dict.fromkeys(STATUSES, 0)
+        self.processing_seconds = 0  # summed over completed consultations
+        self.processed = 0
+        self.ratings: Dict[int, int] = dict.fromkeys(RATINGS, 0)
+        self.ids: List[str] = []  # sorted, oldest first
+        self.activity: deque = deque(maxlen=activity_limit)
+
+    def apply(self, snapshot: Tuple[str, Optional[int], Optional[int]], sign: int) -> None:
+        status, processing_time, rating = snapshot
+        self.by_status[status] = self.by_status.get(status, 0) + sign
+        if status == "completed" and processing_time is not None:
+            self.processing_seconds += sign * processing_time
+            self.processed += sign
+        if rating in self.ratings:
+            self.ratings[rating] += sign
+
+
+def _snapshot(consultation) -> Tuple[str, Optional[int], Optional[int]]:
+    feedback = consultation.get("feedback")
+    return (
+        consultation.get("status") or "processing",
+        consultation.get("processing_time"),
+        feedback.get("rating") if feedback else None,
+    )
+
+
+class DashboardStats:
+    def __init__(self, activity_limit: int = ACTIVITY_LIMIT):
+        self.activity_limit = activity_limit
+        self._users: Dict[str, _UserStats] = {}
+        # consultation id -> (user id, snapshot last counted)
+        self._tracked: Dict[str, Tuple[str, Tuple[str, Optional[int], Optional[int]]]] = {}
+
+    def _user(self, user_id: str) -> _UserStats:
+        stats = self._users.get(user_id)
+        if stats is None:
+            stats = self._users[user_id] = _UserStats(self.activity_limit)
+        return stats
+
+    def track(self, consultation, event: Optional[str] = None) -> None:
+        """Count the consultation's current state; `event` ("created", "completed", ...) is added to activity."""
+        consultation_id, user_id = consultation["id"], consultation["user_id"]
+        stats = self._user(user_id)
+        snapshot = _snapshot(consultation)
+        previous = self._tracked.get(consultation_id)
+        if previous is None:
+            bisect.insort(stats.ids, consultation_id)
+        elif previous[1] == snapshot and event is None:
+            return
+        else:
+            stats.apply(previous[1], -1)
+        stats.apply(snapshot, +1)
+        self._tracked[consultation_id] = (user_id, snapshot)
+        if event is not None:
+            stats.activity.append({
+                "type": event,
+                "consultation_id": consultation_id,
+                "business_name": consultation.get("business_name"),
+                "status": snapshot[0],
+                "at": datetime.utcnow().isoformat() + "Z",
+            })
+
+    def forget(self, consultation_id: str) -> None:
+        tracked = self._tracked.pop(consultation_id, None)
+        if tracked is None:
+            return
+        user_id, snapshot = tracked
+        stats = self._users[user_id]
+        stats.apply(snapshot, -1)
+        i = bisect.bisect_left(stats.ids, consultation_id)
+        if i < len(stats.ids) and stats.ids[i] == consultation_id:
+            del stats.ids[i]
+        # Activity links to the consultation; drop them with it (bounded by activity_limit)
+        kept = [a for a in stats.activity if a["consultation_id"] != consultation_id]
+        if len(kept) != len(stats.activity):
+            stats.activity.clear()
+            stats.activity.extend(kept)
+
+    def recent_ids(self, user_id: str, limit: int) -> List[str]:
+        """Newest `limit` consultation ids of the user, newest first."""
+        stats = self._users.get(user_id)
+        return stats.ids[:-limit - 1:-1] if stats and limit > 0 else []
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        stats = self._users.get(user_id) or _UserStats()
+        rated = sum(stats.ratings.values())
+        return {
+            "consultations": {"total": len(stats.ids), "by_status": dict(stats.by_status)},
+            "processing_time": {
+                "completed": stats.processed,
+                "average_seconds": round(stats.processing_seconds / stats.processed, 1) if stats.processed else None,
+            },
+            "ratings": {
+                "count": rated,
+                "average": round(sum(r * n for r, n in stats.ratings.items()) / rated, 2) if rated else None,
+                "distribution": {str(r): n for r, n in stats.ratings.items()},
+            },
+            "recent_activity": list(reversed(stats.activity)),
+        }
@@ -0,0 +1,76 @@
+"""
+Pre-rendered Plotly figures for consultations.
+
+Wraps the sandboxed FigureRenderer with an async API, a per-consultation cache
+keyed by (consultation_id, hash of visualization_code) and de-duplication of
+concurrent renders. Failures are cached too, so broken code is not re-run on
+every request.
+"""
+import asyncio
+import hashlib
+from typing import Dict, Optional
+
+from src.utils.cache import LRUCache
+from src.utils.figure_sandbox import FigureRenderer, UnsafeCodeError
+
+
+class FigureService:
+    def __init__(self, renderer: FigureRenderer, cache_bytes: int = 32 * 1024 * 1024):
+        self.renderer = renderer
+        # value: {"figure": json} or {"error": message}
+        self.cache = LRUCache(
+            maxsize=10_000,
+            max_weight=cache_bytes,
+            weigher=lambda v: len(v.get("figure") or v.get("error") or ""),
+        )
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._background: set = set()
+
+    @staticmethod
+    def _key(consultation: dict) -> Optional[tuple]:
+        code = consultation.get("visualization_code") or ""
+        if not code.strip() or code.lstrip().startswith("# No valid strategy"):
+            return None
+        return consultation["id"], hashlib.sha256(code.encode("utf-8")).hexdigest()[:16]
+
+    async def get(self, consultation: dict) -> Optional[dict]:
+        """Rendered result for the consultation's code, or None if it has no code."""
+        key = self._key(consultation)
+        if key is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                figure = await asyncio.to_thread(self.renderer.render, consultation["visualization_code"])
+                result = {"figure": figure}
+            except UnsafeCodeError as e:
+                result = {"error": f"rejected: {e}"}
+            except RuntimeError as e:
+                result = {"error": str(e)}
+            self.cache.set(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def prerender(self, consultation: dict) -> None:
+        """Render in the background right after a consultation completes."""
+        if self._key(consultation) is None:
+            return
+        task = asyncio.create_task(self.get(dict(consultation)))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def discard(self, consultation_id: str) -> None:
+        self.cache.discard_where(lambda key: key[0] == consultation_id)
@@ -0,0 +1,91 @@
+"""
+Idempotency keys for `POST /api/consultations`.
+
+A client sends `Idempotency-Key: <opaque string>` and may retry the same
+request as often as it likes (proxy timeout, flaky network); only the first
+one runs the graph. Keys are scoped per user and remembered for `ttl_seconds`
+after the run completes:
+- retry while the run is in flight -> waits for that run and gets its result;
+- retry after completion -> the stored consultation, without a new run;
+- same key, different request body -> 422 (a key names one request).
+A run that fails or is cancelled releases its key, so a later retry starts over.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMismatch(ValueError):
+    """The key was already used with a different request body."""
+
+
+class IdempotencyEntry:
+    __slots__ = ("fingerprint", "consultation_id", "done", "status_code", "detail", "expires")
+
+    def __init__(self, fingerprint: str, consultation_id: str):
+        self.fingerprint = fingerprint
+        self.consultation_id = consultation_id
+        self.done = asyncio.Event()
+        # Set for runs that ended in an error (replayed to attached retries)
+        self.status_code: Optional[int] = None
+        self.detail: Optional[str] = None
+        self.expires: Optional[float] = None  # None while in flight
+
+    @property
+    def failed(self) -> bool:
+        return self.status_code is not None
+
+
+def request_fingerprint(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float = 24 * 3600):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str], IdempotencyEntry] = {}
+        self._next_sweep = 0.0
+
+    def begin(self, user_id: str, key: str, fingerprint: str, consultation_id: str) -> Tuple[IdempotencyEntry, bool]:
+        """
+        Claim `key` for a new run, or return the entry already holding it.
+        Returns (entry, created); raises IdempotencyMismatch if the key was used for another body.
+        """
+        self._sweep()
+        entry = self._entries.get((user_id, key))
+        if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+            entry = None
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyMismatch("Idempotency-Key was already used with a different request")
+            return entry, False
+        entry = self._entries[(user_id, key)] = IdempotencyEntry(fingerprint, consultation_id)
+        return entry, True
+
+    def complete(self, entry: IdempotencyEntry) -> None:
+        entry.expires = time.monotonic() + self.ttl_seconds
+        entry.done.set()
+
+    def fail(self, user_id: str, key: str, entry: IdempotencyEntry, status_code: int, detail: str) -> None:
+        """Hand the error to retries already waiting, then release the key."""
+        entry.status_code, entry.detail = status_code, detail
+        entry.done.set()
+        if self._entries.get((user_id, key)) is entry:
+            del self._entries[(user_id, key)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sweep(self) -> None:
+        """Drop expired keys; at most once a minute, so `begin` stays O(1) amortized."""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + 60.0
+        expired = [k for k, e in self._entries.items() if e.expires is not None and e.expires <= now]
+        for k in expired:
+            del self._entries[k]
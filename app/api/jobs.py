@@ -0,0 +1,119 @@
+"""
+Registry of in-flight consultation runs.
+
+Each run gets a `CancelToken` (src/utils/cancellation.py). The graph itself
+runs in a worker thread; the request handler stays on the event loop and
+watches the client while it waits, so:
+- a client that disconnects (tab closed, navigation, fetch aborted) cancels
+  its run within `poll_seconds`;
+- `DELETE /api/consultations/{id}` on a running job cancels it by id.
+Requests sent with an Idempotency-Key get a grace period instead: a retry of
+the same request can attach to the run (see idempotency.py) and keep it alive.
+The thread stops at its next check (between nodes, between streamed chunks).
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.cancellation import CancelToken, cancel_scope
+
+
+class Job:
+    """One running consultation; `state` is the latest graph state seen (partial until the run ends)."""
+
+    __slots__ = ("id", "user_id", "token", "started", "state", "waiters", "detached_at")
+
+    def __init__(self, job_id: str, user_id: str):
+        self.id = job_id
+        self.user_id = user_id
+        self.token = CancelToken()
+        self.started = time.monotonic()
+        self.state: Optional[dict] = None
+        # Other requests waiting on this run (idempotent retries); see `attach`
+        self.waiters = 0
+        self.detached_at = 0.0
+
+
+def _run_in_scope(token: CancelToken, fn: Callable[[], Any]) -> Any:
+    with cancel_scope(token):
+        return fn()
+
+
+class JobRegistry:
+    def __init__(self, poll_seconds: float = 0.5):
+        self.poll_seconds = poll_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str, user_id: str) -> Job:
+        job = Job(job_id, user_id)
+        with self._lock:
+            self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str, reason: str) -> bool:
+        """Cancel a running job; False if there is none (already finished) or it was already cancelled."""
+        job = self._jobs.get(job_id)
+        return job is not None and job.token.cancel(reason)
+
+    def finish(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    async def run(self, job: Job, fn: Callable[[], Any], request=None, disconnect_grace: float = 0.0) -> Any:
+        """
+        Run blocking `fn` in a thread under the job's cancel token and wait for it.
+        Raises OperationCancelled (from the thread) once a cancel has taken effect.
+
+        If the client disconnects, the run is cancelled once `disconnect_grace`
+        seconds have passed with no other request attached to it.
+        """
+        task = asyncio.ensure_future(asyncio.to_thread(_run_in_scope, job.token, fn))
+        disconnected_at = None
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.poll_seconds)
+                if done:
+                    return task.result()
+                if request is None or job.token.cancelled:
+                    continue
+                if disconnected_at is None and await request.is_disconnected():
+                    disconnected_at = time.monotonic()
+                if (
+                        disconnected_at is not None and job.waiters == 0
+                        and time.monotonic() - max(disconnected_at, job.detached_at) >= disconnect_grace
+                ):
+                    job.token.cancel("client_disconnected")
+        except asyncio.CancelledError:
+            # The server dropped the request task (shutdown, or the client went away first)
+            job.token.cancel("request_aborted")
+            raise
+
+    async def attach(self, job_id: str, done: asyncio.Event, request=None) -> bool:
+        """
+        Wait for `done` on behalf of another client of the same run. While attached,
+        a disconnect of the original client does not cancel the run.
+        Returns False if this client disconnected first.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.waiters += 1
+        try:
+            while not done.is_set():
+                try:
+                    await asyncio.wait_for(done.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    if request is not None and await request.is_disconnected():
+                        return False
+            return True
+        finally:
+            if job is not None:
+                job.waiters -= 1
+                job.detached_at = time.monotonic()
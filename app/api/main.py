@@ -1,37 +1,133 @@
-from fastapi import FastAPI, HTTPException, Depends, Cookie, status
+from fastapi import FastAPI, HTTPException, Depends, Cookie, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import Response, JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
-import io
+import asyncio
+from contextlib import aclosing, asynccontextmanager
+import json
 import math
 import secrets
+import time
 import hashlib
 import hmac
 
-# PDF generation (optional - gracefully handle if not installed)
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
-# Import state; graph is lazily loaded at runtime
-from src.graphs.main_consultant_graph import get_graph
-from src.graphs.state import AgentState, BusinessInfo
-from langchain_core.messages import HumanMessage
+# LangChain/LangGraph are imported on first use (see _consultant_graph) to keep cold start fast
+from src.schemas.business import BusinessInfo
+from src.config.settings import settings
+from src.utils.logging import bind_context, configure_logging, get_logger
+
+from src.utils.cache import LRUCache
+
+from app.api.notifications import NotificationStore
+from app.api.pdf import PdfRenderer, REPORTLAB_AVAILABLE, iter_chunks
+from app.api.export import INCOMPLETE_ENTRY, export_order, incomplete_note, ordered_map, stream_ndjson, stream_zip
+from app.api.figures import FigureService
+from src.memory.session_memory import SessionMemory
+from src.utils.figure_sandbox import FigureRenderer
+from app.api.request_context import RequestContextMiddleware
+from app.api.rate_limit import RateLimiter, RateLimitMiddleware
+from app.api.records import ConsultationStore
+from app.api.search import ConsultationSearchIndex
+from app.api.dashboard import DashboardStats
+from app.api.jobs import JobRegistry
+from app.api.admission import AdmissionController, AdmissionRejected
+from app.api.idempotency import MAX_KEY_LENGTH, IdempotencyMismatch, IdempotencyStore, request_fingerprint
+from src.utils.ids import new_ulid
+from src.utils.tracing import RunTrace, TraceAggregates, trace_scope
+
+configure_logging(settings.LOG_LEVEL, json_output=settings.LOG_JSON, debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE)
+log = get_logger("app.api")
+
+pdf_renderer = PdfRenderer(
+    cache_dir=settings.PDF_CACHE_DIR,
+    memory_bytes=settings.PDF_CACHE_MEMORY_MB * 1024 * 1024,
+    workers=settings.PDF_RENDER_WORKERS,
+)
+
+figure_service = FigureService(
+    FigureRenderer(
+        workers=settings.FIGURE_WORKERS,
+        timeout_seconds=settings.FIGURE_TIMEOUT_SECONDS,
+        cpu_seconds=settings.FIGURE_CPU_SECONDS,
+        memory_mb=settings.FIGURE_MEMORY_MB,
+    ),
+    cache_bytes=settings.FIGURE_CACHE_MB * 1024 * 1024,
+)
+
+
+def _consultant_graph():
+    """The LangGraph workflow; LangChain, LangGraph and the LLM clients load on the first call."""
+    from src.graphs.main_consultant_graph import get_graph
+    return get_graph()
+
+
+def _warmup() -> None:
+    """Build the graph, open the LLM connection and touch NumPy so the first consultation pays none of it."""
+    started = time.perf_counter()
+    try:
+        _consultant_graph()
+        from src.utils.llm import warm_connection
+        connected = warm_connection()
+        build_visualization_data(
+            BusinessInfo(business_type="warmup", business_stage="startup", main_goal="warmup",
+                         monthly_revenue=1000, monthly_expenses=1200),
+            None,
+            months=2,
+        )
+        log.info("warmup_finished", duration_s=round(time.perf_counter() - started, 2), llm_connection=connected)
+    except Exception:
+        log.exception("warmup_failed")
+
+
+async def _spill_cold_records() -> None:
+    """Periodically move consultations nobody has opened for a while to the on-disk segments."""
+    while True:
+        await asyncio.sleep(settings.RECORD_SPILL_INTERVAL_SECONDS)
+        try:
+            moved = consultations_store.spill_cold()
+            if moved:
+                log.info("records_spilled", moved=moved, **consultations_store.stats())
+        except Exception:
+            log.exception("records_spill_failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.WARMUP_ON_STARTUP and settings.GROQ_API_KEY:
+        # In the background: the server accepts requests (health checks) immediately
+        app.state.warmup = asyncio.create_task(asyncio.to_thread(_warmup))
+    spill = asyncio.create_task(_spill_cold_records())
+    yield
+    spill.cancel()
+    consultations_store.close()
+    pdf_renderer.shutdown()
+    figure_service.renderer.shutdown()
+
 
 app = FastAPI(
     title="ConsultPro AI API",
     description="Backend for AI Business Consultant SaaS",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
+def _rate_limit_identity(session_id: str) -> Optional[tuple]:
+    """(user_id, subscription) for a valid session cookie; sessions_store/users_store are defined below."""
+    user = users_store.get(sessions_store.get(session_id, ""))
+    return (user["id"], (user.get("subscription") or "free").lower()) if user else None
+
+
+rate_limiter = RateLimiter(settings.RATE_LIMITS, enabled=settings.RATE_LIMIT_ENABLED)
+# Inside CORS, so 429s still carry the CORS headers the browser needs to read them
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    identify=_rate_limit_identity,
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+    trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES,
+)
 # IMPORTANT: Allow frontend origin
 app.add_middleware(
     CORSMiddleware,
@@ -43,10 +139,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy"],
+)
+# Outermost: request id + timing around everything else
+app.add_middleware(RequestContextMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
+# In-memory storage for consultations (replace with database in production):
+# compact records with compressed text, idle ones spilled to disk
+consultations_store = ConsultationStore(
+    spill_dir=settings.RECORD_SPILL_DIR,
+    cold_after_seconds=settings.RECORD_COLD_AFTER_SECONDS,
+    compress_min_bytes=settings.RECORD_COMPRESS_MIN_BYTES,
+    segment_max_bytes=settings.RECORD_SEGMENT_MAX_MB * 1024 * 1024,
+)
+# Per-user inverted index for consultation search, updated as consultations change
+search_index = ConsultationSearchIndex()
+# Per-user dashboard counters (status, processing time, ratings, activity), updated as consultations change
+dashboard_stats = DashboardStats()
+# Per-plan latency / token totals of completed runs, updated on completion (operator metrics)
+trace_aggregates = TraceAggregates()
+# Compact per-user digest of past consultations, fed to follow-up runs
+session_memory = SessionMemory(
+    token_budget=settings.SESSION_MEMORY_TOKEN_BUDGET,
+    max_consultations=settings.SESSION_MEMORY_MAX_CONSULTATIONS,
+)
+# Consultations whose graph is still running (cancel on disconnect / DELETE)
+jobs = JobRegistry(poll_seconds=settings.DISCONNECT_POLL_SECONDS)
+# Idempotency-Key -> run, so client retries never start a second graph run
+idempotency = IdempotencyStore(ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+# Quota and concurrency are reserved before the graph starts (released on failure/cancel)
+admission = AdmissionController(
+    user_concurrency=settings.ADMISSION_USER_CONCURRENCY,
+    max_running=settings.ADMISSION_MAX_RUNNING,
+    reserved_paid_slots=settings.ADMISSION_RESERVED_PAID_SLOTS,
 )
-
-# In-memory storage for consultations (replace with database in production)
-consultations_store: Dict[str, dict] = {}
 
 # ---------- Visualization data helpers (for frontend charts) ----------
 def _clamp(v: float, lo: float, hi: float) -> float:
@@ -57,14 +183,23 @@ def build_visualization_data(
     business: BusinessInfo,
     target_revenue_usd: Optional[float],
     months: int = 12,
+    expense_cut: float = 0.10,
+    growth_mean: Optional[float] = None,
+    growth_volatility: Optional[float] = None,
+    seasonality: Optional[List[float]] = None,
+    break_even_month: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Build lightweight chart-ready data for the Next.js dashboard.
 
+    Series come from a Monte Carlo simulation (see src/tools/cashflow_simulator.py);
+    the plain values are medians, with p10/p90 bands alongside.
+
     The frontend expects snake_case keys:
-    - revenue_projection: [{month, projected, current}]
-    - cashflow_data: [{month, inflow, outflow, net}]
-    - break_even_timeline: [{month, cumulative, break_even_point}]
+    - revenue_projection: [{month, projected, current, projected_p10, projected_p90}]
+    - cashflow_data: [{month, inflow, outflow, net, net_p10, net_p90}]
+    - break_even_timeline: [{month, cumulative, break_even_point, cumulative_p10, cumulative_p90, break_even_probability}]
+    - break_even_probability: {month, probability}
     - market_analysis: [{segment, value}] (optional)
     """
     # Base inputs
@@ -77,53 +212,66 @@ def build_visualization_data(
         # If current is 0, assume a small starting point; otherwise assume 50% growth goal.
         target = 25000.0 if current_revenue <= 0 else current_revenue * 1.5
 
-    # Growth model: smooth monthly growth from current to target (capped)
-    start = max(current_revenue, 1000.0) if target > 0 else max(current_revenue, 1000.0)
-    # Avoid weird visuals if current is already above target
-    end = max(target, start)
-    # Convert to a per-month multiplier; clamp to avoid extreme growth in visuals.
-    raw_growth = (end / start) ** (1.0 / max(months - 1, 1))
-    growth = _clamp(raw_growth, 1.01, 1.25)
-
-    revenue_projection = []
-    cashflow_data = []
-    break_even_timeline = []
-
-    cumulative = 0.0
-    for m in range(1, months + 1):
-        month_label = f"M{m}"
-        projected = start * (growth ** (m - 1))
-        # Current line is flat at current revenue (or start fallback)
-        current = current_revenue if current_revenue > 0 else start
-
-        # Cashflow: inflow = projected revenue, outflow = expenses with light efficiency improvement
-        # Assume small expense optimization over time (up to -10% by month 12)
-        expense_multiplier = 1.0 - 0.10 * ((m - 1) / max(months - 1, 1))
-        outflow = monthly_expenses * expense_multiplier
-        inflow = projected
-        net = inflow - outflow
-
-        cumulative += net
-
-        revenue_projection.append(
-            {"month": month_label, "projected": round(projected), "current": round(current)}
-        )
-        cashflow_data.append(
-            {"month": month_label, "inflow": round(inflow), "outflow": round(outflow), "net": round(net)}
-        )
-        break_even_timeline.append(
-            {
-                "month": month_label,
-                "cumulative": round(cumulative),
-                "break_even_point": 0,
-            }
+    start = max(current_revenue, 1000.0)
+    if growth_mean is None:
+        # Expected monthly growth that reaches the target by the horizon (never negative)
+        end = max(target, start)
+        growth_mean = (end / start) ** (1.0 / max(months - 1, 1)) - 1.0
+    growth_mean = _clamp(growth_mean, -0.5, settings.SIMULATION_MAX_GROWTH)
+
+    # NumPy loads with the first chart request (or at warmup), not at import
+    from src.tools.cashflow_simulator import ScenarioConfig, simulate, summarize
+
+    config = ScenarioConfig(
+        months=months,
+        n_paths=settings.SIMULATION_PATHS,
+        growth_mean=growth_mean,
+        growth_volatility=(
+            growth_volatility if growth_volatility is not None else settings.SIMULATION_GROWTH_VOLATILITY
+        ),
+        expense_cut=expense_cut,
+        seasonality=seasonality or [],
+        break_even_month=break_even_month,
+    )
+    result = simulate(start, monthly_expenses, config)
+    # Current line is flat at current revenue (or start fallback)
+    current = current_revenue if current_revenue > 0 else start
+    return summarize(result, config, current_revenue=current, monthly_expenses=monthly_expenses)
+
+
+# Memoized per (consultation_id, months, target, expense_cut); entries for a
+# consultation are dropped when it is edited or deleted.
+visualization_cache = LRUCache(maxsize=settings.VISUALIZATION_CACHE_SIZE)
+
+
+def get_visualization_data(
+    consultation: dict,
+    months: int = 12,
+    target_revenue_usd: Optional[float] = None,
+    expense_cut: float = 0.10,
+) -> Dict[str, Any]:
+    """Chart series computed lazily from the stored business inputs (no LLM involved)."""
+    target = target_revenue_usd if target_revenue_usd is not None else consultation.get("target_revenue_usd")
+    key = (consultation["id"], months, target, expense_cut)
+    data = visualization_cache.get(key)
+    if data is None:
+        data = build_visualization_data(
+            business=BusinessInfo(**consultation["business"]),
+            target_revenue_usd=target,
+            months=months,
+            expense_cut=expense_cut,
         )
+        visualization_cache.set(key, data)
+    return data
 
-    return {
-        "revenue_projection": revenue_projection,
-        "cashflow_data": cashflow_data,
-        "break_even_timeline": break_even_timeline,
-    }
+
+def _invalidate_visualization(consultation_id: str) -> None:
+    visualization_cache.discard_where(lambda key: key[0] == consultation_id)
+
+
+def _with_visualization(consultation: dict) -> dict:
+    """Response view of a stored consultation: default charts are attached, not stored."""
+    return {**consultation.to_dict(), "visualization_data": get_visualization_data(consultation)}
 
 # -------------------- Auth / users (in-memory; DB later) --------------------
 users_store: Dict[str, dict] = {}
@@ -157,7 +305,8 @@ def _new_session_id() -> str:
     return secrets.token_urlsafe(32)
 
 
-def get_current_user(session_id: Optional[str] = Cookie(default=None)) -> dict:
+async def get_current_user(session_id: Optional[str] = Cookie(default=None)) -> dict:
+    # async: no I/O here, and running in the request's own context lets user_id reach every log line
     if not session_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     user_id = sessions_store.get(session_id)
@@ -166,6 +315,7 @@ def get_current_user(session_id: Optional[str] = Cookie(default=None)) -> dict:
     user = users_store.get(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    bind_context(user_id=user_id)
     return user
 
 
@@ -185,6 +335,15 @@ class AuthResponse(BaseModel):
     message: str
 
 
+@app.get("/api/health")
+async def health():
+    """Liveness/readiness probe; `graph_ready` turns true once the agent graph is built."""
+    import sys
+    graph_module = sys.modules.get("src.graphs.main_consultant_graph")
+    # getattr: the module may still be initializing in the warmup thread
+    return {"status": "ok", "graph_ready": getattr(graph_module, "_graph", None) is not None}
+
+
 @app.post("/api/auth/signup", response_model=AuthResponse)
 async def signup(data: AuthSignup):
     email = data.email.strip().lower()
@@ -303,8 +462,66 @@ class PasswordChange(BaseModel):
     new_password: str
 
 
+def _mark_cancelled(consultation: dict, job, trace: RunTrace, reason: str) -> None:
+    """Keep whatever the graph produced (and the trace so far) before the cancel took effect."""
+    state = job.state or {}
+    consultation.update({
+        "status": "cancelled",
+        "cancel_reason": reason,
+        "updated_at": datetime.utcnow().isoformat() + "Z",
+        "refined_strategy": state.get("refined_strategy") or state.get("generated_recommendations") or "",
+        "visualization_code": state.get("visualization_code") or "",
+        "refinement_count": state.get("current_refinement_round", 0),
+        "critique_score": state.get("critique_score"),
+        "processing_time": int(time.monotonic() - job.started),
+        "trace": trace.to_dict(),
+    })
+    search_index.add(consultation)
+    dashboard_stats.track(consultation, "cancelled")
+    log.info("consultation_cancelled", reason=reason, rounds=consultation["refinement_count"])
+
+
+async def _replay_idempotent(entry, request: Request, response: Response):
+    """A retry of a request we have already seen: wait for its run if needed, then answer as it did."""
+    if not entry.done.is_set():
+        log.info("idempotent_retry_attached", consultation_id=entry.consultation_id)
+        if not await jobs.attach(entry.consultation_id, entry.done, request):
+            raise HTTPException(status_code=499, detail="Client disconnected")
+    if entry.failed:
+        raise HTTPException(status_code=entry.status_code, detail=entry.detail)
+    consultation = consultations_store.get(entry.consultation_id)
+    if consultation is None:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+    response.headers["Idempotent-Replayed"] = "true"
+    return _with_visualization(consultation)
+
+
 @app.post("/api/consultations")
-async def create_consultation(data: ConsultationCreate, user: dict = Depends(get_current_user)):
+async def create_consultation(
+    data: ConsultationCreate,
+    request: Request,
+    response: Response,
+    user: dict = Depends(get_current_user),
+):
+    # Time-ordered and collision-free; also the export / listing sort key
+    consultation_id = f"c-{new_ulid()}"
+
+    idempotency_key = request.headers.get("Idempotency-Key")
+    entry = None
+    reservation = None
+    trace = None
+    if idempotency_key is not None:
+        if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+        try:
+            entry, created = idempotency.begin(
+                user["id"], idempotency_key, request_fingerprint(data.model_dump()), consultation_id,
+            )
+        except IdempotencyMismatch as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if not created:
+            return await _replay_idempotent(entry, request, response)
+
     try:
         # Enforce plan from subscription (do not allow client-selected plan)
         effective_plan = _subscription_to_consultation_plan(user.get("subscription", "free"))
@@ -344,8 +561,12 @@ async def create_consultation(data: ConsultationCreate, user: dict = Depends(get
         if extra_context:
             initial_prompt += f"\nAdditional context:\n{extra_context}"
 
+        from langchain_core.messages import HumanMessage
+        from src.graphs.state import AgentState
+
         initial_state = AgentState(
             business=business,
+            user_context=session_memory.context_for(user["id"], business) or None,
             messages=[HumanMessage(content=initial_prompt)],
             needs_refinement=True,
             max_refinement_rounds=3 if effective_plan in ["premium", "ultra"] else 1,
@@ -354,83 +575,247 @@ async def create_consultation(data: ConsultationCreate, user: dict = Depends(get
 
         config = {"configurable": {"thread_id": f"consult_{datetime.utcnow().timestamp()}"}}
 
-        final_state = None
-        refined_strategy = ""
-        visualization_code = ""
-        start_time = datetime.utcnow()
-
-        # Run full workflow (lazy graph init)
-        graph = get_graph()
-        for event in graph.stream(initial_state, config, stream_mode="values"):
-            final_state = event
-            if final_state.get("refined_strategy"):
-                refined_strategy = final_state["refined_strategy"]
-            if final_state.get("visualization_code"):
-                visualization_code = final_state["visualization_code"]
-        
-        # Calculate processing time
-        processing_time = int((datetime.utcnow() - start_time).total_seconds())
-
-        if not final_state:
-            raise HTTPException(status_code=500, detail="Processing failed - no result")
-
-        # Generate simple ID (replace with real DB later)
-        consultation_id = f"c-{int(datetime.utcnow().timestamp())}-{hash(data.main_goal) % 10000:04x}"
         now = datetime.utcnow()
         created_at = now.isoformat() + "Z"
+        bind_context(consultation_id=consultation_id)
+
+        try:
+            reservation = admission.reserve(user)
+        except AdmissionRejected as e:
+            log.info("consultation_rejected", status=e.status_code, running=admission.running)
+            headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+            raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
 
-        consultation_data = {
+        # Visible (and cancellable via DELETE) while the graph runs
+        consultation_data = consultations_store.add({
             "id": consultation_id,
             "user_id": user["id"],
-            "status": "completed",
+            "status": "processing",
             "created_at": created_at,
             "updated_at": created_at,
             "business": business.model_dump(),
             "plan_used": effective_plan,
-            "refined_strategy": refined_strategy or "No strategy was generated.",
-            "visualization_code": visualization_code,
-            "visualization_data": build_visualization_data(
-                business=business,
-                target_revenue_usd=data.target_revenue_usd,
-                months=12,
-            ),
-            "refinement_count": final_state.get("current_refinement_round", 0),
+            "refined_strategy": "",
+            "visualization_code": "",
+            "refinement_count": 0,
+            "strategy_sections": None,
+            "critique_score": None,
             "business_name": data.business_name.strip() if data.business_name else None,
             "industry": data.industry.strip() if data.industry else None,
             "target_revenue_usd": data.target_revenue_usd,
-            "processing_time": processing_time,
-            "model_used": "GPT-4o",  # Default model name
+            "processing_time": None,
+            "model_used": settings.LLM_MODEL,
             "feedback": None,
-        }
+        })
+        search_index.add(consultation_data)
+        dashboard_stats.track(consultation_data, "created")
+        job = jobs.start(consultation_id, user["id"])
+        trace = RunTrace()
+        start_time = datetime.utcnow()
 
-        # Store in memory
-        consultations_store[consultation_id] = consultation_data
-        # Update user usage stats
-        user["consultations_used"] = int(user.get("consultations_used", 0)) + 1
-        users_store[user["id"]] = user
+        log.info("consultation_started", plan=effective_plan, business_type=business.business_type)
+
+        def run_graph():
+            # Lazy graph init; runs in a worker thread under the job's cancel token
+            with trace_scope(trace):
+                graph = _consultant_graph()
+                for event in graph.stream(initial_state, config, stream_mode="values"):
+                    job.state = event
+                    job.token.raise_if_cancelled()
+            return job.state
+
+        from src.utils.cancellation import OperationCancelled
+        try:
+            final_state = await jobs.run(
+                job, run_graph, request,
+                # A client that sent a key may retry and attach; give it time before cancelling
+                disconnect_grace=settings.IDEMPOTENCY_REATTACH_SECONDS if entry is not None else 0.0,
+            )
+            job.token.raise_if_cancelled()  # cancelled after the last node, before we got here
+        except OperationCancelled as e:
+            _mark_cancelled(consultation_data, job, trace, e.reason)
+            raise HTTPException(status_code=409, detail="Consultation was cancelled")
+        except asyncio.CancelledError:
+            _mark_cancelled(consultation_data, job, trace, job.token.reason or "request_aborted")
+            raise
+        finally:
+            jobs.finish(consultation_id)
 
-        return consultation_data
+        # Calculate processing time
+        processing_time = int((datetime.utcnow() - start_time).total_seconds())
 
-    except HTTPException:
+        if not final_state:
+            consultation_data["status"] = "failed"
+            dashboard_stats.track(consultation_data, "failed")
+            raise HTTPException(status_code=500, detail="Processing failed - no result")
+
+        consultation_data.update({
+            "status": "completed",
+            "updated_at": datetime.utcnow().isoformat() + "Z",
+            "refined_strategy": final_state.get("refined_strategy") or "No strategy was generated.",
+            "visualization_code": final_state.get("visualization_code") or "",
+            "refinement_count": final_state.get("current_refinement_round", 0),
+            # Typed sections, so clients need not parse the markdown (None if the model fell back to text)
+            "strategy_sections": final_state["refined_plan"].model_dump() if final_state.get("refined_plan") else None,
+            "critique_score": final_state.get("critique_score"),
+            "processing_time": processing_time,
+            "trace": trace.to_dict(),
+        })
+
+        log.info(
+            "consultation_completed",
+            duration_s=processing_time,
+            rounds=consultation_data["refinement_count"],
+            critique_score=consultation_data["critique_score"],
+            llm_calls=consultation_data["trace"]["totals"]["llm_calls"],
+            input_tokens=consultation_data["trace"]["totals"]["input_tokens"],
+            output_tokens=consultation_data["trace"]["totals"]["output_tokens"],
+        )
+
+        session_memory.record_consultation(user["id"], consultation_data)
+        search_index.add(consultation_data)
+        dashboard_stats.track(consultation_data, "completed")
+        trace_aggregates.add(consultation_data["id"], consultation_data.get("plan_used", "basic"), consultation_data["trace"])
+        # Charge the quota reserved at admission
+        admission.commit(reservation, user)
+        users_store[user["id"]] = user
+
+        if user.get("notification_preferences", {}).get("consultation_updates", True):
+            notifications_store.add(
+                user["id"],
+                type="consultation_completed",
+                title="Your consultation is ready",
+                body=f"{consultation_data['business_name'] or business.business_type}: strategy and charts are available.",
+            )
+        if settings.PDF_PRERENDER_ON_COMPLETE and REPORTLAB_AVAILABLE:
+            pdf_renderer.prerender(consultation_data)
+        # Turn the generated plotly code into a ready-to-draw figure once, off the request path
+        figure_service.prerender(consultation_data)
+
+        if entry is not None:
+            idempotency.complete(entry)
+        return _with_visualization(consultation_data)
+
+    except HTTPException as e:
+        if entry is not None:
+            idempotency.fail(user["id"], idempotency_key, entry, e.status_code, e.detail)
         # Re-raise HTTP exceptions as-is
         raise
+    except asyncio.CancelledError:
+        if entry is not None:
+            idempotency.fail(user["id"], idempotency_key, entry, 409, "Consultation was cancelled")
+        raise
     except Exception as e:
-        # Log the full error for debugging
-        import traceback
-        error_detail = str(e)
-        # In production, log to proper logging system
-        print(f"Error creating consultation: {error_detail}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Server error: {error_detail}")
+        log.exception("consultation_failed")
+        consultation = consultations_store.peek(consultation_id)
+        if consultation is not None and consultation["status"] == "processing":
+            consultation["status"] = "failed"
+            if trace is not None:
+                consultation["trace"] = trace.to_dict()
+            dashboard_stats.track(consultation, "failed")
+        if entry is not None:
+            idempotency.fail(user["id"], idempotency_key, entry, 500, f"Server error: {e}")
+        raise HTTPException(status_code=500, detail=f"Server error: {e}")
+    finally:
+        if reservation is not None:
+            admission.release(reservation)  # no-op once committed
 
 
 @app.get("/api/consultations")
 async def list_consultations(user: dict = Depends(get_current_user)):
     """List all consultations"""
-    # Return in reverse chronological order (newest first)
-    consultations = [c for c in consultations_store.values() if c.get("user_id") == user["id"]]
-    consultations.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-    return consultations
+    # Return in reverse chronological order (newest first); ids are time-ordered
+    consultations = [c for c in consultations_store.values() if c["user_id"] == user["id"]]
+    consultations.sort(key=lambda x: x["id"], reverse=True)
+    return [c.to_dict() for c in consultations]
+
+
+@app.get("/api/consultations/export")
+async def export_consultations(
+    format: str = Query("zip", pattern="^(zip|ndjson)$"),
+    after: Optional[str] = Query(None, description="Resume after this consultation id"),
+    limit: Optional[int] = Query(None, ge=1),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Stream every consultation of the user as a ZIP of PDFs or as NDJSON.
+    Entries are ordered oldest-first; pass the last id received as `after` to resume.
+    """
+    if format == "zip" and not REPORTLAB_AVAILABLE:
+        raise HTTPException(status_code=503, detail="PDF generation not available. Please install reportlab.")
+
+    ids = export_order(
+        (c for c in consultations_store.values() if c["user_id"] == user["id"]),
+        after=after,
+        limit=limit,
+    )
+    headers = {"X-Export-Count": str(len(ids))}
+    if ids:
+        headers["X-Export-Last-Id"] = ids[-1]
+
+    if format == "ndjson":
+        # Records are looked up lazily (without loading cold ones back); ones deleted mid-export are skipped
+        records = (c.to_dict() if c is not None else None for c in map(consultations_store.peek, ids))
+        return StreamingResponse(stream_ndjson(records), media_type="application/x-ndjson", headers=headers)
+
+    async def render(cid: str):
+        consultation = consultations_store.peek(cid)
+        if consultation is None:
+            return None
+        try:
+            _, data = await pdf_renderer.get(consultation)
+        except Exception as e:
+            # The 200 and headers are already sent: report it inside the archive instead
+            log.warning("export_render_failed", consultation_id=cid, error=str(e))
+            return cid, e
+        return cid, data
+
+    async def entries():
+        resume_after = after
+        async with aclosing(ordered_map(ids, render, settings.EXPORT_RENDER_CONCURRENCY)) as rendered:
+            async for entry in rendered:
+                if entry is None:
+                    continue
+                cid, data = entry
+                if isinstance(data, Exception):
+                    # Stop at the last good entry so the ZIP stays valid and after=resume_after picks up here
+                    yield INCOMPLETE_ENTRY, incomplete_note(cid, resume_after, f"{type(data).__name__}: {data}")
+                    return
+                yield f"consultation-{cid}.pdf", data
+                resume_after = cid
+
+    headers["Content-Disposition"] = "attachment; filename=consultations.zip"
+    return StreamingResponse(stream_zip(entries()), media_type="application/zip", headers=headers)
+
+
+@app.get("/api/consultations/search")
+async def search_consultations(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Ranked full-text search over the user's consultations (name, industry, business type,
+    goal, strategy). Words match as prefixes; results are summaries, best match first.
+    """
+    results = []
+    for cid, score in search_index.search(user["id"], q, limit):
+        consultation = consultations_store.peek(cid)
+        if consultation is None:
+            continue
+        business = consultation.get("business") or {}
+        results.append({
+            "id": cid,
+            "score": round(score, 4),
+            "status": consultation["status"],
+            "created_at": consultation["created_at"],
+            "business_name": consultation.get("business_name"),
+            "industry": consultation.get("industry"),
+            "business_type": business.get("business_type"),
+            "main_goal": business.get("main_goal"),
+            "critique_score": consultation.get("critique_score"),
+        })
+    return {"query": q, "count": len(results), "results": results}
 
 
 @app.get("/api/consultations/{consultation_id}")
@@ -439,7 +824,194 @@ async def get_consultation(consultation_id: str, user: dict = Depends(get_curren
     consultation = consultations_store.get(consultation_id)
     if not consultation or consultation.get("user_id") != user["id"]:
         raise HTTPException(status_code=404, detail="Consultation not found")
-    return consultation
+    return _with_visualization(consultation)
+
+
+@app.get("/api/consultations/{consultation_id}/visualization")
+async def get_consultation_visualization(
+    consultation_id: str,
+    months: int = Query(12, ge=1, le=60),
+    target: Optional[float] = Query(None, gt=0, description="Target monthly revenue (USD); defaults to the stored target"),
+    expense_cut: float = Query(0.10, ge=0, le=0.9),
+    user: dict = Depends(get_current_user),
+):
+    """Chart data for a custom horizon / scenario, computed on demand and memoized"""
+    consultation = consultations_store.get(consultation_id)
+    if not consultation or consultation.get("user_id") != user["id"]:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+    return get_visualization_data(consultation, months=months, target_revenue_usd=target, expense_cut=expense_cut)
+
+
+@app.get("/api/consultations/{consultation_id}/figure")
+async def get_consultation_figure(consultation_id: str, user: dict = Depends(get_current_user)):
+    """
+    Plotly figure JSON produced from the generated `visualization_code`.
+    The code runs once in a sandboxed worker; the result is cached per consultation.
+    """
+    consultation = consultations_store.get(consultation_id)
+    if not consultation or consultation.get("user_id") != user["id"]:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+
+    result = await figure_service.get(consultation)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No visualization was generated for this consultation")
+    if "error" in result:
+        raise HTTPException(status_code=422, detail=f"Visualization could not be rendered: {result['error']}")
+    # Already JSON; skip re-serialization
+    return Response(content=result["figure"], media_type="application/json")
+
+
+@app.get("/api/consultations/{consultation_id}/trace")
+async def get_consultation_trace(consultation_id: str, user: dict = Depends(get_current_user)):
+    """Execution trace of the run: node spans and per-LLM-call model, tokens, timing and retries"""
+    consultation = consultations_store.get(consultation_id)
+    if not consultation or consultation.get("user_id") != user["id"]:
+        raise HTTPException(status_code=404, detail="Consultation not found")
+    if not consultation.get("trace"):
+        raise HTTPException(status_code=404, detail="No trace recorded for this consultation")
+    return {"id": consultation_id, "status": consultation["status"], **consultation["trace"]}
+
+
+# Large fields left out of dashboard cards
+_CARD_OMITTED = frozenset({"refined_strategy", "visualization_code", "strategy_sections", "trace"})
+
+
+@app.get("/api/dashboard/stats")
+async def get_dashboard_stats(
+    recent: int = Query(4, ge=0, le=20, description="How many of the newest consultations to include"),
+    user: dict = Depends(get_current_user),
+):
+    """
+    Dashboard aggregates: counts by status, usage vs. plan limit, average processing time,
+    rating distribution, recent activity and the newest consultations (without strategy text).
+    Maintained incrementally, so the cost does not depend on how many consultations the user has.
+    """
+    stats = dashboard_stats.summary(user["id"])
+    used, limit = user.get("consultations_used", 0), user.get("consultations_limit", 0)
+    stats["usage"] = {
+        "plan": user.get("subscription", "free"),
+        "used": used,
+        "limit": limit,
+        "remaining": None if limit < 0 else max(0, limit - used),  # -1: unlimited
+    }
+    stats["recent_consultations"] = [
+        {k: c[k] for k in c if k not in _CARD_OMITTED}
+        for c in map(consultations_store.peek, dashboard_stats.recent_ids(user["id"], recent))
+        if c is not None
+    ]
+    return stats
+
+
+class PlanningSolve(BaseModel):
+    goal: Literal["break_even", "cumulative_break_even", "target_revenue"] = "break_even"
+    solve_for: Literal["growth", "expense_cut", "start_revenue"] = "growth"
+    # Heatmap rows; defaults to expense_cut (start_revenue for a revenue target) when solving for growth, else growth
+    axis: Optional[Literal["growth", "expense_cut", "start_revenue"]] = None
+    monthly_revenue_usd: float = Field(0.0, ge=0)
+    monthly_expenses_usd: float = Field(0.0, ge=0)
+    target_revenue_usd: Optional[float] = Field(None, gt=0)
+    # Fixed value of the lever that is neither solved for nor on the axis
+    growth: float = Field(0.0, ge=-0.5, le=1.0)
+    expense_cut: float = Field(0.0, ge=0, le=0.9)
+    horizon_min: int = Field(2, ge=1)
+    horizon_max: int = Field(24, ge=1)
+    axis_min: Optional[float] = None
+    axis_max: Optional[float] = None
+    axis_steps: int = Field(20, ge=1)
+
+
+# Default axis ranges (min, max) per lever; start revenue is relative to the current revenue
+_PLANNING_AXIS_DEFAULTS = {"growth": (0.0, 0.2), "expense_cut": (0.0, 0.5), "start_revenue": (0.5, 2.0)}
+# Valid range per lever (as the PlanningSolve fields); axis_min / axis_max must stay inside it
+_PLANNING_AXIS_BOUNDS = {"growth": (-0.5, 1.0), "expense_cut": (0.0, 0.9), "start_revenue": (0.0, float("inf"))}
+
+
+@app.post("/api/planning/solve")
+async def solve_planning_grid(data: PlanningSolve, user: dict = Depends(get_current_user)):
+    """
+    Goal seek: the growth, expense cut or starting revenue needed to reach the goal by each month
+    from horizon_min to horizon_max (columns), for each value of a second lever (rows).
+    Returned as a heatmap grid (null = out of reach). Deterministic NumPy, no LLM involved.
+    """
+    horizons = data.horizon_max - data.horizon_min + 1
+    if horizons < 1 or data.horizon_max > settings.PLANNING_MAX_HORIZON_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Horizons must satisfy 1 <= horizon_min <= horizon_max <= {settings.PLANNING_MAX_HORIZON_MONTHS}")
+    if horizons > settings.PLANNING_MAX_GRID_STEPS or data.axis_steps > settings.PLANNING_MAX_GRID_STEPS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.PLANNING_MAX_GRID_STEPS} horizons and axis steps")
+    if data.goal != "target_revenue" and data.monthly_expenses_usd <= 0:
+        raise HTTPException(status_code=400, detail="monthly_expenses_usd is required for break-even goals")
+
+    if data.axis:
+        axis = data.axis
+    elif data.solve_for == "growth":
+        axis = "start_revenue" if data.goal == "target_revenue" else "expense_cut"
+    else:
+        axis = "growth"
+    lo, hi = _PLANNING_AXIS_DEFAULTS[axis]
+    if axis == "start_revenue":
+        base = data.monthly_revenue_usd or data.monthly_expenses_usd or (data.target_revenue_usd or 0.0)
+        lo, hi = lo * base, hi * base
+    lo = data.axis_min if data.axis_min is not None else lo
+    hi = data.axis_max if data.axis_max is not None else hi
+    if hi < lo:
+        raise HTTPException(status_code=400, detail="axis_max must not be below axis_min")
+    low_bound, high_bound = _PLANNING_AXIS_BOUNDS[axis]
+    if lo < low_bound or hi > high_bound:
+        raise HTTPException(status_code=400, detail=f"The {axis} axis must lie within [{low_bound}, {high_bound}]")
+
+    # NumPy and the solver load on first use
+    import numpy as np
+    from src.tools.goal_seek import solve_grid
+
+    started = time.perf_counter()
+    horizon_values = np.arange(data.horizon_min, data.horizon_max + 1)
+    axis_values = np.linspace(lo, hi, data.axis_steps)
+    levers = {"start_revenue": data.monthly_revenue_usd, "growth": data.growth, "expense_cut": data.expense_cut}
+    try:
+        grid = solve_grid(
+            data.goal, data.solve_for, horizon_values, axis, axis_values,
+            levers={k: v for k, v in levers.items() if k not in (axis, data.solve_for)},
+            monthly_expenses=data.monthly_expenses_usd,
+            target_revenue=data.target_revenue_usd,
+            max_growth=settings.SIMULATION_MAX_GROWTH,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    solve_ms = (time.perf_counter() - started) * 1000
+
+    # NaN = out of reach; inf would not serialize, so treat it the same
+    reachable = np.isfinite(grid)
+    rounded = np.round(grid, 0 if data.solve_for == "start_revenue" else 4)
+    return {
+        "goal": data.goal,
+        "solve_for": data.solve_for,
+        "horizons": horizon_values.tolist(),
+        "axis": {"name": axis, "values": np.round(axis_values, 4).tolist()},
+        # rows follow axis.values, columns follow horizons
+        "values": np.where(reachable, rounded, None).tolist(),
+        "reachable_share": round(float(reachable.mean()), 4),
+        "range": {
+            "min": float(rounded[reachable].min()) if reachable.any() else None,
+            "max": float(rounded[reachable].max()) if reachable.any() else None,
+        },
+        "solve_ms": round(solve_ms, 2),
+    }
+
+
+@app.get("/api/traces/aggregates")
+async def get_trace_aggregates(request: Request):
+    """
+    Operator metrics: latency, LLM calls, tokens and estimated cost per run, by consultation plan,
+    over completed runs of all users. Requires the X-Operator-Key header (OPERATOR_API_KEY).
+    """
+    expected = settings.OPERATOR_API_KEY
+    supplied = request.headers.get("X-Operator-Key", "")
+    if not expected or not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Operator access required")
+    return trace_aggregates.summaries(
+        input_price_per_mtok=settings.LLM_INPUT_PRICE_PER_MTOK,
+        output_price_per_mtok=settings.LLM_OUTPUT_PRICE_PER_MTOK,
+    )
 
 
 @app.post("/api/consultations/{consultation_id}/feedback")
@@ -460,7 +1032,8 @@ async def submit_feedback(consultation_id: str, feedback: FeedbackCreate, user:
     }
     consultation["updated_at"] = datetime.utcnow().isoformat() + "Z"
     
-    consultations_store[consultation_id] = consultation
+    session_memory.record_feedback(user["id"], consultation_id, feedback.rating, feedback.comment)
+    dashboard_stats.track(consultation, "feedback")
     
     return {"message": "Feedback submitted successfully"}
 
@@ -487,19 +1060,33 @@ async def update_consultation(consultation_id: str, data: ConsultationUpdate, us
         consultation["target_revenue_usd"] = data.target_revenue_usd
     
     consultation["updated_at"] = datetime.utcnow().isoformat() + "Z"
-    consultations_store[consultation_id] = consultation
+    session_memory.record_consultation(user["id"], consultation)
+    search_index.add(consultation)
+    _invalidate_visualization(consultation_id)
     
-    return consultation
+    return _with_visualization(consultation)
 
 
 @app.delete("/api/consultations/{consultation_id}")
 async def delete_consultation(consultation_id: str, user: dict = Depends(get_current_user)):
-    """Delete a consultation"""
+    """Delete a consultation; a running one is cancelled first and kept (status "cancelled", partial results)"""
     consultation = consultations_store.get(consultation_id)
     if not consultation or consultation.get("user_id") != user["id"]:
         raise HTTPException(status_code=404, detail="Consultation not found")
-    
+    if consultation.get("status") == "processing":
+        jobs.cancel(consultation_id, "deleted_by_user")
+        consultation["status"] = "cancelled"
+        dashboard_stats.track(consultation)
+        return JSONResponse(status_code=202, content={"message": "Consultation cancelled", "status": "cancelled"})
+
     del consultations_store[consultation_id]
+    search_index.remove(consultation_id)
+    dashboard_stats.forget(consultation_id)
+    trace_aggregates.remove(consultation_id)
+    session_memory.forget(user["id"], consultation_id)
+    pdf_renderer.discard(consultation_id)
+    figure_service.discard(consultation_id)
+    _invalidate_visualization(consultation_id)
     return {"message": "Consultation deleted successfully"}
 
 
@@ -797,37 +1384,81 @@ async def get_timezones():
 
 
 # -------------------- Notifications (backed by real endpoints) --------------------
-notifications_store: Dict[str, List[dict]] = {}  # user_id -> list[{id, type, title, body, created_at, read_at?}]
+notifications_store = NotificationStore(max_per_user=settings.NOTIFICATIONS_MAX_PER_USER)
 
 
 @app.get("/api/notifications/unread-count")
 async def unread_count(user: dict = Depends(get_current_user)):
-    items = notifications_store.get(user["id"], [])
-    unread = sum(1 for n in items if not n.get("read_at"))
-    return {"unread": unread}
+    return {"unread": notifications_store.unread_count(user["id"])}
 
 
 @app.get("/api/notifications")
-async def list_notifications(user: dict = Depends(get_current_user)):
-    items = notifications_store.get(user["id"], [])
-    items_sorted = sorted(items, key=lambda x: x.get("created_at", ""), reverse=True)
-    return {"notifications": items_sorted}
+async def list_notifications(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    unread_only: bool = False,
+    user: dict = Depends(get_current_user),
+):
+    """Newest-first, paginated notifications"""
+    return notifications_store.list(user["id"], limit=limit, offset=offset, unread_only=unread_only)
+
+
+@app.get("/api/notifications/stream")
+async def stream_notifications(request: Request, user: dict = Depends(get_current_user)):
+    """
+    Server-sent events: pushes `notification` and `unread` events so clients can stop polling.
+    The current unread count is sent immediately on connect.
+    """
+    user_id = user["id"]
+    queue = notifications_store.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield _sse("unread", {"unread": notifications_store.unread_count(user_id)})
+            while not await request.is_disconnected():
+                try:
+                    event, payload = await asyncio.wait_for(
+                        queue.get(), timeout=settings.NOTIFICATIONS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, payload)
+        finally:
+            notifications_store.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, payload: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.post("/api/notifications/read-all")
+async def mark_all_notifications_read(user: dict = Depends(get_current_user)):
+    changed = notifications_store.mark_all_read(user["id"])
+    return {"message": "Marked all as read", "updated": changed}
 
 
 @app.post("/api/notifications/{notification_id}/read")
 async def mark_notification_read(notification_id: str, user: dict = Depends(get_current_user)):
-    items = notifications_store.get(user["id"], [])
-    for n in items:
-        if n.get("id") == notification_id:
-            if not n.get("read_at"):
-                n["read_at"] = datetime.utcnow().isoformat() + "Z"
-            return {"message": "Marked as read"}
-    raise HTTPException(status_code=404, detail="Notification not found")
+    if not notifications_store.mark_read(user["id"], notification_id):
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"message": "Marked as read"}
 
 
 @app.get("/api/consultations/{consultation_id}/export/pdf")
-async def export_consultation_pdf(consultation_id: str, user: dict = Depends(get_current_user)):
-    """Export consultation as PDF"""
+async def export_consultation_pdf(
+    consultation_id: str,
+    request: Request,
+    user: dict = Depends(get_current_user),
+):
+    """Export consultation as PDF (rendered off-loop, cached per consultation version)"""
     if not REPORTLAB_AVAILABLE:
         raise HTTPException(status_code=503, detail="PDF generation not available. Please install reportlab.")
     
@@ -836,80 +1467,20 @@ async def export_consultation_pdf(consultation_id: str, user: dict = Depends(get
         raise HTTPException(status_code=404, detail="Consultation not found")
     
     try:
-        # Create PDF in memory
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        story = []
-        
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#1a1a1a',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor='#2563eb',
-            spaceAfter=12,
-            spaceBefore=20
-        )
-        
-        # Title
-        business_name = consultation.get("business_name") or "Business Consultation"
-        story.append(Paragraph(f"Consultation Report: {business_name}", title_style))
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Business Information
-        story.append(Paragraph("Business Information", heading_style))
-        business = consultation.get("business", {})
-        story.append(Paragraph(f"<b>Type:</b> {business.get('business_type', 'N/A')}", styles['Normal']))
-        story.append(Paragraph(f"<b>Stage:</b> {business.get('business_stage', 'N/A')}", styles['Normal']))
-        if business.get('location'):
-            story.append(Paragraph(f"<b>Location:</b> {business.get('location')}", styles['Normal']))
-        if business.get('team_size'):
-            story.append(Paragraph(f"<b>Team Size:</b> {business.get('team_size')}", styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Financial Information
-        story.append(Paragraph("Financial Overview", heading_style))
-        if business.get('monthly_revenue'):
-            story.append(Paragraph(f"<b>Monthly Revenue:</b> ${business.get('monthly_revenue'):,.2f}", styles['Normal']))
-        if business.get('monthly_expenses'):
-            story.append(Paragraph(f"<b>Monthly Expenses:</b> ${business.get('monthly_expenses'):,.2f}", styles['Normal']))
-        story.append(Paragraph(f"<b>Main Goal:</b> {business.get('main_goal', 'N/A')}", styles['Normal']))
-        story.append(Spacer(1, 0.2*inch))
-        
-        # Strategy
-        story.append(PageBreak())
-        story.append(Paragraph("Strategic Recommendations", heading_style))
-        strategy = consultation.get("refined_strategy", "No strategy available.")
-        # Clean markdown and split into paragraphs
-        strategy_paragraphs = strategy.split('\n\n')
-        for para in strategy_paragraphs[:20]:  # Limit to first 20 paragraphs
-            if para.strip():
-                # Remove markdown headers
-                para = para.replace('#', '').replace('##', '').replace('###', '').strip()
-                if para:
-                    story.append(Paragraph(para, styles['Normal']))
-                    story.append(Spacer(1, 0.1*inch))
-        
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
-        
-        return Response(
-            content=buffer.getvalue(),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=consultation-{consultation_id}.pdf"
-            }
-        )
+        key, pdf_bytes = await pdf_renderer.get(consultation)
     except Exception as e:
-        # Fallback: return text if PDF generation fails
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+
+    etag = f'"{key}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return StreamingResponse(
+        iter_chunks(pdf_bytes),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=consultation-{consultation_id}.pdf",
+            "Content-Length": str(len(pdf_bytes)),
+            "ETag": etag,
+        }
+    )
@@ -0,0 +1,154 @@
+"""
+In-memory notification store with a push channel.
+
+Items are kept per user in arrival order (oldest -> newest), so listing never
+needs a sort. The unread counter is maintained on every write instead of being
+recomputed per poll, and each user's history is capped; the oldest items are
+dropped once the cap is reached.
+"""
+import asyncio
+import secrets
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+
+class _UserNotifications:
+    """Per-user bucket: ordered items, id index and the maintained unread count."""
+
+    __slots__ = ("items", "by_id", "unread", "dropped")
+
+    def __init__(self) -> None:
+        self.items: Deque[dict] = deque()
+        self.by_id: Dict[str, dict] = {}
+        self.unread = 0
+        self.dropped = 0
+
+
+class NotificationStore:
+    """Notification storage + fan-out to live subscribers (SSE / long-poll)."""
+
+    def __init__(self, max_per_user: int = 200) -> None:
+        self.max_per_user = max(1, int(max_per_user))
+        self._users: Dict[str, _UserNotifications] = {}
+        # user_id -> {(loop, queue)}; queues receive ("notification" | "unread", payload)
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def _bucket(self, user_id: str) -> _UserNotifications:
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = self._users[user_id] = _UserNotifications()
+        return bucket
+
+    # ---------- writes ----------
+    def add(self, user_id: str, type: str, title: str, body: Optional[str] = None) -> dict:
+        """Append a notification and push it (plus the new unread count) to subscribers."""
+        bucket = self._bucket(user_id)
+        item = {
+            "id": f"n-{secrets.token_hex(6)}",
+            "type": type,
+            "title": title,
+            "body": body,
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "read_at": None,
+        }
+        bucket.items.append(item)
+        bucket.by_id[item["id"]] = item
+        bucket.unread += 1
+
+        while len(bucket.items) > self.max_per_user:
+            old = bucket.items.popleft()
+            bucket.by_id.pop(old["id"], None)
+            bucket.dropped += 1
+            if not old.get("read_at"):
+                bucket.unread -= 1
+
+        self._publish(user_id, "notification", item)
+        self._publish(user_id, "unread", {"unread": bucket.unread})
+        return item
+
+    def mark_read(self, user_id: str, notification_id: str) -> bool:
+        """Mark one notification as read. Returns False if it doesn't exist."""
+        bucket = self._users.get(user_id)
+        item = bucket.by_id.get(notification_id) if bucket else None
+        if item is None:
+            return False
+        if not item.get("read_at"):
+            item["read_at"] = datetime.utcnow().isoformat() + "Z"
+            bucket.unread -= 1
+            self._publish(user_id, "unread", {"unread": bucket.unread})
+        return True
+
+    def mark_all_read(self, user_id: str) -> int:
+        """Mark every unread notification as read; returns how many changed."""
+        bucket = self._users.get(user_id)
+        if not bucket or not bucket.unread:
+            return 0
+        now = datetime.utcnow().isoformat() + "Z"
+        changed = 0
+        # Unread items are usually the newest ones; stop once all of them were found.
+        for item in reversed(bucket.items):
+            if changed == bucket.unread:
+                break
+            if not item.get("read_at"):
+                item["read_at"] = now
+                changed += 1
+        bucket.unread = 0
+        self._publish(user_id, "unread", {"unread": 0})
+        return changed
+
+    # ---------- reads ----------
+    def unread_count(self, user_id: str) -> int:
+        bucket = self._users.get(user_id)
+        return bucket.unread if bucket else 0
+
+    def list(self, user_id: str, limit: int = 20, offset: int = 0, unread_only: bool = False) -> dict:
+        """Newest-first page of notifications."""
+        bucket = self._users.get(user_id)
+        if not bucket:
+            return {"notifications": [], "total": 0, "unread": 0, "next_offset": None}
+
+        newest_first = reversed(bucket.items)
+        if unread_only:
+            newest_first = (n for n in newest_first if not n.get("read_at"))
+            total = bucket.unread
+        else:
+            total = len(bucket.items)
+
+        page: List[dict] = list(islice(newest_first, offset, offset + limit))
+        next_offset = offset + limit if offset + limit < total else None
+        return {"notifications": page, "total": total, "unread": bucket.unread, "next_offset": next_offset}
+
+    # ---------- push channel ----------
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """Register a queue for live events; must be called from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
+        self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(user_id)
+        if not subs:
+            return
+        for entry in [e for e in subs if e[1] is queue]:
+            subs.discard(entry)
+        if not subs:
+            self._subscribers.pop(user_id, None)
+
+    def _publish(self, user_id: str, event: str, payload: dict) -> None:
+        # Writers may run on worker threads (graph runs), so always hop onto the subscriber's loop.
+        for loop, queue in list(self._subscribers.get(user_id, ())):
+            try:
+                loop.call_soon_threadsafe(_offer, queue, (event, payload))
+            except RuntimeError:
+                # Loop already closed; the subscriber is gone.
+                self.unsubscribe(user_id, queue)
+
+
+def _offer(queue: asyncio.Queue, message: tuple) -> None:
+    """Deliver without blocking; a slow client just misses intermediate events."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
@@ -0,0 +1,259 @@
+"""
+PDF rendering service for consultation exports.
+
+Rendering happens in a process pool so reportlab never blocks the event loop.
+Rendered bytes are cached in two tiers, keyed by
+(consultation_id, updated_at, TEMPLATE_VERSION):
+
+- an in-memory LRU bounded by total bytes
+- a disk directory that survives restarts and is shared by workers
+
+Any edit bumps `updated_at`, which changes the key, so no explicit
+invalidation is needed beyond cleaning up superseded files.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from src.utils.cache import LRUCache
+from src.utils.logging import get_logger
+
+log = get_logger("app.pdf")
+
+# PDF generation is optional. reportlab itself is only imported inside the
+# render workers, so the API process never pays for it.
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+
+# Bump whenever the layout below changes so cached files are not reused.
+TEMPLATE_VERSION = "1"
+
+CHUNK_SIZE = 64 * 1024
+
+_styles: Optional[dict] = None
+
+
+def _get_styles() -> dict:
+    """Build the stylesheet once per worker process."""
+    global _styles
+    if _styles is None:
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        base = getSampleStyleSheet()
+        _styles = {
+            "normal": base["Normal"],
+            "title": ParagraphStyle(
+                'CustomTitle',
+                parent=base['Heading1'],
+                fontSize=24,
+                textColor='#1a1a1a',
+                spaceAfter=30,
+                alignment=TA_CENTER
+            ),
+            "heading": ParagraphStyle(
+                'CustomHeading',
+                parent=base['Heading2'],
+                fontSize=16,
+                textColor='#2563eb',
+                spaceAfter=12,
+                spaceBefore=20
+            ),
+        }
+    return _styles
+
+
+def render_consultation_pdf(snapshot: dict) -> bytes:
+    """
+    Render one consultation report. Runs inside a pool worker, so it only takes
+    a plain dict (see `pdf_snapshot`) and returns the PDF bytes.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+    styles = _get_styles()
+    normal = styles["normal"]
+    heading_style = styles["heading"]
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    story = []
+
+    # Title
+    business_name = snapshot.get("business_name") or "Business Consultation"
+    story.append(Paragraph(f"Consultation Report: {business_name}", styles["title"]))
+    story.append(Spacer(1, 0.3*inch))
+
+    # Business Information
+    story.append(Paragraph("Business Information", heading_style))
+    business = snapshot.get("business", {})
+    story.append(Paragraph(f"<b>Type:</b> {business.get('business_type', 'N/A')}", normal))
+    story.append(Paragraph(f"<b>Stage:</b> {business.get('business_stage', 'N/A')}", normal))
+    if business.get('location'):
+        story.append(Paragraph(f"<b>Location:</b> {business.get('location')}", normal))
+    if business.get('team_size'):
+        story.append(Paragraph(f"<b>Team Size:</b> {business.get('team_size')}", normal))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Financial Information
+    story.append(Paragraph("Financial Overview", heading_style))
+    if business.get('monthly_revenue'):
+        story.append(Paragraph(f"<b>Monthly Revenue:</b> ${business.get('monthly_revenue'):,.2f}", normal))
+    if business.get('monthly_expenses'):
+        story.append(Paragraph(f"<b>Monthly Expenses:</b> ${business.get('monthly_expenses'):,.2f}", normal))
+    story.append(Paragraph(f"<b>Main Goal:</b> {business.get('main_goal', 'N/A')}", normal))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Strategy
+    story.append(PageBreak())
+    story.append(Paragraph("Strategic Recommendations", heading_style))
+    strategy = snapshot.get("refined_strategy") or "No strategy available."
+    # Clean markdown and split into paragraphs
+    for para in strategy.split('\n\n')[:20]:  # Limit to first 20 paragraphs
+        # Remove markdown headers
+        para = para.replace('#', '').strip()
+        if para:
+            story.append(Paragraph(para, normal))
+            story.append(Spacer(1, 0.1*inch))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def pdf_snapshot(consultation: dict) -> dict:
+    """The subset of a consultation the template needs (keeps pickling cheap)."""
+    return {
+        "business_name": consultation.get("business_name"),
+        "business": consultation.get("business") or {},
+        "refined_strategy": consultation.get("refined_strategy"),
+    }
+
+
+def cache_key(consultation: dict) -> str:
+    raw = f"{consultation['id']}|{consultation.get('updated_at', '')}|{TEMPLATE_VERSION}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+async def iter_chunks(data: bytes, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+class PdfRenderer:
+    """Cached, off-loop PDF rendering."""
+
+    def __init__(self, cache_dir: str, memory_bytes: int = 64 * 1024 * 1024, workers: int = 2):
+        self.cache_dir = Path(cache_dir)
+        self.workers = max(1, workers)
+        self.memory = LRUCache(maxsize=10_000, max_weight=memory_bytes, weigher=len)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: set = set()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers must not inherit the server's threads/sockets
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _path(self, consultation_id: str, key: str) -> Path:
+        return self.cache_dir / f"{consultation_id}-{key}.pdf"
+
+    async def get(self, consultation: dict) -> tuple[str, bytes]:
+        """Return (key, pdf_bytes), rendering at most once per key even under concurrent requests."""
+        key = cache_key(consultation)
+        data = self.memory.get(key)
+        if data is not None:
+            return key, data
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return key, await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            path = self._path(consultation["id"], key)
+            data = await asyncio.to_thread(_read_file, path)
+            if data is None:
+                try:
+                    data = await loop.run_in_executor(
+                        self._get_pool(), render_consultation_pdf, pdf_snapshot(consultation)
+                    )
+                except BrokenProcessPool:
+                    # A worker died (OOM, killed); start a fresh pool next time.
+                    self.shutdown()
+                    raise
+                await asyncio.to_thread(self._write_disk, consultation["id"], path, data)
+            self.memory.set(key, data)
+            future.set_result(data)
+            return key, data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; mark the exception as retrieved.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def prerender(self, consultation: dict) -> None:
+        """Fire-and-forget render so the first download is a cache hit."""
+        task = asyncio.create_task(self.get(dict(consultation)))
+        self._background.add(task)
+        task.add_done_callback(_finish_background(self._background))
+
+    def discard(self, consultation_id: str) -> None:
+        """Forget every cached rendering of a consultation (e.g. on delete)."""
+        for p in self._files_for(consultation_id):
+            p.unlink(missing_ok=True)
+        # Memory keys are digests, so they simply age out of the LRU.
+
+    def _files_for(self, consultation_id: str) -> list:
+        return [
+            p for p in self.cache_dir.glob(f"{consultation_id}-*.pdf")
+            if p.stem.rsplit("-", 1)[0] == consultation_id
+        ]
+
+    def _write_disk(self, consultation_id: str, path: Path, data: bytes) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Remove renderings of older versions of this consultation
+        for old in self._files_for(consultation_id):
+            if old != path:
+                old.unlink(missing_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _read_file(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _finish_background(tasks: set):
+    def done(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("pdf_prerender_failed", error=str(task.exception()))
+    return done
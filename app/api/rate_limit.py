@@ -0,0 +1,240 @@
+"""
+Per-user / per-IP rate limiting.
+
+Pure ASGI middleware in front of the routes: each request is put in a route
+class (login/signup, consultation runs, exports, the rest of the API) and
+charged to a token bucket keyed by the signed-in user, or by client IP for
+anonymous requests. Bucket sizes come from the user's subscription tier
+(RATE_LIMITS in settings, "requests/seconds": a burst of `requests`, refilled
+evenly over `seconds`). A request over its limit gets a 429 straight from the
+middleware, before the body is read or any handler (PBKDF2, the graph, PDF
+rendering) runs.
+
+Responses on limited routes carry the IETF draft headers RateLimit-Limit,
+RateLimit-Remaining, RateLimit-Reset (seconds until the bucket is full again)
+and RateLimit-Policy; 429s add Retry-After.
+
+A bucket is two floats in a dict keyed by (route class, user or IP). A full
+bucket is the same as no bucket, so a sweep at most every `sweep_seconds`
+drops every bucket that has refilled, and memory tracks recently active
+clients only. All state lives on the event loop thread (no locks).
+"""
+import json
+import math
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logging import get_logger
+
+log = get_logger("app.api")
+
+ANONYMOUS = "anonymous"
+
+# (method, path pattern, route class); first match wins, unmatched requests are not limited
+ROUTE_CLASSES: Tuple[Tuple[str, "re.Pattern", str], ...] = (
+    ("POST", re.compile(r"/api/auth/(login|signup)"), "auth"),
+    ("POST", re.compile(r"/api/consultations"), "consultations"),
+    ("GET", re.compile(r"/api/consultations/(export|[^/]+/export/pdf)"), "export"),
+    ("*", re.compile(r"/api/(?!health$).*"), "api"),
+)
+
+
+class Limit:
+    __slots__ = ("requests", "seconds", "rate", "policy")
+
+    def __init__(self, requests: int, seconds: float):
+        if requests < 1 or seconds <= 0:
+            raise ValueError("rate limits need requests >= 1 and seconds > 0")
+        self.requests = requests
+        self.seconds = seconds
+        self.rate = requests / seconds  # tokens per second
+        self.policy = f"{requests};w={seconds:g}".encode("latin-1")
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """"20/60" -> 20 requests per 60 seconds."""
+        requests, _, seconds = spec.partition("/")
+        return cls(int(requests), float(seconds or 1))
+
+
+class Decision:
+    __slots__ = ("allowed", "limit", "remaining", "reset", "retry_after")
+
+    def __init__(self, allowed: bool, limit: Limit, remaining: int, reset: int, retry_after: int):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def headers(self) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (b"ratelimit-limit", str(self.limit.requests).encode()),
+            (b"ratelimit-remaining", str(self.remaining).encode()),
+            (b"ratelimit-reset", str(self.reset).encode()),
+            (b"ratelimit-policy", self.limit.policy),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", str(self.retry_after).encode()))
+        return headers
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Dict[str, str]], sweep_seconds: float = 60.0, enabled: bool = True):
+        # route class -> tier -> Limit; a tier missing from a class falls back to the class's "default"
+        self.limits = {
+            route: {tier: Limit.parse(spec) for tier, spec in tiers.items()}
+            for route, tiers in limits.items()
+        }
+        self.sweep_seconds = sweep_seconds
+        self.enabled = enabled
+        self._buckets: Dict[Tuple[str, str], List[float]] = {}  # -> [tokens, updated_at]
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def limit_for(self, route: str, tier: str) -> Optional[Limit]:
+        tiers = self.limits.get(route)
+        if not tiers:
+            return None
+        return tiers.get(tier) or tiers.get("default")
+
+    def hit(self, route: str, key: str, limit: Limit, now: Optional[float] = None) -> Decision:
+        """Take one token from the (route, key) bucket."""
+        now = time.monotonic() if now is None else now
+        if now >= self._next_sweep:
+            self.compact(now)
+        bucket = self._buckets.get((route, key))
+        if bucket is None:
+            bucket = self._buckets[(route, key)] = [float(limit.requests), now]
+        else:
+            # Capped at the current limit, so a downgraded tier takes effect at once
+            bucket[0] = min(float(limit.requests), bucket[0] + (now - bucket[1]) * limit.rate)
+            bucket[1] = now
+        allowed = bucket[0] >= 1.0
+        if allowed:
+            bucket[0] -= 1.0
+        tokens = bucket[0]
+        return Decision(
+            allowed,
+            limit,
+            remaining=int(tokens),
+            reset=math.ceil((limit.requests - tokens) / limit.rate),
+            retry_after=0 if allowed else max(1, math.ceil((1.0 - tokens) / limit.rate)),
+        )
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Drop buckets that have refilled completely; returns how many were dropped."""
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self.sweep_seconds
+        # Longest refill time of any limit: a bucket idle that long is certainly full
+        idle = max((l.seconds for tiers in self.limits.values() for l in tiers.values()), default=0.0)
+        stale = [key for key, (_, updated) in self._buckets.items() if now - updated >= idle]
+        for key in stale:
+            del self._buckets[key]
+        return len(stale)
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def route_class(method: str, path: str, classes: Iterable = ROUTE_CLASSES) -> Optional[str]:
+    for route_method, pattern, name in classes:
+        if (route_method == "*" or route_method == method) and pattern.fullmatch(path):
+            return name
+    return None
+
+
+def _cookie(headers, name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key == b"cookie":
+            for part in value.split(b";"):
+                k, _, v = part.strip().partition(b"=")
+                if k == name:
+                    return v.decode("latin-1")
+    return None
+
+
+def client_ip(scope, trust_forwarded: bool = False, trusted_proxies: int = 1) -> str:
+    """
+    The peer address, or behind `trusted_proxies` proxies the X-Forwarded-For entry that many
+    hops from the right: proxies append the peer they saw, so entries further left are whatever
+    the client sent and must not pick the bucket.
+    """
+    if trust_forwarded and trusted_proxies > 0:
+        forwarded = [
+            entry.strip()
+            for key, value in scope.get("headers", ())
+            if key == b"x-forwarded-for"
+            for entry in value.split(b",")
+        ]
+        if len(forwarded) >= trusted_proxies and forwarded[-trusted_proxies]:
+            return forwarded[-trusted_proxies].decode("latin-1")
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """
+    `identify(session_id)` returns (user_id, tier) for a valid session or None.
+    Login and signup are always keyed by IP (their callers have no session yet).
+    """
+
+    def __init__(
+            self,
+            app,
+            limiter: RateLimiter,
+            identify: Callable[[str], Optional[Tuple[str, str]]],
+            trust_forwarded: bool = False,
+            trusted_proxies: int = 1,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.identify = identify
+        self.trust_forwarded = trust_forwarded
+        self.trusted_proxies = trusted_proxies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+        route = route_class(scope["method"], scope["path"])
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        identity = None
+        if route != "auth":
+            session_id = _cookie(scope.get("headers", ()), b"session_id")
+            identity = self.identify(session_id) if session_id else None
+        if identity is not None:
+            key, tier = f"u:{identity[0]}", identity[1]
+        else:
+            key, tier = f"ip:{client_ip(scope, self.trust_forwarded, self.trusted_proxies)}", ANONYMOUS
+
+        limit = self.limiter.limit_for(route, tier)
+        if limit is None:
+            return await self.app(scope, receive, send)
+        decision = self.limiter.hit(route, key, limit)
+
+        if not decision.allowed:
+            log.info("rate_limited", route=route, key=key, tier=tier, retry_after=decision.retry_after)
+            body = json.dumps({"detail": "Too many requests; please slow down."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    *decision.headers(),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *decision.headers()]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,401 @@
+"""
+Compact in-memory consultation records.
+
+A stored consultation is a `ConsultationRecord`: a __slots__ object that reads
+and writes like the dict it replaces (MutableMapping), so handlers, the PDF
+renderer and session memory use it unchanged. Responses go through `to_dict()`.
+
+- Small fields live in slots; status, plan, model and user id are interned
+  strings shared by every record.
+- The large fields (business, refined_strategy, visualization_code,
+  strategy_sections, trace) are packed: UTF-8 / compact JSON, compressed
+  (zstd when installed, else zlib) above `compress_min_bytes`, and decoded
+  on each access. Nested values are therefore copies: assign the whole field
+  to change it.
+- `ConsultationStore.spill_cold()` moves the packed fields of records not
+  accessed for `cold_after_seconds` to append-only segment files; the record
+  keeps a (segment, offset, length) reference. A cold record is read back
+  with one pread, and `get()` moves it back into memory. Segments whose
+  records have all been loaded back or deleted are unlinked.
+
+Records themselves still live only in this process; segments are scratch
+files, cleared at startup. All access is from the event loop thread.
+"""
+import json
+import os
+import sys
+import time
+import zlib
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zlib (stdlib) is used instead
+    zstandard = None
+
+# Key order of the API's consultation JSON; a field is present once it was set
+FIELDS = (
+    "id", "user_id", "status", "created_at", "updated_at", "business", "plan_used",
+    "refined_strategy", "visualization_code", "refinement_count", "strategy_sections",
+    "critique_score", "business_name", "industry", "target_revenue_usd", "processing_time",
+    "model_used", "feedback", "trace", "cancel_reason",
+)
+PACKED_FIELDS = ("business", "refined_strategy", "visualization_code", "strategy_sections", "trace")
+_INTERNED = {"user_id", "status", "plan_used", "model_used"}
+
+_UNSET = object()    # field never set (absent from the mapping)
+_ON_DISK = object()  # packed field of a cold record
+
+# Header byte of a packed value
+_JSON, _ZLIB, _ZSTD = 0x01, 0x02, 0x04
+# Cold blob: per packed field a 4-byte length (NONE / ABSENT markers), then the bytes
+_NONE, _ABSENT = 0, 0xFFFFFFFF
+
+_zstd_compressor = zstandard.ZstdCompressor(level=6) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def _pack(value: Any, compress_min_bytes: int) -> Optional[bytes]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        flags, raw = 0, value.encode("utf-8")
+    else:
+        flags, raw = _JSON, json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) >= compress_min_bytes:
+        if _zstd_compressor is not None:
+            flags, raw = flags | _ZSTD, _zstd_compressor.compress(raw)
+        else:
+            flags, raw = flags | _ZLIB, zlib.compress(raw, 6)
+    return bytes((flags,)) + raw
+
+
+def _unpack(packed: Optional[bytes]) -> Any:
+    if packed is None:
+        return None
+    flags, raw = packed[0], packed[1:]
+    if flags & _ZSTD:
+        raw = _zstd_decompressor.decompress(raw)
+    elif flags & _ZLIB:
+        raw = zlib.decompress(raw)
+    return json.loads(raw) if flags & _JSON else raw.decode("utf-8")
+
+
+def _join_cold(packed: List[Any]) -> bytes:
+    parts = []
+    for value in packed:
+        if value is _UNSET:
+            parts.append(_ABSENT.to_bytes(4, "little"))
+        elif value is None:
+            parts.append(_NONE.to_bytes(4, "little"))
+        else:
+            parts += [len(value).to_bytes(4, "little"), value]
+    return b"".join(parts)
+
+
+def _split_cold(blob: bytes) -> List[Any]:
+    values, pos = [], 0
+    for _ in PACKED_FIELDS:
+        size = int.from_bytes(blob[pos:pos + 4], "little")
+        pos += 4
+        if size == _ABSENT:
+            values.append(_UNSET)
+        elif size == _NONE:
+            values.append(None)
+        else:
+            values.append(blob[pos:pos + size])
+            pos += size
+    return values
+
+
+class ConsultationRecord(MutableMapping):
+    __slots__ = tuple(f"_{name}" for name in FIELDS) + ("_extra", "_cold", "_store", "touched")
+
+    def __init__(self, store: "ConsultationStore", data: Dict[str, Any]):
+        for name in FIELDS:
+            setattr(self, f"_{name}", _UNSET)
+        self._extra: Optional[dict] = None
+        self._cold: Optional[Tuple[int, int, int]] = None
+        self._store = store
+        self.touched = time.monotonic()
+        for key, value in data.items():
+            self[key] = value
+
+    # --- mapping protocol
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT:
+            value = getattr(self, _SLOT[key])
+            if value is _ON_DISK:
+                value = self._store._read_cold(self)[_PACKED_INDEX[key]]
+            if value is _UNSET:
+                raise KeyError(key)
+            return _unpack(value) if key in _PACKED_INDEX else value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.touched = time.monotonic()
+        if key in _PACKED_INDEX:
+            if self._cold is not None:
+                self._store._load(self)
+            value = _pack(value, self._store.compress_min_bytes)
+        elif key in _INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        if key in _SLOT:
+            setattr(self, _SLOT[key], value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key in _PACKED_INDEX and self._cold is not None:
+            self._store._load(self)
+        if key in _SLOT:
+            setattr(self, _SLOT[key], _UNSET)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOT:
+            value = getattr(self, _SLOT[key])
+            if value is _ON_DISK:
+                value = self._store._read_cold(self)[_PACKED_INDEX[key]]
+            return value is not _UNSET
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        cold = self._store._read_cold(self) if self._cold is not None else None
+        for name in FIELDS:
+            value = getattr(self, _SLOT[name])
+            if value is _ON_DISK:
+                value = cold[_PACKED_INDEX[name]]
+            if value is not _UNSET:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"<ConsultationRecord {self._id} {self._status}{' cold' if self._cold else ''}>"
+
+    # --- bulk access
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of every field (one disk read for a cold record)."""
+        cold = self._store._read_cold(self) if self._cold is not None else None
+        out = {}
+        for name in FIELDS:
+            value = getattr(self, _SLOT[name])
+            if value is _ON_DISK:
+                value = cold[_PACKED_INDEX[name]]
+            if value is _UNSET:
+                continue
+            out[name] = _unpack(value) if name in _PACKED_INDEX else value
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+    def _packed(self) -> List[Any]:
+        return [getattr(self, _SLOT[name]) for name in PACKED_FIELDS]
+
+    def packed_bytes(self) -> int:
+        return sum(len(v) for v in self._packed() if isinstance(v, bytes))
+
+
+_SLOT = {name: f"_{name}" for name in FIELDS}
+_PACKED_INDEX = {name: i for i, name in enumerate(PACKED_FIELDS)}
+
+
+class _Segments:
+    """Append-only spill files; a segment is unlinked once none of its records are cold any more."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".seg"):  # left over from an earlier process; records are in memory only
+                os.remove(os.path.join(directory, name))
+        self._fds: Dict[int, int] = {}
+        self._live: Dict[int, int] = {}
+        self._current = -1
+        self._size = 0
+        self.bytes = 0
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:06d}.seg")
+
+    def _rotate(self) -> None:
+        previous = self._current
+        self._current += 1
+        self._size = 0
+        self._fds[self._current] = os.open(self._path(self._current), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._live[self._current] = 0
+        if previous >= 0 and self._live.get(previous) == 0:
+            self._unlink(previous)
+
+    def write(self, blobs: List[bytes]) -> List[Tuple[int, int, int]]:
+        """Append `blobs` (one write per segment); returns their (segment, offset, length)."""
+        refs: List[Tuple[int, int, int]] = []
+        pending: List[bytes] = []
+        for blob in blobs:
+            if self._current < 0 or (self._size and self._size + len(blob) > self.max_bytes):
+                self._flush(pending)
+                pending = []
+                self._rotate()
+            refs.append((self._current, self._size, len(blob)))
+            pending.append(blob)
+            self._size += len(blob)
+            self._live[self._current] += len(blob)
+            self.bytes += len(blob)
+        self._flush(pending)
+        return refs
+
+    def _flush(self, pending: List[bytes]) -> None:
+        if pending:
+            data = memoryview(b"".join(pending))
+            while data:
+                data = data[os.write(self._fds[self._current], data):]
+
+    def read(self, ref: Tuple[int, int, int]) -> bytes:
+        segment, offset, length = ref
+        return os.pread(self._fds[segment], length, offset)
+
+    def release(self, ref: Tuple[int, int, int]) -> None:
+        segment, _, length = ref
+        self._live[segment] -= length
+        self.bytes -= length
+        if self._live[segment] == 0 and segment != self._current:
+            self._unlink(segment)
+
+    def _unlink(self, segment: int) -> None:
+        os.close(self._fds.pop(segment))
+        self._live.pop(segment, None)
+        try:
+            os.remove(self._path(segment))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        for segment in list(self._fds):
+            self._unlink(segment)
+        self._current = -1
+
+
+class ConsultationStore:
+    """
+    consultation id -> ConsultationRecord. `get` counts as an access (and loads
+    a cold record back); `peek` and `values` do not, so listings and exports
+    never pull the whole history back into memory.
+    """
+
+    def __init__(
+            self,
+            spill_dir: Optional[str] = None,
+            cold_after_seconds: float = 1800.0,
+            compress_min_bytes: int = 256,
+            segment_max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.cold_after_seconds = cold_after_seconds
+        self.compress_min_bytes = compress_min_bytes
+        self._records: Dict[str, ConsultationRecord] = {}
+        self._segments = _Segments(spill_dir, segment_max_bytes) if spill_dir else None
+
+    def add(self, data: Dict[str, Any]) -> ConsultationRecord:
+        """Store a consultation given as a dict; returns the record (keep using it, not the dict)."""
+        record = ConsultationRecord(self, data)
+        self.discard(record["id"])
+        self._records[record["id"]] = record
+        return record
+
+    def get(self, consultation_id: str, default: Any = None) -> Optional[ConsultationRecord]:
+        record = self._records.get(consultation_id)
+        if record is None:
+            return default
+        record.touched = time.monotonic()
+        if record._cold is not None:
+            self._load(record)
+        return record
+
+    def peek(self, consultation_id: str) -> Optional[ConsultationRecord]:
+        return self._records.get(consultation_id)
+
+    def values(self) -> Iterator[ConsultationRecord]:
+        return iter(list(self._records.values()))
+
+    def discard(self, consultation_id: str) -> None:
+        record = self._records.pop(consultation_id, None)
+        if record is not None and record._cold is not None:
+            # Someone may still hold the record (an export awaiting its PDF): bring the packed
+            # fields back before the segment space goes, so the record stays readable
+            self._load(record)
+
+    def __getitem__(self, consultation_id: str) -> ConsultationRecord:
+        record = self.get(consultation_id)
+        if record is None:
+            raise KeyError(consultation_id)
+        return record
+
+    def __setitem__(self, consultation_id: str, value: Any) -> None:
+        if value is not self._records.get(consultation_id):
+            self.add({**value, "id": consultation_id})
+
+    def __delitem__(self, consultation_id: str) -> None:
+        if consultation_id not in self._records:
+            raise KeyError(consultation_id)
+        self.discard(consultation_id)
+
+    def __contains__(self, consultation_id: object) -> bool:
+        return consultation_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # --- cold tier
+    def spill_cold(self, now: Optional[float] = None) -> int:
+        """Move the packed fields of records idle for `cold_after_seconds` to disk; returns how many moved."""
+        if self._segments is None:
+            return 0
+        cutoff = (time.monotonic() if now is None else now) - self.cold_after_seconds
+        cold = [
+            r for r in self._records.values()
+            if r._cold is None and r.touched <= cutoff and r._status != "processing" and r.packed_bytes()
+        ]
+        if not cold:
+            return 0
+        refs = self._segments.write([_join_cold(r._packed()) for r in cold])
+        for record, ref in zip(cold, refs):
+            record._cold = ref
+            for name in PACKED_FIELDS:
+                setattr(record, _SLOT[name], _ON_DISK)
+        return len(cold)
+
+    def _read_cold(self, record: ConsultationRecord) -> List[Any]:
+        return _split_cold(self._segments.read(record._cold))
+
+    def _load(self, record: ConsultationRecord) -> None:
+        values = self._read_cold(record)
+        self._segments.release(record._cold)
+        record._cold = None
+        for name, value in zip(PACKED_FIELDS, values):
+            setattr(record, _SLOT[name], value)
+
+    def stats(self) -> Dict[str, int]:
+        cold = sum(1 for r in self._records.values() if r._cold is not None)
+        return {
+            "records": len(self._records),
+            "cold": cold,
+            "packed_bytes": sum(r.packed_bytes() for r in self._records.values()),
+            "segment_bytes": self._segments.bytes if self._segments else 0,
+        }
+
+    def close(self) -> None:
+        """At shutdown: drop the spill files (the records go with the process anyway)."""
+        if self._segments is not None:
+            self._segments.close()
@@ -0,0 +1,59 @@
+"""
+Per-request logging context.
+
+Pure ASGI middleware (not BaseHTTPMiddleware) so the endpoint runs in the same
+task and context: anything it binds (user_id, consultation_id) shows up on the
+closing request line too.
+"""
+import time
+import uuid
+
+from src.utils.logging import bind_context, clear_context, get_logger
+
+log = get_logger("app.request")
+
+
+class RequestContextMiddleware:
+    def __init__(self, app, slow_request_ms: float = 2000.0):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        clear_context()
+        bind_context(request_id=request_id)
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        except Exception:
+            log.exception("request_failed", method=scope["method"], path=scope["path"])
+            raise
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            fields = {"method": scope["method"], "path": scope["path"], "status": status_code, "duration_ms": duration_ms}
+            if duration_ms >= self.slow_request_ms:
+                log.warning("slow_request", **fields)
+            elif status_code >= 500:
+                log.error("request", **fields)
+            else:
+                # High volume: debug level, sampled
+                log.debug("request", **fields)
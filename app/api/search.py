@@ -0,0 +1,140 @@
+"""
+Full-text search over each user's consultations.
+
+An in-memory inverted index, one per user, over business_name, industry,
+business_type, main_goal and refined_strategy. Field weights are applied as
+repeated term counts (a word in the business name counts 3x a word in the
+strategy). The index is maintained incrementally: `add` (re)indexes one
+consultation when it is created, completes, is cancelled or edited; `remove`
+drops it on delete. Queries only touch the postings of the query terms for
+that user, so they never read strategies and their cost does not grow with
+other users' data.
+
+Scoring is BM25 over the user's consultations. Every query term of at least
+MIN_PREFIX characters also matches the indexed terms it is a prefix of
+("coff" -> coffee, coffeehouse), found by bisecting the user's sorted term
+list; per query term a consultation counts its best-scoring match.
+All state lives on the event loop thread.
+"""
+import bisect
+import heapq
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.terms import BM25_B, BM25_K1, tokenize
+
+FIELD_WEIGHTS = {"business_name": 3, "industry": 2, "business_type": 2, "main_goal": 2, "refined_strategy": 1}
+MIN_PREFIX = 2
+MAX_PREFIX_TERMS = 64
+
+
+def document_fields(consultation) -> Dict[str, str]:
+    business = consultation.get("business") or {}
+    return {
+        "business_name": consultation.get("business_name") or "",
+        "industry": consultation.get("industry") or "",
+        "business_type": business.get("business_type") or "",
+        "main_goal": business.get("main_goal") or "",
+        "refined_strategy": consultation.get("refined_strategy") or "",
+    }
+
+
+class _UserIndex:
+    __slots__ = ("postings", "terms", "docs", "total_len")
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> consultation id -> weighted tf
+        self.terms: List[str] = []  # sorted vocabulary, for prefix lookups
+        self.docs: Dict[str, Tuple[int, Tuple[str, ...]]] = {}  # consultation id -> (length, terms)
+        self.total_len = 0
+
+    def add(self, consultation_id: str, counts: Counter) -> None:
+        self.remove(consultation_id)
+        length = sum(counts.values())
+        for term, tf in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                bisect.insort(self.terms, term)
+            posting[consultation_id] = tf
+        self.docs[consultation_id] = (length, tuple(counts))
+        self.total_len += length
+
+    def remove(self, consultation_id: str) -> bool:
+        doc = self.docs.pop(consultation_id, None)
+        if doc is None:
+            return False
+        length, terms = doc
+        self.total_len -= length
+        for term in terms:
+            posting = self.postings[term]
+            del posting[consultation_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+        return True
+
+    def expand(self, token: str) -> List[str]:
+        """The token itself (if indexed) and up to MAX_PREFIX_TERMS indexed terms starting with it."""
+        if len(token) < MIN_PREFIX:
+            return [token] if token in self.postings else []
+        start = bisect.bisect_left(self.terms, token)
+        stop = min(len(self.terms), start + MAX_PREFIX_TERMS)
+        end = bisect.bisect_left(self.terms, token + "\uffff", start, stop)
+        return self.terms[start:end]
+
+
+class ConsultationSearchIndex:
+    def __init__(self):
+        self._users: Dict[str, _UserIndex] = {}
+        self._owner: Dict[str, str] = {}  # consultation id -> user id
+
+    def add(self, consultation) -> None:
+        """Index (or re-index) one consultation under its user."""
+        counts: Counter = Counter()
+        for field, text in document_fields(consultation).items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                counts[term] += weight
+        consultation_id, user_id = consultation["id"], consultation["user_id"]
+        self._owner[consultation_id] = user_id
+        self._users.setdefault(user_id, _UserIndex()).add(consultation_id, counts)
+
+    def remove(self, consultation_id: str) -> None:
+        user_id = self._owner.pop(consultation_id, None)
+        index = self._users.get(user_id) if user_id else None
+        if index is not None and index.remove(consultation_id) and not index.docs:
+            del self._users[user_id]
+
+    def search(self, user_id: str, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Best `limit` (consultation id, score) pairs for the user, highest score first (newest on ties)."""
+        index = self._users.get(user_id)
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if index is None or not tokens:
+            return []
+        n_docs = len(index.docs)
+        avgdl = index.total_len / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for token in tokens:
+            best: Dict[str, float] = {}
+            for term in index.expand(token):
+                posting = index.postings[term]
+                df = len(posting)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for consultation_id, tf in posting.items():
+                    length = index.docs[consultation_id][0]
+                    score = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl))
+                    if score > best.get(consultation_id, 0.0):
+                        best[consultation_id] = score
+            for consultation_id, score in best.items():
+                scores[consultation_id] = scores.get(consultation_id, 0.0) + score
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def stats(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        users = [self._users[user_id]] if user_id in self._users else [] if user_id else list(self._users.values())
+        return {
+            "consultations": sum(len(u.docs) for u in users),
+            "terms": sum(len(u.postings) for u in users),
+            "postings": sum(len(p) for u in users for p in u.postings.values()),
+        }
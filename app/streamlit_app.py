@@ -1,11 +1,123 @@
+import hashlib
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import plotly.io as pio
 import streamlit as st
-import json
-from pathlib import Path
 
-from src.graphs.main_consultant_graph import graph
+from src.config.settings import settings
+from src.graphs.main_consultant_graph import get_graph
 from src.graphs.state import AgentState, BusinessInfo
+from src.utils.figure_sandbox import FigureRenderer, UnsafeCodeError
 from langchain_core.messages import HumanMessage
 
+NODE_LABELS = {
+    "generate": "Drafting strategy",
+    "critique": "Critiquing",
+    "refine": "Refining",
+    "visualize": "Building charts",
+}
+MAX_REMEMBERED_RUNS = 64
+
+
+@st.cache_resource
+def get_consultant_graph():
+    # Built once per Streamlit server (agents + compiled LangGraph)
+    return get_graph()
+
+
+@st.cache_resource
+def get_figure_renderer() -> FigureRenderer:
+    # One sandbox pool per Streamlit server, shared by all sessions
+    return FigureRenderer(
+        workers=settings.FIGURE_WORKERS,
+        timeout_seconds=settings.FIGURE_TIMEOUT_SECONDS,
+        cpu_seconds=settings.FIGURE_CPU_SECONDS,
+        memory_mb=settings.FIGURE_MEMORY_MB,
+    )
+
+
+class ConsultationRun:
+    """One graph run in a background thread; the script only reads its fields."""
+
+    def __init__(self, key: str, max_rounds: int):
+        self.key = key
+        self.max_rounds = max_rounds
+        self.steps: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.done = threading.Event()
+
+    @property
+    def expected_steps(self) -> int:
+        # generate + (critique, refine) per round + visualize; an upper bound
+        return 2 + 2 * self.max_rounds
+
+    def run(self, graph, initial_state: AgentState) -> None:
+        try:
+            config = {"configurable": {"thread_id": f"streamlit_{self.key}"}}
+            state: Dict[str, Any] = {}
+            for update in graph.stream(initial_state, config, stream_mode="updates"):
+                for node, node_state in update.items():
+                    self.steps.append(node)
+                    state = node_state or state
+            self.result = {
+                "refined_strategy": state.get("refined_strategy") or "",
+                "visualization_code": state.get("visualization_code") or "",
+                "critique_score": state.get("critique_score"),
+                "rounds": state.get("current_refinement_round", 0),
+            }
+        except Exception:
+            self.error = traceback.format_exc()
+        finally:
+            self.finished = time.monotonic()
+            self.done.set()
+
+
+@st.cache_resource
+def get_run_registry() -> Tuple[threading.Lock, "OrderedDict[str, ConsultationRun]"]:
+    # Shared across sessions: identical inputs reuse the running or finished run
+    return threading.Lock(), OrderedDict()
+
+
+def start_or_reuse_run(key: str, initial_state: AgentState, max_rounds: int) -> ConsultationRun:
+    lock, runs = get_run_registry()
+    with lock:
+        run = runs.get(key)
+        if run is not None and run.error is None:
+            runs.move_to_end(key)
+            return run
+        run = ConsultationRun(key, max_rounds)
+        runs[key] = run
+        while len(runs) > MAX_REMEMBERED_RUNS:
+            oldest = next(iter(runs))
+            if not runs[oldest].done.is_set():
+                break
+            runs.popitem(last=False)
+    # Resolve cached resources here: the worker thread has no Streamlit script context
+    graph = get_consultant_graph()
+    threading.Thread(target=run.run, args=(graph, initial_state), daemon=True).start()
+    return run
+
+
+def input_key(business: BusinessInfo, max_rounds: int) -> str:
+    return hashlib.sha256(f"{business.model_dump_json()}|{max_rounds}".encode("utf-8")).hexdigest()[:16]
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def render_figure(code: str) -> Tuple[Optional[str], Optional[str]]:
+    """(figure JSON, error) for generated chart code; memoized by the code itself."""
+    try:
+        return get_figure_renderer().render(code), None
+    except (UnsafeCodeError, RuntimeError) as e:
+        return None, str(e)
+
+
 # ── Page config ──────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="AI Business Consultant",
@@ -61,76 +173,93 @@ with st.form("business_form"):
 
 # ── Processing when form is submitted ────────────────────────────────────────
 if submitted:
-    with st.spinner("Running full multi-agent consultation... (this may take 30–90 seconds)"):
-        try:
-            # Prepare business info
-            business = BusinessInfo(
-                business_type=business_type.strip(),
-                business_stage=business_stage,
-                location=location.strip() or None,
-                team_size=int(team_size),
-                monthly_revenue=monthly_revenue if monthly_revenue > 0 else None,
-                monthly_expenses=monthly_expenses if monthly_expenses > 0 else None,
-                main_goal=main_goal.strip(),
-                other_goals=[g.strip() for g in other_goals if g.strip()]
-            )
-
-            initial_state = AgentState(
-                business=business,
-                messages=[HumanMessage(content=f"Help me with: {main_goal}")],
-                needs_refinement=True,
-                max_refinement_rounds=max_rounds,
-                current_refinement_round=0
-            )
-
-            config = {"configurable": {"thread_id": "streamlit_session_" + str(hash(main_goal))[:8]}}
-
-            # Run the graph
-            final_state = None
-            strategy_output = ""
-            viz_code = ""
-
-            for event in graph.stream(initial_state, config, stream_mode="values"):
-                if "refined_strategy" in event and event["refined_strategy"]:
-                    strategy_output = event["refined_strategy"]
-                if "visualization_code" in event and event["visualization_code"]:
-                    viz_code = event["visualization_code"]
-                final_state = event
-
-            # ── Results display ──────────────────────────────────────────────────────
-            st.success("Consultation complete!")
-
-            tab1, tab2 = st.tabs(["📋 Strategy", "📊 Visualizations"])
-
-            with tab1:
-                st.markdown("### Final Refined Strategy")
-                st.markdown(strategy_output)
-
-            with tab2:
-                st.markdown("### Generated Visualizations")
-                if viz_code:
-                    try:
-                        # Execute the generated code safely in limited scope
-                        local_vars = {}
-                        exec(viz_code, {"px": __import__("plotly.express"),
-                                        "pd": __import__("pandas"),
-                                        "go": __import__("plotly.graph_objects")}, local_vars)
-
-                        if "fig" in local_vars:
-                            st.plotly_chart(local_vars["fig"], use_container_width=True)
-                        else:
-                            st.code(viz_code, language="python")
-                            st.info("Chart code generated — you can copy & run it locally.")
-                    except Exception as e:
-                        st.error("Could not render chart automatically")
-                        st.code(viz_code, language="python")
-                        st.caption(f"Error: {str(e)}")
-                else:
-                    st.info("No visualization was generated this time.")
-
-        except Exception as e:
-            st.error(f"An error occurred during processing")
-            st.exception(e)
+    try:
+        business = BusinessInfo(
+            business_type=business_type.strip(),
+            business_stage=business_stage,
+            location=location.strip() or None,
+            team_size=int(team_size),
+            monthly_revenue=monthly_revenue if monthly_revenue > 0 else None,
+            monthly_expenses=monthly_expenses if monthly_expenses > 0 else None,
+            main_goal=main_goal.strip(),
+            other_goals=[g.strip() for g in other_goals if g.strip()]
+        )
+        initial_state = AgentState(
+            business=business,
+            messages=[HumanMessage(content=f"Help me with: {main_goal}")],
+            needs_refinement=True,
+            max_refinement_rounds=max_rounds,
+            current_refinement_round=0
+        )
+        key = input_key(business, max_rounds)
+        st.session_state["run_key"] = key
+        if key not in st.session_state.setdefault("results", {}):
+            start_or_reuse_run(key, initial_state, max_rounds)
+    except Exception as e:
+        st.error("Invalid business details")
+        st.exception(e)
+
+
+def current_run() -> Optional[ConsultationRun]:
+    key = st.session_state.get("run_key")
+    return get_run_registry()[1].get(key) if key else None
+
+
+@st.fragment(run_every=1.0)
+def show_progress() -> None:
+    """Polls the background run; only this fragment reruns while the graph works."""
+    run = current_run()
+    if run is None:
+        return
+    if run.done.is_set():
+        st.rerun(scope="app")
+    steps = list(run.steps)
+    progress = min(len(steps) / run.expected_steps, 0.95)
+    label = NODE_LABELS.get(steps[-1], steps[-1]) + " done" if steps else "Starting"
+    st.progress(progress, text=f"{label} · {time.monotonic() - run.started:.0f}s")
+    st.caption(" → ".join(NODE_LABELS.get(s, s) for s in steps) or "Running full multi-agent consultation (30–90 seconds)")
+
+
+# ── Results display ──────────────────────────────────────────────────────────
+run_key = st.session_state.get("run_key")
+results = st.session_state.setdefault("results", {})
+if run_key and run_key not in results:
+    run = current_run()
+    if run is not None and run.done.is_set():
+        if run.error:
+            st.error("An error occurred during processing")
+            st.code(run.error)
+        else:
+            results[run_key] = run.result
+    elif run is not None:
+        show_progress()
+
+result = results.get(run_key) if run_key else None
+if result:
+    st.success("Consultation complete!")
+
+    tab1, tab2 = st.tabs(["📋 Strategy", "📊 Visualizations"])
+
+    with tab1:
+        st.markdown("### Final Refined Strategy")
+        if result.get("critique_score"):
+            st.caption(f"Critic score: {result['critique_score']}/10 after {result['rounds']} refinement round(s)")
+        st.markdown(result["refined_strategy"])
+
+    with tab2:
+        st.markdown("### Generated Visualizations")
+        viz_code = result["visualization_code"]
+        if viz_code:
+            # Generated code runs in a sandboxed worker, never in this process
+            figure_json, error = render_figure(viz_code)
+            if figure_json:
+                st.plotly_chart(pio.from_json(figure_json), use_container_width=True)
+            else:
+                st.error("Could not render chart automatically")
+                st.code(viz_code, language="python")
+                st.caption(f"Error: {error}")
+        else:
+            st.info("No visualization was generated this time.")
 
 # ── Footer / info ────────────────────────────────────────────────────────────
 st.markdown("---")
@@ -0,0 +1,121 @@
+"""
+Cold-start benchmark for the API.
+
+Measures, in fresh interpreters:
+- `python -X importtime -c "import app.api.main"`: total import time and the
+  heaviest modules (cumulative);
+- time-to-first-200: spawn uvicorn and poll GET /api/health until it answers.
+
+Usage (from the repo root):
+    python benchmarks/cold_start.py                      # print results
+    python benchmarks/cold_start.py --save baseline.json # record a baseline
+    python benchmarks/cold_start.py --baseline baseline.json [--tolerance 0.25]
+        # exit 1 if import time or time-to-first-200 regressed by more than 25%
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "app.api.main"
+
+
+def import_profile(runs: int) -> dict:
+    totals, last = [], {}
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        cumulative = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+                continue
+            _, cum, name = line[len("import time:"):].split("|")
+            cumulative[name.strip()] = int(cum)
+        totals.append(cumulative[MODULE] / 1e6)
+        last = cumulative
+    # Top-level packages only (children are already counted in their parent)
+    top = sorted(((n, us) for n, us in last.items() if "." not in n and n != MODULE), key=lambda x: -x[1])[:10]
+    return {
+        "import_seconds": round(statistics.median(totals), 3),
+        "heaviest": {name: round(us / 1e6, 3) for name, us in top},
+        "langchain_loaded": any(n.startswith(("langchain", "langgraph")) for n in last),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_200(runs: int, timeout: float = 60.0) -> float:
+    results = []
+    for _ in range(runs):
+        port = _free_port()
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", f"{MODULE}:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1) as response:
+                        if response.status == 200:
+                            results.append(time.perf_counter() - started)
+                            break
+                except OSError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("server exited before answering")
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError("no 200 before timeout")
+                time.sleep(0.02)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+    return round(statistics.median(results), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = import_profile(args.runs)
+    results["first_200_seconds"] = time_to_first_200(args.runs)
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = False
+        for metric in ("import_seconds", "first_200_seconds"):
+            limit = baseline[metric] * (1 + args.tolerance)
+            if results[metric] > limit:
+                print(f"REGRESSION {metric}: {results[metric]}s > {limit:.3f}s (baseline {baseline[metric]}s)")
+                failed = True
+        if results["langchain_loaded"] and not baseline.get("langchain_loaded", False):
+            print(f"REGRESSION: importing {MODULE} now loads LangChain/LangGraph eagerly")
+            failed = True
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Goal-seek grid benchmark: time to solve a full planning heatmap.
+
+Solves every goal / lever combination on a grid of horizons x axis values
+(default 200 x 200) with src/tools/goal_seek.py and reports the best-of-N
+wall time per combination. The cumulative-break-even growth solve (batched
+bisection) is the slowest case.
+
+Usage (from the repo root):
+    python benchmarks/planning_grid.py [--steps 200] [--repeat 5]
+    python benchmarks/planning_grid.py --save baseline.json
+    python benchmarks/planning_grid.py --baseline baseline.json [--tolerance 0.5]
+        # exit 1 if any combination got more than 50% slower
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from src.tools.goal_seek import solve_grid  # noqa: E402
+
+CASES = (
+    ("break_even", "growth", "expense_cut"),
+    ("break_even", "expense_cut", "growth"),
+    ("break_even", "start_revenue", "growth"),
+    ("cumulative_break_even", "growth", "expense_cut"),
+    ("cumulative_break_even", "expense_cut", "growth"),
+    ("target_revenue", "growth", "start_revenue"),
+)
+AXES = {"growth": (0.0, 0.2), "expense_cut": (0.0, 0.5), "start_revenue": (1000.0, 5000.0)}
+
+
+def best_ms(goal: str, solve_for: str, axis: str, steps: int, repeat: int) -> float:
+    horizons = np.arange(1, steps + 1)
+    axis_values = np.linspace(*AXES[axis], steps)
+    levers = {k: v for k, v in {"start_revenue": 2500.0, "growth": 0.02, "expense_cut": 0.1}.items()
+              if k not in (axis, solve_for)}
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        solve_grid(goal, solve_for, horizons, axis, axis_values, levers, 3200.0, target_revenue=6000.0)
+        times.append((time.perf_counter() - started) * 1000)
+    return round(min(times), 2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=200, help="horizons and axis values per grid side")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = {"grid": f"{args.steps}x{args.steps}", "ms": {}}
+    for goal, solve_for, axis in CASES:
+        results["ms"][f"{goal}/{solve_for}"] = best_ms(goal, solve_for, axis, args.steps, args.repeat)
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = False
+        for case, ms in results["ms"].items():
+            limit = baseline["ms"].get(case, ms) * (1 + args.tolerance)
+            if ms > limit:
+                print(f"REGRESSION {case}: {ms} ms > {limit:.2f} ms (baseline {baseline['ms'][case]})")
+                failed = True
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Prompt-size benchmark: input tokens sent to the LLM per consultation.
+
+Replays the offline suite's cassettes (tests/cassettes, no network, no API
+key) through the full graph and sums the locally estimated input tokens of
+every LLM call, per scenario and per agent. Replay is non-strict, so it keeps
+working when prompts changed since the cassettes were recorded.
+
+Usage (from the repo root):
+    python benchmarks/prompt_tokens.py                      # print results
+    python benchmarks/prompt_tokens.py --save baseline.json # record a baseline
+    python benchmarks/prompt_tokens.py --baseline baseline.json [--tolerance 0.05]
+        # exit 1 if any scenario sends more than 5% more input tokens
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.utils.cassettes import use_cassette  # noqa: E402
+from src.utils.tracing import RunTrace, trace_scope  # noqa: E402
+from tests.scenarios import SCENARIOS, cassette_path, run_pipeline  # noqa: E402
+
+
+def measure(name: str) -> dict:
+    trace = RunTrace()
+    with use_cassette(cassette_path(name), "replay"), trace_scope(trace):
+        run_pipeline(SCENARIOS[name])
+    per_agent: dict = {}
+    for call in trace.llm_calls:
+        per_agent[call["agent"]] = per_agent.get(call["agent"], 0) + call["estimated_input_tokens"]
+    return {
+        "llm_calls": len(trace.llm_calls),
+        "input_tokens": sum(per_agent.values()),
+        "per_agent": per_agent,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="allowed relative growth")
+    args = parser.parse_args()
+
+    results = {name: measure(name) for name in SCENARIOS}
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = False
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before, after = baseline[name]["input_tokens"], result["input_tokens"]
+            change = (after - before) / before if before else 0.0
+            print(f"{name}: {before} -> {after} input tokens ({change:+.1%})")
+            if change > args.tolerance:
+                print(f"REGRESSION {name}: input tokens grew by more than {args.tolerance:.0%}")
+                failed = True
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
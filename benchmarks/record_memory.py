@@ -0,0 +1,134 @@
+"""
+Memory per stored consultation: plain dicts vs compact records, hot and cold.
+
+Builds one realistic completed consultation by replaying the "premium"
+cassette through the graph (no network), makes N copies with distinct ids
+and text, and measures the Python heap they take (tracemalloc) as:
+- dict:  the plain dicts consultations_store used to hold;
+- hot:   ConsultationRecords (small fields in slots, large ones compressed);
+- cold:  the same records after spill_cold() moved their large fields to disk.
+
+Usage (from the repo root):
+    python benchmarks/record_memory.py [--records 2000]
+    python benchmarks/record_memory.py --save baseline.json
+    python benchmarks/record_memory.py --baseline baseline.json [--tolerance 0.25]
+        # exit 1 if hot or cold bytes per record grew by more than 25%
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.api.records import ConsultationStore  # noqa: E402
+from src.utils.cassettes import use_cassette  # noqa: E402
+from src.utils.tracing import RunTrace, trace_scope  # noqa: E402
+from tests.scenarios import CONSULTATION_REQUEST, business_info, cassette_path, run_pipeline  # noqa: E402
+
+
+def sample_consultation() -> dict:
+    trace = RunTrace()
+    with use_cassette(cassette_path("premium"), "replay"), trace_scope(trace):
+        state = run_pipeline(3)
+    return {
+        "id": "c-0",
+        "user_id": "u-0123456789abcdef",
+        "status": "completed",
+        "created_at": "2026-01-01T00:00:00.000000Z",
+        "updated_at": "2026-01-01T00:05:00.000000Z",
+        "business": business_info().model_dump(),
+        "plan_used": "premium",
+        "refined_strategy": state.get("refined_strategy") or "",
+        "visualization_code": state.get("visualization_code") or "",
+        "refinement_count": state.get("current_refinement_round", 0),
+        "strategy_sections": state["refined_plan"].model_dump() if state.get("refined_plan") else None,
+        "critique_score": state.get("critique_score"),
+        "business_name": "Sample",
+        "industry": None,
+        "target_revenue_usd": CONSULTATION_REQUEST["monthly_expenses_usd"],
+        "processing_time": 42,
+        "model_used": "llama-3.1-70b-versatile",
+        "feedback": None,
+        "trace": trace.to_dict(),
+    }
+
+
+def copies(template: dict, n: int):
+    """Deep, distinct copies (as separate requests would produce)."""
+    encoded = json.dumps(template)
+    for i in range(n):
+        record = json.loads(encoded)
+        record["id"] = f"c-{i:08d}"
+        record["refined_strategy"] += f"\n<!-- {i} -->"
+        yield record
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth")
+    args = parser.parse_args()
+
+    template = sample_consultation()
+    n = args.records
+    tracemalloc.start()
+
+    start = traced()
+    dicts = list(copies(template, n))
+    dict_bytes = traced() - start
+    del dicts
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        store = ConsultationStore(spill_dir=spill_dir, cold_after_seconds=0)
+        start = traced()
+        for record in copies(template, n):
+            store.add(record)
+        hot_bytes = traced() - start
+        store.spill_cold(now=float("inf"))
+        cold_bytes = traced() - start
+        stats = store.stats()
+        store.close()
+    tracemalloc.stop()
+
+    results = {
+        "records": n,
+        "dict_bytes_per_record": round(dict_bytes / n),
+        "hot_bytes_per_record": round(hot_bytes / n),
+        "cold_bytes_per_record": round(cold_bytes / n),
+        "disk_bytes_per_record": round(stats["segment_bytes"] / n),
+        "hot_ratio": round(dict_bytes / hot_bytes, 1),
+        "cold_ratio": round(dict_bytes / cold_bytes, 1),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = False
+        for metric in ("hot_bytes_per_record", "cold_bytes_per_record"):
+            limit = baseline[metric] * (1 + args.tolerance)
+            if results[metric] > limit:
+                print(f"REGRESSION {metric}: {results[metric]} > {limit:.0f} (baseline {baseline[metric]})")
+                failed = True
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
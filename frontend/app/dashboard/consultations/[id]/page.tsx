@@ -11,6 +11,7 @@ import { Skeleton } from "@/components/ui/skeleton"
 import { useConsultationStore } from "@/lib/stores/consultation-store"
 import { StrategyViewer } from "@/components/dashboard/strategy-viewer"
 import { ChartSection } from "@/components/dashboard/chart-section"
+import { GoalSeekHeatmap } from "@/components/dashboard/goal-seek-heatmap"
 import { FeedbackForm } from "@/components/dashboard/feedback-form"
 import {
   ArrowLeft,
@@ -433,7 +434,14 @@ export default function ConsultationDetailPage() {
           </TabsContent>
 
           <TabsContent value="visualizations">
-            <ChartSection data={currentConsultation.visualizationData} />
+            <div className="space-y-6">
+              <ChartSection data={currentConsultation.visualizationData} />
+              <GoalSeekHeatmap
+                monthlyRevenue={currentConsultation.financial.monthlyRevenue}
+                monthlyExpenses={currentConsultation.financial.monthlyExpenses}
+                targetRevenue={currentConsultation.financial.targetRevenue}
+              />
+            </div>
           </TabsContent>
 
           <TabsContent value="history">
@@ -507,6 +515,24 @@ export default function ConsultationDetailPage() {
           </CardContent>
         </Card>
       )}
+
+      {/* Cancelled State */}
+      {currentConsultation.status === "cancelled" && (
+        <Card className="glass-card">
+          <CardContent className="py-12 text-center">
+            <div className="mx-auto w-16 h-16 rounded-full bg-muted flex items-center justify-center mb-4">
+              <XCircle className="h-8 w-8 text-muted-foreground" />
+            </div>
+            <h3 className="text-xl font-semibold mb-2">Consultation Cancelled</h3>
+            <p className="text-muted-foreground mb-4">
+              This consultation was stopped before it finished. Start a new one to get a complete strategy.
+            </p>
+            <Button asChild className="gradient-primary text-primary-foreground">
+              <Link href="/dashboard/new-consultation">Start Again</Link>
+            </Button>
+          </CardContent>
+        </Card>
+      )}
     </div>
   )
 }
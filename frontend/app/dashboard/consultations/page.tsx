@@ -1,6 +1,6 @@
 "use client"
 
-import { useEffect, useState } from "react"
+import { useEffect, useMemo, useState } from "react"
 import { useSearchParams } from "next/navigation"
 import Link from "next/link"
 import { Button } from "@/components/ui/button"
@@ -8,6 +8,7 @@ import { Input } from "@/components/ui/input"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { ConsultationCard } from "@/components/dashboard/consultation-card"
 import { useConsultationStore } from "@/lib/stores/consultation-store"
+import { searchConsultations } from "@/lib/api/consultations"
 import { PlusCircle, Search, Filter } from "lucide-react"
 import { Skeleton } from "@/components/ui/skeleton"
 import { Card, CardContent } from "@/components/ui/card"
@@ -19,6 +20,8 @@ export default function ConsultationsPage() {
   const [searchQuery, setSearchQuery] = useState(searchParams.get("search") || "")
   const [statusFilter, setStatusFilter] = useState<ConsultationStatus | "all">("all")
   const [planFilter, setPlanFilter] = useState<ConsultationPlan | "all">("all")
+  // Ids ranked by the server-side search, best match first (null: no query)
+  const [rankedIds, setRankedIds] = useState<string[] | null>(null)
 
   useEffect(() => {
     fetchConsultations()
@@ -32,14 +35,37 @@ export default function ConsultationsPage() {
     }
   }, [searchParams])
 
-  const filteredConsultations = consultations.filter((c) => {
-    const matchesSearch =
-      c.business.name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      c.goal.toLowerCase().includes(searchQuery.toLowerCase())
-    const matchesStatus = statusFilter === "all" || c.status === statusFilter
-    const matchesPlan = planFilter === "all" || c.plan === planFilter
-    return matchesSearch && matchesStatus && matchesPlan
-  })
+  // Debounced: one search request once typing pauses, stale responses are dropped
+  useEffect(() => {
+    const q = searchQuery.trim()
+    if (!q) {
+      setRankedIds(null)
+      return
+    }
+    let active = true
+    const timer = setTimeout(() => {
+      searchConsultations(q)
+        .then((results) => active && setRankedIds(results.map((r) => r.id)))
+        .catch(() => active && setRankedIds([]))
+    }, 250)
+    return () => {
+      active = false
+      clearTimeout(timer)
+    }
+  }, [searchQuery])
+
+  const filteredConsultations = useMemo(() => {
+    const matching = (c: (typeof consultations)[number]) =>
+      (statusFilter === "all" || c.status === statusFilter) && (planFilter === "all" || c.plan === planFilter)
+    if (rankedIds === null) {
+      return consultations.filter(matching)
+    }
+    const byId = new Map(consultations.map((c) => [c.id, c]))
+    return rankedIds.flatMap((id) => {
+      const c = byId.get(id)
+      return c && matching(c) ? [c] : []
+    })
+  }, [consultations, rankedIds, statusFilter, planFilter])
 
   return (
     <div className="space-y-6">
@@ -79,6 +105,7 @@ export default function ConsultationsPage() {
               <SelectItem value="processing">Processing</SelectItem>
               <SelectItem value="completed">Completed</SelectItem>
               <SelectItem value="failed">Failed</SelectItem>
+              <SelectItem value="cancelled">Cancelled</SelectItem>
             </SelectContent>
           </Select>
           <Select value={planFilter} onValueChange={(v) => setPlanFilter(v as ConsultationPlan | "all")}>
@@ -1,12 +1,12 @@
 "use client"
 
-import { useEffect } from "react"
+import { useEffect, useState } from "react"
 import Link from "next/link"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { StatCard } from "@/components/dashboard/stat-card"
 import { ConsultationCard } from "@/components/dashboard/consultation-card"
-import { useConsultationStore } from "@/lib/stores/consultation-store"
+import { fetchDashboardStats, type DashboardStats } from "@/lib/api/dashboard"
 import { useUserStore } from "@/lib/stores/user-store"
 import { useBillingStore } from "@/lib/stores/billing-store"
 import { Activity, FileText, Calendar, Sparkles, PlusCircle, ArrowRight, TrendingUp } from "lucide-react"
@@ -45,21 +45,26 @@ function DashboardSkeleton() {
 }
 
 export default function DashboardPage() {
-  const { consultations, fetchConsultations, isLoading } = useConsultationStore()
   const { user } = useUserStore()
   const { plansData, fetchPlans } = useBillingStore()
+  // Aggregates only: the dashboard no longer downloads every consultation
+  const [stats, setStats] = useState<DashboardStats | null>(null)
+  const [isLoading, setIsLoading] = useState(true)
 
   useEffect(() => {
-    fetchConsultations()
-  }, [fetchConsultations])
+    fetchDashboardStats()
+      .then(setStats)
+      .catch((error) => console.error("Failed to fetch dashboard stats:", error))
+      .finally(() => setIsLoading(false))
+  }, [])
 
   useEffect(() => {
     if (!plansData) fetchPlans()
   }, [plansData, fetchPlans])
 
   const planInfo = user ? plansData?.plans.find((p) => p.id === user.subscription) : null
-  const activeConsultations = consultations.filter((c) => c.status === "processing").length
-  const completedConsultations = consultations.filter((c) => c.status === "completed").length
+  const consultations = stats?.recentConsultations ?? []
+  const activeConsultations = stats?.byStatus.processing ?? 0
   const lastConsultation = consultations[0]
 
   if (isLoading) {
@@ -136,8 +141,12 @@ export default function DashboardPage() {
         />
         <StatCard
           title="Total Consultations"
-          value={consultations.length}
-          description="All time"
+          value={stats?.total ?? 0}
+          description={
+            stats?.averageProcessingSeconds != null
+              ? `All time · avg ${Math.round(stats.averageProcessingSeconds)}s to complete`
+              : "All time"
+          }
           icon={FileText}
           trend={undefined}
         />
@@ -170,7 +179,7 @@ export default function DashboardPage() {
           </div>
           {consultations.length > 0 ? (
             <div className="grid gap-4 md:grid-cols-2">
-              {consultations.slice(0, 4).map((consultation) => (
+              {consultations.map((consultation) => (
                 <ConsultationCard key={consultation.id} consultation={consultation} />
               ))}
             </div>
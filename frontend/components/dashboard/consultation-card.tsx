@@ -30,6 +30,12 @@ const statusConfig = {
     className: "bg-red-500/10 text-red-500 border-red-500/20",
     iconClassName: "",
   },
+  cancelled: {
+    label: "Cancelled",
+    icon: XCircle,
+    className: "bg-muted text-muted-foreground",
+    iconClassName: "",
+  },
 }
 
 const planConfig = {
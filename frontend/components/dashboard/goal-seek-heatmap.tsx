@@ -0,0 +1,143 @@
+"use client"
+
+import { useEffect, useState } from "react"
+import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
+import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
+import { solvePlanningGrid, type PlanningGoal, type PlanningGrid, type PlanningLever } from "@/lib/api/planning"
+
+interface GoalSeekHeatmapProps {
+  monthlyRevenue: number
+  monthlyExpenses: number
+  targetRevenue?: number
+}
+
+const LEVER_LABELS: Record<PlanningLever, string> = {
+  growth: "Monthly growth",
+  expense_cut: "Expense cut",
+  start_revenue: "Revenue now",
+}
+
+function formatValue(lever: PlanningLever, value: number) {
+  return lever === "start_revenue" ? `$${Math.round(value).toLocaleString()}` : `${(value * 100).toFixed(1)}%`
+}
+
+export function GoalSeekHeatmap({ monthlyRevenue, monthlyExpenses, targetRevenue }: GoalSeekHeatmapProps) {
+  const [goal, setGoal] = useState<PlanningGoal>("break_even")
+  const [solveFor, setSolveFor] = useState<PlanningLever>("growth")
+  const [grid, setGrid] = useState<PlanningGrid | null>(null)
+  const [error, setError] = useState<string | null>(null)
+
+  useEffect(() => {
+    if (monthlyExpenses <= 0) return
+    let active = true
+    solvePlanningGrid({
+      goal,
+      solve_for: solveFor,
+      monthly_revenue_usd: monthlyRevenue,
+      monthly_expenses_usd: monthlyExpenses,
+      target_revenue_usd: targetRevenue || null,
+      horizon_min: 2,
+      horizon_max: 24,
+      axis_steps: 11,
+    })
+      .then((result) => {
+        if (!active) return
+        setGrid(result)
+        setError(null)
+      })
+      .catch((e) => active && setError(e instanceof Error ? e.message : "Could not solve"))
+    return () => {
+      active = false
+    }
+  }, [goal, solveFor, monthlyRevenue, monthlyExpenses, targetRevenue])
+
+  if (monthlyExpenses <= 0) return null
+
+  const { min, max } = grid?.range ?? { min: null, max: null }
+  // Darker = more needed; out-of-reach cells are grey
+  const shade = (value: number | null) => {
+    if (value === null) return "hsl(var(--muted))"
+    const t = max !== null && min !== null && max > min ? (value - min) / (max - min) : 0
+    return `hsl(var(--chart-1) / ${0.1 + 0.85 * t})`
+  }
+
+  return (
+    <Card className="glass-card">
+      <CardHeader>
+        <CardTitle>What it takes</CardTitle>
+        <CardDescription>
+          {LEVER_LABELS[solveFor]} needed by each month (columns) for each {grid ? LEVER_LABELS[grid.axis.name].toLowerCase() : "scenario"} (rows)
+        </CardDescription>
+        <div className="flex flex-wrap gap-2 pt-2">
+          <Select
+            value={goal}
+            onValueChange={(v) => {
+              setGoal(v as PlanningGoal)
+              // Expense cuts do not move revenue, so they cannot be solved for a revenue target
+              if (v === "target_revenue" && solveFor === "expense_cut") setSolveFor("growth")
+            }}
+          >
+            <SelectTrigger className="w-52">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="break_even">Monthly break-even</SelectItem>
+              <SelectItem value="cumulative_break_even">Cumulative break-even</SelectItem>
+              {targetRevenue ? <SelectItem value="target_revenue">Reach target revenue</SelectItem> : null}
+            </SelectContent>
+          </Select>
+          <Select value={solveFor} onValueChange={(v) => setSolveFor(v as PlanningLever)}>
+            <SelectTrigger className="w-44">
+              <SelectValue />
+            </SelectTrigger>
+            <SelectContent>
+              <SelectItem value="growth">Growth needed</SelectItem>
+              {goal !== "target_revenue" && <SelectItem value="expense_cut">Expense cut needed</SelectItem>}
+              <SelectItem value="start_revenue">Revenue needed now</SelectItem>
+            </SelectContent>
+          </Select>
+        </div>
+      </CardHeader>
+      <CardContent>
+        {error && <p className="text-sm text-destructive">{error}</p>}
+        {grid && (
+          <div className="overflow-x-auto">
+            <table className="text-xs border-separate border-spacing-0.5">
+              <thead>
+                <tr>
+                  <th className="px-1 text-left text-muted-foreground font-normal">{LEVER_LABELS[grid.axis.name]}</th>
+                  {grid.horizons.map((h) => (
+                    <th key={h} className="px-1 text-muted-foreground font-normal">
+                      M{h}
+                    </th>
+                  ))}
+                </tr>
+              </thead>
+              <tbody>
+                {grid.values.map((row, i) => (
+                  <tr key={grid.axis.values[i]}>
+                    <td className="px-1 text-muted-foreground whitespace-nowrap">
+                      {formatValue(grid.axis.name, grid.axis.values[i])}
+                    </td>
+                    {row.map((value, j) => (
+                      <td
+                        key={grid.horizons[j]}
+                        className="h-6 min-w-6 rounded-sm"
+                        style={{ background: shade(value) }}
+                        title={`Month ${grid.horizons[j]}: ${value === null ? "out of reach" : formatValue(grid.solve_for, value)}`}
+                      />
+                    ))}
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+            <p className="text-xs text-muted-foreground mt-2">
+              Range {min !== null ? formatValue(grid.solve_for, min) : "-"} to{" "}
+              {max !== null ? formatValue(grid.solve_for, max) : "-"}; grey cells are out of reach.
+            </p>
+          </div>
+        )}
+      </CardContent>
+    </Card>
+  )
+}
@@ -17,7 +17,7 @@ import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar"
 import { useUserStore } from "@/lib/stores/user-store"
 import { Bell, Moon, Sun, Search, Menu, Command } from "lucide-react"
 import { cn } from "@/lib/utils"
-import { fetchUnreadCount } from "@/lib/api/notifications"
+import { fetchUnreadCount, subscribeNotifications } from "@/lib/api/notifications"
 import { useEffect } from "react"
 
 interface TopNavProps {
@@ -42,8 +42,15 @@ export function TopNav({ onMenuClick, isSidebarCollapsed }: TopNavProps) {
         // If notifications endpoint fails, don't fake a badge.
         if (!cancelled) setUnreadCount(0)
       })
+    // The stream pushes count changes, so no polling is needed after the first fetch.
+    const unsubscribe = subscribeNotifications({
+      onUnread: (n) => {
+        if (!cancelled) setUnreadCount(n)
+      },
+    })
     return () => {
       cancelled = true
+      unsubscribe()
     }
   }, [])
 
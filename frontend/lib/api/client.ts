@@ -13,12 +13,15 @@ export interface ApiError {
 export class ApiClientError extends Error {
   status: number
   detail: string
+  /** Seconds to wait before retrying (429/503 Retry-After), when the server sent one */
+  retryAfter?: number
 
-  constructor(message: string, status: number, detail?: string) {
+  constructor(message: string, status: number, detail?: string, retryAfter?: number) {
     super(message)
     this.name = "ApiClientError"
     this.status = status
     this.detail = detail || message
+    this.retryAfter = retryAfter
   }
 }
 
@@ -56,7 +59,8 @@ async function apiRequest<T>(
       } catch {
         // If response is not JSON, use status text
       }
-      throw new ApiClientError(errorDetail, response.status, errorDetail)
+      const retryAfter = Number(response.headers.get("Retry-After")) || undefined
+      throw new ApiClientError(errorDetail, response.status, errorDetail, retryAfter)
     }
 
     // Handle empty responses
@@ -90,10 +94,11 @@ export async function apiGet<T>(endpoint: string): Promise<T> {
 /**
  * POST request helper
  */
-export async function apiPost<T>(endpoint: string, data?: unknown): Promise<T> {
+export async function apiPost<T>(endpoint: string, data?: unknown, headers?: HeadersInit): Promise<T> {
   return apiRequest<T>(endpoint, {
     method: "POST",
     body: data ? JSON.stringify(data) : undefined,
+    headers,
   })
 }
 
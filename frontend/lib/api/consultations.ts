@@ -9,6 +9,8 @@ import type {
   NewConsultationFormData,
   ConsultationFeedback,
   ConsultationStatus,
+  PlanItem,
+  StrategySections,
 } from "@/types/consultation"
 
 // Backend response types (may differ from frontend types)
@@ -28,7 +30,18 @@ interface BackendConsultationCreateRequest {
   plan: string
 }
 
-interface BackendConsultationResponse {
+interface BackendStrategySections {
+  summary: string
+  short_term_actions: PlanItem[]
+  medium_term_strategies: PlanItem[]
+  marketing_channels: PlanItem[]
+  financial_levers: PlanItem[]
+  risks: { id: string; risk: string; mitigation: string }[]
+  metrics: { name: string; target: string }[]
+  changes: { issue_id?: string | null; change: string }[]
+}
+
+export interface BackendConsultationResponse {
   id: string
   status: ConsultationStatus
   created_at: string
@@ -47,6 +60,8 @@ interface BackendConsultationResponse {
   refined_strategy: string
   visualization_code?: string
   refinement_count: number
+  strategy_sections?: BackendStrategySections | null
+  critique_score?: number | null
   business_name?: string | null
   industry?: string | null
   target_revenue_usd?: number | null
@@ -55,6 +70,7 @@ interface BackendConsultationResponse {
     cashflow_data?: Array<{ month: string; inflow: number; outflow: number; net: number }>
     break_even_timeline?: Array<{ month: string; cumulative: number; break_even_point: number }>
     market_analysis?: Array<{ segment: string; value: number }>
+    break_even_probability?: { month: number; probability: number }
   }
   processing_time?: number
   model_used?: string
@@ -73,7 +89,7 @@ interface BackendFeedbackRequest {
 /**
  * Transform backend response to frontend Consultation type
  */
-function transformBackendConsultation(backend: BackendConsultationResponse): Consultation {
+export function transformBackendConsultation(backend: BackendConsultationResponse): Consultation {
   // Transform visualization data if present
   let visualizationData = undefined
   if (backend.visualization_data) {
@@ -82,6 +98,7 @@ function transformBackendConsultation(backend: BackendConsultationResponse): Con
       cashflowData: backend.visualization_data.cashflow_data || [],
       breakEvenTimeline: backend.visualization_data.break_even_timeline || [],
       marketAnalysis: backend.visualization_data.market_analysis,
+      breakEvenProbability: backend.visualization_data.break_even_probability,
     }
   }
 
@@ -144,6 +161,8 @@ function transformBackendConsultation(backend: BackendConsultationResponse): Con
     status: backend.status,
     plan: normalizePlan(backend.plan_used),
     refinedStrategy: backend.refined_strategy || "",
+    strategySections: backend.strategy_sections ? transformStrategySections(backend.strategy_sections) : undefined,
+    critiqueScore: backend.critique_score ?? undefined,
     visualizationData,
     refinementCount: backend.refinement_count || 0,
     processingTime: backend.processing_time,
@@ -158,6 +177,22 @@ function transformBackendConsultation(backend: BackendConsultationResponse): Con
   }
 }
 
+/**
+ * Transform typed strategy sections (snake_case -> camelCase)
+ */
+function transformStrategySections(backend: BackendStrategySections): StrategySections {
+  return {
+    summary: backend.summary,
+    shortTermActions: backend.short_term_actions || [],
+    mediumTermStrategies: backend.medium_term_strategies || [],
+    marketingChannels: backend.marketing_channels || [],
+    financialLevers: backend.financial_levers || [],
+    risks: backend.risks || [],
+    metrics: backend.metrics || [],
+    changes: (backend.changes || []).map((c) => ({ issueId: c.issue_id, change: c.change })),
+  }
+}
+
 /**
  * Transform frontend form data to backend request format
  */
@@ -225,7 +260,18 @@ export async function fetchConsultationById(id: string): Promise<Consultation |
  */
 export async function createConsultation(data: NewConsultationFormData): Promise<Consultation> {
   const requestData = transformToBackendRequest(data)
-  const response = await apiPost<BackendConsultationResponse>("/api/consultations", requestData)
+  // Same key on retry: the backend attaches to the running job instead of starting a second one
+  const headers = { "Idempotency-Key": crypto.randomUUID() }
+  let response: BackendConsultationResponse
+  try {
+    response = await apiPost<BackendConsultationResponse>("/api/consultations", requestData, headers)
+  } catch (error) {
+    // Connection dropped or gateway timeout while the graph was running: retry once
+    if (!(error instanceof ApiClientError) || ![0, 502, 504].includes(error.status)) {
+      throw error
+    }
+    response = await apiPost<BackendConsultationResponse>("/api/consultations", requestData, headers)
+  }
   return transformBackendConsultation(response)
 }
 
@@ -278,3 +324,39 @@ export async function updateConsultation(
 export async function deleteConsultation(id: string): Promise<void> {
   await apiDelete(`/api/consultations/${id}`)
 }
+
+/**
+ * Chart data for a custom horizon / scenario (computed server-side, no LLM call)
+ */
+export async function fetchConsultationVisualization(
+  id: string,
+  params: { months?: number; target?: number; expenseCut?: number } = {}
+): Promise<NonNullable<BackendConsultationResponse["visualization_data"]>> {
+  const query = new URLSearchParams()
+  if (params.months) query.set("months", String(params.months))
+  if (params.target) query.set("target", String(params.target))
+  if (params.expenseCut !== undefined) query.set("expense_cut", String(params.expenseCut))
+  const qs = query.toString()
+  return apiGet(`/api/consultations/${id}/visualization${qs ? `?${qs}` : ""}`)
+}
+
+export interface ConsultationSearchResult {
+  id: string
+  score: number
+  status: ConsultationStatus
+  created_at: string
+  business_name: string | null
+  industry: string | null
+  business_type: string | null
+  main_goal: string | null
+  critique_score: number | null
+}
+
+/**
+ * Ranked full-text search over the user's consultations (best match first)
+ */
+export async function searchConsultations(q: string, limit = 100): Promise<ConsultationSearchResult[]> {
+  const query = new URLSearchParams({ q, limit: String(limit) })
+  const response = await apiGet<{ results: ConsultationSearchResult[] }>(`/api/consultations/search?${query}`)
+  return response.results
+}
@@ -0,0 +1,58 @@
+/**
+ * Dashboard aggregates (counts, usage, ratings, recent activity) computed server-side
+ */
+
+import { apiGet } from "./client"
+import { transformBackendConsultation, type BackendConsultationResponse } from "./consultations"
+import type { Consultation, ConsultationStatus } from "@/types/consultation"
+
+interface BackendDashboardStats {
+  consultations: { total: number; by_status: Record<ConsultationStatus, number> }
+  usage: { plan: string; used: number; limit: number; remaining: number | null }
+  processing_time: { completed: number; average_seconds: number | null }
+  ratings: { count: number; average: number | null; distribution: Record<string, number> }
+  recent_activity: Array<{
+    type: string
+    consultation_id: string
+    business_name: string | null
+    status: ConsultationStatus
+    at: string
+  }>
+  recent_consultations: BackendConsultationResponse[]
+}
+
+export interface DashboardStats {
+  total: number
+  byStatus: Record<ConsultationStatus, number>
+  usage: { plan: string; used: number; limit: number; remaining: number | null }
+  averageProcessingSeconds: number | null
+  ratings: { count: number; average: number | null; distribution: Record<string, number> }
+  recentActivity: Array<{
+    type: string
+    consultationId: string
+    businessName: string | null
+    status: ConsultationStatus
+    at: Date
+  }>
+  // Newest first, without strategy text
+  recentConsultations: Consultation[]
+}
+
+export async function fetchDashboardStats(recent = 4): Promise<DashboardStats> {
+  const res = await apiGet<BackendDashboardStats>(`/api/dashboard/stats?recent=${recent}`)
+  return {
+    total: res.consultations.total,
+    byStatus: res.consultations.by_status,
+    usage: res.usage,
+    averageProcessingSeconds: res.processing_time.average_seconds,
+    ratings: res.ratings,
+    recentActivity: res.recent_activity.map((a) => ({
+      type: a.type,
+      consultationId: a.consultation_id,
+      businessName: a.business_name,
+      status: a.status,
+      at: new Date(a.at),
+    })),
+    recentConsultations: res.recent_consultations.map(transformBackendConsultation),
+  }
+}
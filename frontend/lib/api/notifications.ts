@@ -2,7 +2,7 @@
  * Notifications API
  */
 
-import { apiGet, apiPost } from "./client"
+import { API_BASE_URL, apiGet, apiPost } from "./client"
 
 export type Notification = {
   id: string
@@ -18,9 +18,37 @@ export async function fetchUnreadCount(): Promise<number> {
   return res.unread
 }
 
-export async function fetchNotifications(): Promise<Notification[]> {
-  const res = await apiGet<{ notifications: Notification[] }>("/api/notifications")
-  return res.notifications
+export type NotificationPage = {
+  notifications: Notification[]
+  total: number
+  unread: number
+  next_offset: number | null
+}
+
+export async function fetchNotifications(limit = 20, offset = 0): Promise<NotificationPage> {
+  return apiGet<NotificationPage>(`/api/notifications?limit=${limit}&offset=${offset}`)
+}
+
+export async function markAllRead(): Promise<void> {
+  await apiPost("/api/notifications/read-all")
+}
+
+/**
+ * Live updates over server-sent events (replaces polling).
+ * Returns a function that closes the stream.
+ */
+export function subscribeNotifications(handlers: {
+  onUnread?: (unread: number) => void
+  onNotification?: (notification: Notification) => void
+}): () => void {
+  const source = new EventSource(`${API_BASE_URL}/api/notifications/stream`, { withCredentials: true })
+  source.addEventListener("unread", (e) => {
+    handlers.onUnread?.(JSON.parse((e as MessageEvent).data).unread)
+  })
+  source.addEventListener("notification", (e) => {
+    handlers.onNotification?.(JSON.parse((e as MessageEvent).data))
+  })
+  return () => source.close()
 }
 
 export async function markRead(notificationId: string): Promise<void> {
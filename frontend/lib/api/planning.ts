@@ -0,0 +1,40 @@
+/**
+ * Goal-seek planning grid (deterministic, computed server-side without the LLM)
+ */
+
+import { apiPost } from "./client"
+
+export type PlanningGoal = "break_even" | "cumulative_break_even" | "target_revenue"
+export type PlanningLever = "growth" | "expense_cut" | "start_revenue"
+
+export interface PlanningSolveRequest {
+  goal?: PlanningGoal
+  solve_for?: PlanningLever
+  axis?: PlanningLever
+  monthly_revenue_usd: number
+  monthly_expenses_usd: number
+  target_revenue_usd?: number | null
+  growth?: number
+  expense_cut?: number
+  horizon_min?: number
+  horizon_max?: number
+  axis_min?: number
+  axis_max?: number
+  axis_steps?: number
+}
+
+export interface PlanningGrid {
+  goal: PlanningGoal
+  solve_for: PlanningLever
+  horizons: number[]
+  axis: { name: PlanningLever; values: number[] }
+  // values[row][col]: row follows axis.values, column follows horizons; null = out of reach
+  values: (number | null)[][]
+  reachable_share: number
+  range: { min: number | null; max: number | null }
+  solve_ms: number
+}
+
+export async function solvePlanningGrid(request: PlanningSolveRequest): Promise<PlanningGrid> {
+  return apiPost<PlanningGrid>("/api/planning/solve", request)
+}
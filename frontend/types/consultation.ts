@@ -1,6 +1,6 @@
 export type BusinessStage = "idea" | "startup" | "growth" | "established" | "enterprise"
 export type BusinessType = "saas" | "ecommerce" | "service" | "marketplace" | "other"
-export type ConsultationStatus = "processing" | "completed" | "failed"
+export type ConsultationStatus = "processing" | "completed" | "failed" | "cancelled"
 export type ConsultationPlan = "basic" | "premium" | "ultra"
 export type SubscriptionPlan = "free" | "starter" | "pro" | "enterprise"
 
@@ -38,6 +38,9 @@ export interface Consultation {
   status: ConsultationStatus
   plan: ConsultationPlan
   refinedStrategy: string
+  // Typed version of refinedStrategy (absent when the model answered in free text)
+  strategySections?: StrategySections
+  critiqueScore?: number
   visualizationData?: VisualizationData
   refinementCount: number
   processingTime?: number
@@ -45,11 +48,31 @@ export interface Consultation {
   feedback?: ConsultationFeedback
 }
 
+export interface PlanItem {
+  id: string
+  title: string
+  detail: string
+  timeframe?: string | null
+}
+
+export interface StrategySections {
+  summary: string
+  shortTermActions: PlanItem[]
+  mediumTermStrategies: PlanItem[]
+  marketingChannels: PlanItem[]
+  financialLevers: PlanItem[]
+  risks: { id: string; risk: string; mitigation: string }[]
+  metrics: { name: string; target: string }[]
+  changes: { issueId?: string | null; change: string }[]
+}
+
 export interface VisualizationData {
   revenueProjection: { month: string; projected: number; current: number }[]
   cashflowData: { month: string; inflow: number; outflow: number; net: number }[]
   breakEvenTimeline: { month: string; cumulative: number; breakEvenPoint: number }[]
   marketAnalysis?: { segment: string; value: number }[]
+  // Monte Carlo: P(monthly net >= 0 at least once by `month`)
+  breakEvenProbability?: { month: number; probability: number }
 }
 
 export interface User {
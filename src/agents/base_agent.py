@@ -1,11 +1,44 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage
 from langchain_core.language_models import BaseChatModel
+from langchain_core.tools import BaseTool
+from groq import BadRequestError
+from pydantic import BaseModel, ValidationError
 
+from src.config.settings import settings
+from src.tools.finance_calculator import financial_snapshot
+from src.tools.simple_research import research_context
+from src.utils.cancellation import check_cancelled, current_cancel_token
+from src.utils.cassettes import active_cassette
 from src.utils.llm import get_llm
+from src.utils.logging import get_logger
+from src.utils.prompts import Section, business_context, fit_sections
+from src.utils.tokens import MESSAGE_OVERHEAD_TOKENS, estimate_messages_tokens, estimate_tokens
+from src.utils.tracing import current_trace, record_response
+
+log = get_logger("src.agents")
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def prompt_context(state: dict) -> Dict[str, str]:
+    """
+    Business context, pre-computed financials and research notes for this run,
+    rendered once: agents return it as `prompt_context` in their state update
+    and later nodes (every refinement round) reuse it.
+    """
+    cached = state.get("prompt_context")
+    if cached is not None:
+        return cached
+    business = state["business"]
+    return {
+        "business": business_context(business),
+        "financials": financial_snapshot(business),
+        "references": research_context(business),
+    }
 
 
 class BaseAgent(ABC):
@@ -17,28 +50,135 @@ class BaseAgent(ABC):
             system_prompt: str,
             llm: Optional[BaseChatModel] = None,
             temperature: float = 0.7,
+            tools: Optional[List[BaseTool]] = None,
     ):
         self.name = name
         self.system_prompt = system_prompt
         self.llm = llm or get_llm(temperature=temperature)
+        self.tools = tools or []
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", self.system_prompt),
             ("placeholder", "{messages}"),
             ("human", "{input}")
         ])
 
+    def build_prompt(self, *sections: Section) -> str:
+        """Join prompt sections within this agent's input budget (AGENT_INPUT_TOKEN_BUDGETS, net of the system prompt)."""
+        budget = settings.AGENT_INPUT_TOKEN_BUDGETS.get(self.name)
+        if budget is not None:
+            budget -= estimate_tokens(self.system_prompt) + 2 * MESSAGE_OVERHEAD_TOKENS
+        return fit_sections(sections, budget, agent=self.name)
+
     def invoke(self, input_text: str, messages: list = None) -> str:
         """Simple synchronous call - good for testing"""
         messages = messages or []
 
-        chain = self.prompt | self.llm
+        conversation = self.prompt.format_messages(input=input_text, messages=messages)
+        if not self.tools:
+            return self._complete(self.llm, conversation).content.strip()
+
+        return self._invoke_with_tools(conversation)
+
+    def invoke_structured(self, input_text: str, schema: Type[T], messages: list = None) -> Optional[T]:
+        """
+        Like `invoke`, but the answer is returned as an instance of `schema`
+        (structured-output / function-calling mode). Returns None if the model
+        did not produce valid output, so callers can fall back to `invoke`.
+        """
+        conversation = self.prompt.format_messages(input=input_text, messages=messages or [])
+        try:
+            if self.tools:
+                return self._invoke_with_tools(conversation, schema=schema)
+            return self._complete_structured(conversation, schema)
+        except (ValidationError, ValueError, BadRequestError) as e:
+            # ValueError covers OutputParserException; Groq rejects malformed tool calls with 400
+            log.warning("structured_output_failed", agent=self.name, schema=schema.__name__, error=str(e)[:300])
+            return None
+
+    def _invoke_with_tools(self, conversation: list, schema: Optional[Type[T]] = None):
+        """
+        Let the model call our tools (e.g. the finance calculators) for a few
+        rounds, feeding results back as ToolMessages, then return its answer.
+        With `schema`, the schema is offered as one more tool and the answer is
+        the validated arguments of that call.
+        """
+        llm = self.llm.bind_tools(self.tools + ([schema] if schema else []))
+        by_name = {t.name: t for t in self.tools}
+
+        for _ in range(settings.AGENT_MAX_TOOL_ROUNDS):
+            response = self._complete(llm, conversation)
+            if schema is not None:
+                for call in response.tool_calls:
+                    if call["name"] == schema.__name__:
+                        return schema.model_validate(call["args"])
+            if not response.tool_calls:
+                if schema is not None:
+                    break
+                return response.content.strip()
+            conversation.append(response)
+            for call in response.tool_calls:
+                check_cancelled()
+                tool = by_name.get(call["name"])
+                try:
+                    result = tool.invoke(call["args"]) if tool else f"Unknown tool: {call['name']}"
+                except Exception as e:
+                    result = f"Tool error: {e}"
+                conversation.append(ToolMessage(content=str(result), tool_call_id=call["id"]))
+
+        # Out of tool rounds (or answered in prose): ask for the final answer without tools
+        if schema is not None:
+            return self._complete_structured(conversation, schema)
+        return self._complete(self.llm, conversation).content.strip()
+
+    def _complete(self, llm, conversation: list) -> AIMessage:
+        """One LLM call, recorded in the run's trace (model, tokens, timing, retries) when there is one."""
+        estimated = estimate_messages_tokens(conversation)
+        log.debug("llm_call", agent=self.name, estimated_input_tokens=estimated)
+        trace = current_trace()
+        if trace is None:
+            return self._call_llm(llm, conversation)
+        with trace.llm_call(self.name, getattr(self.llm, "model_name", None), estimated) as call:
+            response = self._call_llm(llm, conversation)
+            record_response(call, response)
+        return response
+
+    def _call_llm(self, llm, conversation: list) -> AIMessage:
+        """The model call itself, through the active cassette (record/replay) if there is one."""
+        cassette = active_cassette()
+        if cassette is not None:
+            return cassette.call(self.name, llm, conversation, lambda: self._call_live(llm, conversation))
+        return self._call_live(llm, conversation)
+
+    def _call_live(self, llm, conversation: list) -> AIMessage:
+        """
+        Inside a cancellable run the response is streamed and the cancel token
+        checked per chunk; closing the stream drops the HTTP request, so a
+        cancelled run stops paying for tokens mid-generation.
+        """
+        token = current_cancel_token()
+        if token is None:
+            return llm.invoke(conversation)
 
-        response = chain.invoke({
-            "input": input_text,
-            "messages": messages,
-        })
+        token.raise_if_cancelled()
+        response = None
+        stream = llm.stream(conversation)
+        try:
+            for chunk in stream:
+                token.raise_if_cancelled()
+                response = chunk if response is None else response + chunk
+        finally:
+            stream.close()
+        if response is None:
+            raise ValueError("empty response from the model")
+        return response
 
-        return response.content.strip()
+    def _complete_structured(self, conversation: list, schema: Type[T]) -> T:
+        """Equivalent of `with_structured_output` (function calling), through `_complete` so it is traced and cancellable."""
+        llm = self.llm.bind_tools([schema], tool_choice=schema.__name__)
+        for call in self._complete(llm, conversation).tool_calls:
+            if call["name"] == schema.__name__:
+                return schema.model_validate(call["args"])
+        raise ValueError(f"model did not call {schema.__name__}")
 
     @abstractmethod
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
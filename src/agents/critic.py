@@ -1,8 +1,18 @@
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Optional
 from langchain_core.messages import HumanMessage, AIMessage
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, prompt_context
+from src.config.settings import settings
 from src.graphs.state import AgentState
+from src.schemas.output import CritiqueOutput
+from src.utils.prompts import Section
+
+
+def _score_from_text(text: str) -> Optional[int]:
+    """Best-effort score from a free-text critique (fallback path)."""
+    match = re.search(r"\b(10|[1-9])\s*(?:/|out of)\s*10\b", text)
+    return int(match.group(1)) if match else None
 
 
 class CritiqueAgent(BaseAgent):
@@ -31,7 +41,8 @@ Structure your response clearly:
 4. Missing elements / blind spots
 5. Specific improvement suggestions (very concrete)
 
-Be direct, professional, and helpful — never sugarcoat serious issues."""
+Be direct, professional, and helpful — never sugarcoat serious issues.
+Plan items are tagged with ids (A1, M1, C1, F1, R1): refer to them by id instead of quoting them."""
 
     def __init__(self):
         super().__init__(
@@ -44,23 +55,36 @@ Be direct, professional, and helpful — never sugarcoat serious issues."""
         if not state.get("generated_recommendations"):
             return {"critique": "No strategy was generated yet. Cannot critique."}
 
-        business = state["business"]
-        strategy = state["generated_recommendations"]
-
-        critique_prompt = f"""Business context:
-{business.model_dump_json(indent=2)}
+        context = prompt_context(state)
+        # Critique the latest version; structured plans are passed as id-tagged one-liners
+        plan = state.get("refined_plan") or state.get("strategy")
+        strategy = plan.compact() if plan is not None else (state.get("current_strategy") or state["generated_recommendations"])
 
-Proposed strategy to critique:
-{strategy}
-
-Perform a rigorous, honest critique following the instructions above."""
+        critique_prompt = self.build_prompt(
+            Section("Business context", context["business"]),
+            # Required: a truncated plan would be critiqued for items it only lost to trimming
+            Section("Proposed strategy to critique", strategy),
+            Section(None, "Perform a rigorous, honest critique following the instructions above."),
+        )
 
-        critique_text = self.invoke(critique_prompt)
+        critique = self.invoke_structured(critique_prompt, CritiqueOutput)
+        if critique is not None:
+            critique_text = critique.to_markdown()
+            score = critique.score
+            handoff = critique.compact()
+        else:
+            critique_text = handoff = self.invoke(critique_prompt)
+            score = _score_from_text(critique_text)
 
         return {
             "critique": critique_text,
+            "critique_output": critique,
+            "critique_score": score,
+            # Unknown score: keep refining within the plan's round limit
+            "needs_refinement": score is None or score < settings.CRITIQUE_PASS_SCORE,
+            "prompt_context": context,
             "messages": state["messages"] + [
                 HumanMessage(content=critique_prompt),
-                AIMessage(content=critique_text)
+                AIMessage(content=handoff)
             ]
         }
\ No newline at end of file
@@ -1,8 +1,14 @@
 from typing import Dict, Any
 from langchain_core.messages import HumanMessage, AIMessage
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, log, prompt_context
 from src.graphs.state import AgentState
+from src.config.settings import settings
+from src.schemas.output import PlanPatch, RefinedPlan
+from src.utils.patching import PatchError, apply_plan_patch
+from src.tools.finance_calculator import FINANCE_TOOLS
+from src.tools.simple_research import RESEARCH_TOOLS
+from src.utils.prompts import Section
 
 
 class RefinerAgent(BaseAgent):
@@ -20,7 +26,10 @@ Rules you MUST follow:
 - Adjust timelines, budgets and expectations considering local realities (limited capital, power issues, seasonal factors, etc.)
 - Improve prioritization — what should really come first?
 - Add missing practical details (approximate costs in LKR, who does what, how to measure success)
+- Never do arithmetic in prose: quote the pre-computed numbers and call the calculator tools
+  (break-even, runway, NPV/IRR, unit economics, CAC/LTV, loans) for budgets, margins and timelines
 - Maintain clear structure with headings and bullets
+- Plan items and critique issues carry ids (A1, M1, I1 ...): keep ids for items you keep, and say which issue each change addresses
 - Keep language simple, motivating but grounded
 
 Never ignore serious concerns raised by the critic.
@@ -38,7 +47,8 @@ Output format:
         super().__init__(
             name="Refiner",
             system_prompt=self.SYSTEM_PROMPT,
-            temperature=0.65   # balanced - creative enough but still grounded
+            temperature=0.65,   # balanced - creative enough but still grounded
+            tools=FINANCE_TOOLS + RESEARCH_TOOLS,
         )
 
     def run(self, state: AgentState) -> Dict[str, Any]:
@@ -47,29 +57,68 @@ Output format:
         if not state.get("critique"):
             return {"refined_strategy": "No critique available yet. Cannot refine."}
 
-        business = state["business"]
-        original = state["generated_recommendations"]
-        critique = state["critique"]
-
-        refine_prompt = f"""Business context:
-{business.model_dump_json(indent=2)}
-
-Original strategy:
-{original}
-
-Critic's feedback (address ALL points):
-{critique}
-
-Create a significantly improved version following the instructions above."""
+        context = prompt_context(state)
+        # Structured hand-off: id-tagged plan lines and only the actionable parts of the critique
+        plan = state.get("refined_plan") or state.get("strategy")
+        original = plan.compact() if plan is not None else (state.get("current_strategy") or state["generated_recommendations"])
+        critique_output = state.get("critique_output")
+        critique = critique_output.compact() if critique_output is not None else state["critique"]
+
+        # The plan under revision is never trimmed (a cut plan would be rewritten without its tail);
+        # the reference notes give way first, as in patch mode
+        refine_prompt = self.build_prompt(
+            Section("Business context", context["business"]),
+            Section("Pre-computed financials", context["financials"]),
+            Section("Industry reference notes (local benchmark library)", context["references"], min_tokens=0),
+            Section("Current strategy", original),
+            Section("Critic's feedback (address ALL points)", critique),
+            Section(None, "Create a significantly improved version following the instructions above."),
+        )
 
-        refined_text = self.invoke(refine_prompt)
+        refined = None
+        if settings.REFINER_PATCH_MODE and state.get("refined_plan") is not None:
+            # Later rounds: emit only targeted edits instead of rewriting the whole plan
+            refined = self._refine_with_patch(state["refined_plan"], original, critique, context)
+        if refined is None:
+            refined = self.invoke_structured(refine_prompt, RefinedPlan)
+        if refined is not None:
+            refined_text = refined.to_markdown()
+            handoff = refined.compact()
+        else:
+            refined_text = handoff = self.invoke(refine_prompt)
 
         return {
             "refined_strategy": refined_text,
             "current_strategy": refined_text,  # now this is the best version
-            "needs_refinement": False,         # we can reset this flag
+            "refined_plan": refined,
+            "prompt_context": context,
+            # needs_refinement stays as the critic scored it; decide_refinement reads it
+            "current_refinement_round": state.get("current_refinement_round", 0) + 1,
             "messages": state["messages"] + [
                 HumanMessage(content=refine_prompt),
-                AIMessage(content=refined_text)
+                AIMessage(content=handoff)
             ]
-        }
\ No newline at end of file
+        }
+
+    def _refine_with_patch(self, plan: RefinedPlan, original: str, critique: str, context: Dict[str, str]) -> RefinedPlan | None:
+        """Ask for a PlanPatch and apply it; None means fall back to a full rewrite."""
+        # The plan is edited by id, so it is never trimmed; reference notes were already used in round one
+        patch_prompt = self.build_prompt(
+            Section("Business", context["business"]),
+            Section("Pre-computed financials", context["financials"]),
+            Section("Industry reference notes", context["references"], min_tokens=0),
+            Section("Current plan (id-tagged)", original),
+            Section("Critic's feedback on this plan", critique),
+            Section(None, """Do NOT rewrite the plan. Return only the edits needed to address each issue:
+replace or remove items by id, insert new items (with new ids), or replace the summary.
+Set issue_id on every edit. Leave items the critic did not question untouched."""),
+        )
+
+        patch = self.invoke_structured(patch_prompt, PlanPatch)
+        if patch is None or not patch.edits:
+            return None
+        try:
+            return apply_plan_patch(plan, patch)
+        except PatchError as e:
+            log.warning("patch_rejected", agent=self.name, edits=len(patch.edits), error=str(e))
+            return None
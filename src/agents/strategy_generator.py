@@ -1,6 +1,10 @@
 from typing import Dict, Any
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, prompt_context
 from src.graphs.state import AgentState
+from src.schemas.output import StrategyOutput
+from src.tools.finance_calculator import FINANCE_TOOLS
+from src.tools.simple_research import RESEARCH_TOOLS
+from src.utils.prompts import Section
 from langchain_core.messages import HumanMessage, SystemMessage
 
 
@@ -19,30 +23,49 @@ Given the business information and the main goal, create a concise but powerful
 5. Potential quick wins and early warning risks
 
 Be realistic, specific, and culturally/business-context aware (especially for Sri Lanka / emerging markets).
-Use simple, actionable language. Structure output with clear headings and bullet points."""
+Use simple, actionable language. Structure output with clear headings and bullet points.
+
+Never do arithmetic yourself: quote the pre-computed financial numbers you are given, and call the
+calculator tools (break-even, runway, NPV/IRR, unit economics, CAC/LTV, loans) for anything else."""
 
     def __init__(self):
         super().__init__(
             name="StrategyGenerator",
             system_prompt=self.SYSTEM_PROMPT,
-            temperature=0.75
+            temperature=0.75,
+            tools=FINANCE_TOOLS + RESEARCH_TOOLS,
         )
 
     def run(self, state: AgentState) -> Dict[str, Any]:
-        business = state["business"]
-
-        prompt = f"""Business information:
-{business.model_dump_json(indent=2)}
+        context = prompt_context(state)
+        user_context = state.get("user_context")
+        if user_context:
+            instructions = """This is a follow-up. Build on the earlier advice instead of starting over: focus on what is new
+or must change for the current goal, and refer to still-valid earlier recommendations in one line
+rather than repeating them. Learn from low ratings."""
+        else:
+            instructions = "Generate comprehensive growth recommendations."
 
-Main goal: {business.main_goal}
-Other goals: {', '.join(business.other_goals)}
-
-Generate comprehensive growth recommendations."""
+        prompt = self.build_prompt(
+            Section("Business information", context["business"]),
+            Section("Pre-computed financials", context["financials"]),
+            Section("Industry reference notes (local benchmark library; prefer these figures over memory)",
+                    context["references"], min_tokens=150, priority=0),
+            Section("Earlier consultations with this user", user_context or "", min_tokens=200, priority=1),
+            Section(None, instructions),
+        )
 
-        recommendations = self.invoke(prompt)
+        strategy = self.invoke_structured(prompt, StrategyOutput)
+        if strategy is not None:
+            recommendations = strategy.to_markdown()
+            handoff = strategy.compact()
+        else:
+            recommendations = handoff = self.invoke(prompt)
 
         return {
             "generated_recommendations": recommendations,
             "current_strategy": recommendations,  # initial version
-            "messages": state["messages"] + [HumanMessage(content=prompt), SystemMessage(content=recommendations)]
+            "strategy": strategy,
+            "prompt_context": context,
+            "messages": state["messages"] + [HumanMessage(content=prompt), SystemMessage(content=handoff)]
         }
\ No newline at end of file
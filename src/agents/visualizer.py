@@ -3,8 +3,9 @@
 from typing import Dict, Any
 from langchain_core.messages import HumanMessage, AIMessage
 
-from src.agents.base_agent import BaseAgent
+from src.agents.base_agent import BaseAgent, prompt_context
 from src.graphs.state import AgentState
+from src.utils.prompts import Section
 
 
 class VisualizerAgent(BaseAgent):
@@ -43,22 +44,24 @@ Output ONLY the Python code.
         )
 
     def run(self, state: AgentState) -> Dict[str, Any]:
-        business = state["business"]
-        strategy = state.get("refined_strategy") or state.get("generated_recommendations", "No strategy available yet")
-
-        if not strategy or "No" in strategy:
-            return {"visualization_code": "# No valid strategy to visualize yet"}
-
-        viz_prompt = f"""Business context:
-{business.model_dump_json(indent=2)}
-
-Current best strategy / recommendations:
-{strategy[:2500]}  # truncate if too long
-
-Create Python code using plotly that creates 1–2 most relevant business visualizations.
+        context = prompt_context(state)
+        plan = state.get("refined_plan") or state.get("strategy")
+        if plan is not None:
+            # Only the parts that carry numbers worth charting
+            strategy = plan.compact(fields=["short_term_actions", "financial_levers", "metrics"])
+        else:
+            strategy = state.get("refined_strategy") or state.get("generated_recommendations", "No strategy available yet")
+            if not strategy or "No" in strategy:
+                return {"visualization_code": "# No valid strategy to visualize yet"}
+
+        viz_prompt = self.build_prompt(
+            Section("Business context", context["business"]),
+            Section("Current best strategy / recommendations", strategy, min_tokens=200),
+            Section(None, """Create Python code using plotly that creates 1–2 most relevant business visualizations.
 Focus on financial aspects (cash flow, break-even, revenue projection) since the main goal is reaching break-even.
 
-Output ONLY the Python code. Nothing else."""
+Output ONLY the Python code. Nothing else."""),
+        )
 
         code_response = self.invoke(viz_prompt)
 
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,110 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "llama-3.1-70b-versatile"
     TEMPERATURE: float = 0.65
     MAX_TOKENS: int = 4096
+    # USD per million tokens, for cost estimates in run traces (GET /api/traces/aggregates)
+    LLM_INPUT_PRICE_PER_MTOK: float = 0.59
+    LLM_OUTPUT_PRICE_PER_MTOK: float = 0.79
+    # Sent as X-Operator-Key to read cross-user operator metrics (GET /api/traces/aggregates);
+    # unset disables them
+    OPERATOR_API_KEY: Optional[str] = None
+    # Estimated input tokens per agent prompt (system prompt included); lower-priority
+    # sections (reference notes, earlier consultations) are trimmed to fit, while the plan
+    # under critique or refinement is always sent whole
+    AGENT_INPUT_TOKEN_BUDGETS: Dict[str, int] = {
+        "StrategyGenerator": 1600,
+        "Critic": 1200,
+        "Refiner": 1800,
+        "Visualizer": 900,
+    }
+    # Max model <-> tool round trips per agent call (finance calculator tools)
+    AGENT_MAX_TOOL_ROUNDS: int = 3
+    # Critic score (1-10) at which a plan needs no further refinement rounds
+    CRITIQUE_PASS_SCORE: int = 8
+    # Refinement rounds after the first send targeted edits instead of a full rewrite
+    REFINER_PATCH_MODE: bool = True
+    # LLM cassettes (src/utils/cassettes.py): "off", "record" or "replay"; replay latency = scale x recorded
+    LLM_CASSETTE_MODE: str = "off"
+    LLM_CASSETTE_PATH: str = "tests/cassettes/session.json"
+    LLM_CASSETTE_LATENCY_SCALE: float = 0.0
+
+    # Logging (src/utils/logging.py): JSON lines via a background writer thread
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
+    SLOW_REQUEST_MS: float = 2000.0
+
+    # Build the agent graph and open the LLM connection in the background at startup
+    WARMUP_ON_STARTUP: bool = False
+
+    # How often a running consultation checks whether its client is still connected
+    DISCONNECT_POLL_SECONDS: float = 0.5
+    # Idempotency-Key retention, and how long a disconnected keyed request's run waits for a retry to attach
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600
+    IDEMPOTENCY_REATTACH_SECONDS: float = 30.0
+    # Admission control: concurrent runs per user by subscription, server-wide cap,
+    # and how many of those slots only paid plans (pro/enterprise) may use
+    ADMISSION_USER_CONCURRENCY: Dict[str, int] = {"free": 1, "starter": 1, "pro": 2, "enterprise": 4}
+    ADMISSION_MAX_RUNNING: int = 8
+    ADMISSION_RESERVED_PAID_SLOTS: int = 2
+
+    # Rate limits (app/api/rate_limit.py): route class -> subscription tier -> "requests/seconds"
+    # token bucket; "anonymous" = no session (keyed by IP), "default" = tiers not listed
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "auth": {"default": "10/60"},
+        "consultations": {"default": "5/60", "pro": "20/60", "enterprise": "60/60"},
+        "export": {"default": "20/60", "pro": "60/60", "enterprise": "120/60"},
+        "api": {"anonymous": "60/60", "default": "300/60", "enterprise": "1200/60"},
+    }
+    # Take the client IP from X-Forwarded-For (only behind trusted proxies): the entry
+    # RATE_LIMIT_TRUSTED_PROXIES hops from the right, as entries further left are client-supplied
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_TRUSTED_PROXIES: int = 1
+
+    # Consultation records (app/api/records.py): large text fields are compressed from this size;
+    # records not accessed for RECORD_COLD_AFTER_SECONDS move to segment files in RECORD_SPILL_DIR
+    RECORD_COMPRESS_MIN_BYTES: int = 256
+    RECORD_COLD_AFTER_SECONDS: float = 1800.0
+    RECORD_SPILL_DIR: str = ".cache/records"
+    RECORD_SPILL_INTERVAL_SECONDS: float = 60.0
+    RECORD_SEGMENT_MAX_MB: int = 64
+
+    # Notifications: per-user history cap and SSE keep-alive interval
+    NOTIFICATIONS_MAX_PER_USER: int = 200
+    NOTIFICATIONS_HEARTBEAT_SECONDS: float = 15.0
+
+    # PDF export: process pool size and two-tier render cache
+    PDF_RENDER_WORKERS: int = 2
+    PDF_CACHE_DIR: str = ".cache/pdf"
+    PDF_CACHE_MEMORY_MB: int = 64
+    PDF_PRERENDER_ON_COMPLETE: bool = False
+    EXPORT_RENDER_CONCURRENCY: int = 4
+
+    # Monte Carlo cash-flow charts (visualization_data)
+    SIMULATION_PATHS: int = 10_000
+    SIMULATION_GROWTH_VOLATILITY: float = 0.08
+    SIMULATION_MAX_GROWTH: float = 0.5
+    VISUALIZATION_CACHE_SIZE: int = 512
+
+    # Goal-seek planning grids (POST /api/planning/solve): max rows/columns and longest horizon
+    PLANNING_MAX_GRID_STEPS: int = 200
+    PLANNING_MAX_HORIZON_MONTHS: int = 240
+
+    # Sandboxed rendering of LLM-generated plotly code
+    FIGURE_WORKERS: int = 2
+    FIGURE_TIMEOUT_SECONDS: float = 15.0
+    FIGURE_CPU_SECONDS: int = 5
+    FIGURE_MEMORY_MB: int = 1024
+    FIGURE_CACHE_MB: int = 32
+
+    # Local industry-knowledge retrieval (src/tools/simple_research.py)
+    RESEARCH_CORPUS_DIR: str = "data/industry"
+    RESEARCH_INDEX_DIR: str = ".cache/research_index"
+    RESEARCH_TOP_K: int = 3
+
+    # Per-user memory of past consultations fed to follow-up runs
+    SESSION_MEMORY_TOKEN_BUDGET: int = 600
+    SESSION_MEMORY_MAX_CONSULTATIONS: int = 20
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import time
 from typing import Literal, Optional
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
@@ -6,7 +7,13 @@ from src.agents.strategy_generator import StrategyGeneratorAgent
 from src.agents.critic import CritiqueAgent
 from src.agents.refiner import RefinerAgent
 from src.agents.visualizer import VisualizerAgent
+from src.config.settings import settings
 from src.graphs.state import AgentState
+from src.utils.cancellation import check_cancelled
+from src.utils.logging import bound_context, get_logger
+from src.utils.tracing import node_span
+
+log = get_logger("src.graphs")
 
 
 _graph = None
@@ -33,25 +40,24 @@ def get_graph():
     _refiner = RefinerAgent()
     _visualizer = VisualizerAgent()
 
-    def generate_node(state: AgentState) -> AgentState:
-        """Run strategy generator"""
-        update = _generator.run(state)  # type: ignore[union-attr]
-        return {**state, **update}
-
-    def critique_node(state: AgentState) -> AgentState:
-        """Run critic"""
-        update = _critic.run(state)  # type: ignore[union-attr]
-        return {**state, **update}
-
-    def refine_node(state: AgentState) -> AgentState:
-        """Run refiner"""
-        update = _refiner.run(state)  # type: ignore[union-attr]
-        return {**state, **update}
-
-    def visualize_node(state: AgentState) -> AgentState:
-        """Run visualizer"""
-        update = _visualizer.run(state)  # type: ignore[union-attr]
-        return {**state, **update}
+    def traced(name: str, agent):
+        """Run one agent with node/round bound to every log line it emits; a cancelled run stops before the node."""
+        def node(state: AgentState) -> AgentState:
+            check_cancelled()
+            round_no = state.get("current_refinement_round", 0)
+            with bound_context(node=name, round=round_no), node_span(name, round_no):
+                started = time.perf_counter()
+                log.debug("node_started")
+                update = agent.run(state)
+                log.info("node_finished", duration_ms=round((time.perf_counter() - started) * 1000))
+            return {**state, **update}
+        node.__name__ = f"{name}_node"
+        return node
+
+    generate_node = traced("generate", _generator)
+    critique_node = traced("critique", _critic)
+    refine_node = traced("refine", _refiner)
+    visualize_node = traced("visualize", _visualizer)
 
     # Build the graph
     workflow = StateGraph(state_schema=AgentState)
@@ -64,7 +70,15 @@ def get_graph():
     # Edges
     workflow.add_edge(START, "generate")
     workflow.add_edge("generate", "critique")
-    workflow.add_edge("critique", "refine")
+    # A re-critique that passes skips the extra refine call
+    workflow.add_conditional_edges(
+        "critique",
+        decide_after_critique,
+        {
+            "refine": "refine",
+            "visualize": "visualize"
+        }
+    )
 
     # After refine → decide whether to loop or go to visualize
     workflow.add_conditional_edges(
@@ -86,13 +100,20 @@ def get_graph():
 
 def decide_refinement(state: AgentState) -> Literal["refine", "visualize"]:
     """
-    Simple decision: refine again or go to visualization
-    For the first version we do only ONE refinement round
+    After a refine: go round again (re-critique) only if the last critique
+    scored below CRITIQUE_PASS_SCORE and the plan's round limit allows it.
     """
-    # You can make this smarter later (count rounds, quality score, etc.)
     if state.get("needs_refinement", False) and state.get("current_refinement_round", 0) < state.get("max_refinement_rounds", 3):
         return "refine"
     return "visualize"
 
 
+def decide_after_critique(state: AgentState) -> Literal["refine", "visualize"]:
+    """The first draft is always refined once; later drafts only if the critic still finds them weak."""
+    score = state.get("critique_score")
+    if state.get("current_refinement_round", 0) > 0 and score is not None and score >= settings.CRITIQUE_PASS_SCORE:
+        return "visualize"
+    return "refine"
+
+
 graph = None  # backwards-compat; prefer get_graph()
\ No newline at end of file
@@ -1,19 +1,8 @@
-from typing import Annotated, TypedDict, List
+from typing import Annotated, Dict, TypedDict, List
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
-from pydantic import BaseModel, Field
-
-
-class BusinessInfo(BaseModel):
-    """Core information about the user's business"""
-    business_type: str = Field(..., description="Type/category of business (e.g. cafe, online store, consulting)")
-    business_stage: str = Field(..., description="Current stage (idea, startup, growth, mature)")
-    location: str | None = None
-    team_size: int | None = None
-    monthly_revenue: float | None = Field(None, description="Approximate monthly revenue in USD")
-    monthly_expenses: float | None = None
-    main_goal: str = Field(..., description="Primary business goal right now")
-    other_goals: List[str] = Field(default_factory=list)
+from src.schemas.business import BusinessInfo  # noqa: F401  (re-exported; lives there to keep imports light)
+from src.schemas.output import CritiqueOutput, RefinedPlan, StrategyOutput
 
 
 class AgentState(TypedDict):
@@ -24,17 +13,30 @@ class AgentState(TypedDict):
     # Business context — filled once at the beginning
     business: BusinessInfo
 
+    # Compact summary of the user's earlier consultations (SessionMemory); empty for first runs
+    user_context: str | None
+
+    # Prompt pieces rendered once per run and reused by every agent (base_agent.prompt_context):
+    # compact business context, pre-computed financials, industry reference notes
+    prompt_context: Dict[str, str] | None
+
     # Conversation history (useful for context and memory)
     messages: Annotated[List[BaseMessage], add_messages]
 
     # The current "working draft" of our main output
     current_strategy: str | None
 
-    # Structured outputs from different agents
+    # Agent outputs as markdown (for people and for the text fallback path)
     generated_recommendations: str | None
     critique: str | None
     refined_strategy: str | None
 
+    # Structured outputs (src/schemas/output.py); None when an agent fell back to text
+    strategy: StrategyOutput | None
+    critique_output: CritiqueOutput | None
+    critique_score: int | None
+    refined_plan: RefinedPlan | None
+
     # Control flow flags
     needs_refinement: bool = False
     max_refinement_rounds: int = 3
@@ -0,0 +1,171 @@
+"""
+Per-user session memory.
+
+Keeps a compact digest of each user's businesses, past consultations and their
+feedback ratings, so a follow-up consultation can start from what was already
+advised instead of re-deriving it. Digests are extracted once when a
+consultation is recorded (no LLM call); the rendered context is cached per user
+and business and held under a fixed token budget.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from src.schemas.business import BusinessInfo
+from src.utils.tokens import estimate_tokens, truncate_to_tokens
+
+DIGEST_TOKENS = 90
+
+_HEADING_RE = re.compile(r"^(#{1,6}\s+|\d+[.)]\s+|\*\*)")
+_BULLET_RE = re.compile(r"^[-*•]\s+")
+_MARKUP_RE = re.compile(r"[*_`#>]+")
+
+
+def business_key(business_type: str, location: Optional[str]) -> str:
+    return f"{business_type.strip().lower()}|{(location or '').strip().lower()}"
+
+
+def digest_strategy(strategy: str, max_tokens: int = DIGEST_TOKENS) -> str:
+    """
+    Extractive summary of a strategy: section headings and the first bullet under
+    each, joined on one line, cut to `max_tokens`.
+    """
+    parts = []
+    bullets_in_section = 0
+    for raw in strategy.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if _HEADING_RE.match(line):
+            parts.append(_MARKUP_RE.sub("", _HEADING_RE.sub("", line)).strip(" :") + ":")
+            bullets_in_section = 0
+        elif _BULLET_RE.match(line) and bullets_in_section < 1:
+            parts.append(_MARKUP_RE.sub("", _BULLET_RE.sub("", line)).strip() + ";")
+            bullets_in_section += 1
+    text = " ".join(p for p in parts if p not in (":", ";")) or " ".join(strategy.split())
+    return truncate_to_tokens(text, max_tokens)
+
+
+class _Entry:
+    __slots__ = ("consultation_id", "created_at", "business_key", "label", "goal", "digest", "rating", "comment")
+
+    def __init__(self, consultation: dict):
+        business = consultation.get("business") or {}
+        self.consultation_id = consultation["id"]
+        self.created_at = (consultation.get("created_at") or "")[:10]
+        self.business_key = business_key(business.get("business_type", ""), business.get("location"))
+        self.label = consultation.get("business_name") or business.get("business_type", "business")
+        self.goal = truncate_to_tokens(business.get("main_goal", ""), 30)
+        self.digest = digest_strategy(consultation.get("refined_strategy") or "")
+        self.rating: Optional[int] = None
+        self.comment: Optional[str] = None
+        feedback = consultation.get("feedback")
+        if feedback:
+            self.rating = feedback.get("rating")
+            self.comment = feedback.get("comment")
+
+    def render(self, digest: Optional[str] = None) -> str:
+        feedback = ""
+        if self.rating:
+            feedback = f" (rated {self.rating}/5"
+            feedback += f': "{truncate_to_tokens(self.comment, 25)}")' if self.comment else ")"
+        return f"- {self.created_at} {self.label} — goal: {self.goal}{feedback}\n  Advised: {digest or self.digest}"
+
+
+class _UserMemory:
+    __slots__ = ("businesses", "entries", "rendered")
+
+    def __init__(self):
+        self.businesses: Dict[str, str] = {}
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()  # oldest -> newest
+        self.rendered: Dict[str, str] = {}
+
+
+class SessionMemory:
+    """Thread-safe, in-memory; one instance per process (like the other stores)."""
+
+    def __init__(self, token_budget: int = 600, max_consultations: int = 20):
+        self.token_budget = token_budget
+        self.max_consultations = max_consultations
+        self._users: Dict[str, _UserMemory] = {}
+        self._lock = threading.Lock()
+
+    def record_consultation(self, user_id: str, consultation: dict) -> None:
+        """Add or refresh one consultation (also call after edits to its name/business)."""
+        entry = _Entry(consultation)
+        business = consultation.get("business") or {}
+        profile = ", ".join(str(v) for v in (
+            business.get("business_stage"),
+            business.get("location"),
+            f"team {business['team_size']}" if business.get("team_size") else None,
+            f"revenue ${business['monthly_revenue']:,.0f}/mo" if business.get("monthly_revenue") else None,
+            f"expenses ${business['monthly_expenses']:,.0f}/mo" if business.get("monthly_expenses") else None,
+        ) if v)
+        with self._lock:
+            memory = self._users.setdefault(user_id, _UserMemory())
+            old = memory.entries.pop(entry.consultation_id, None)
+            if old is not None and old.rating and not entry.rating:
+                entry.rating, entry.comment = old.rating, old.comment
+            memory.entries[entry.consultation_id] = entry
+            while len(memory.entries) > self.max_consultations:
+                memory.entries.popitem(last=False)
+            memory.businesses[entry.business_key] = f"{entry.label} ({profile})" if profile else entry.label
+            memory.rendered.clear()
+
+    def record_feedback(self, user_id: str, consultation_id: str, rating: int, comment: Optional[str]) -> None:
+        with self._lock:
+            memory = self._users.get(user_id)
+            entry = memory.entries.get(consultation_id) if memory else None
+            if entry is None:
+                return
+            entry.rating, entry.comment = rating, comment
+            memory.rendered.clear()
+
+    def forget(self, user_id: str, consultation_id: str) -> None:
+        with self._lock:
+            memory = self._users.get(user_id)
+            if memory and memory.entries.pop(consultation_id, None) is not None:
+                live = {e.business_key for e in memory.entries.values()}
+                memory.businesses = {k: v for k, v in memory.businesses.items() if k in live}
+                memory.rendered.clear()
+
+    def context_for(self, user_id: str, business: BusinessInfo) -> str:
+        """
+        Compact summary for a new consultation, within `token_budget`: the user's
+        businesses, then past consultations (same business first, newest first).
+        Empty for first-time users.
+        """
+        key = business_key(business.business_type, business.location)
+        with self._lock:
+            memory = self._users.get(user_id)
+            if memory is None or not memory.entries:
+                return ""
+            cached = memory.rendered.get(key)
+            if cached is not None:
+                return cached
+            text = self._render(memory, key)
+            memory.rendered[key] = text
+            return text
+
+    def _render(self, memory: _UserMemory, key: str) -> str:
+        lines = ["Businesses: " + "; ".join(
+            [memory.businesses[key]] * (key in memory.businesses)
+            + [v for k, v in memory.businesses.items() if k != key]
+        )]
+        used = estimate_tokens(lines[0])
+        newest_first = list(reversed(memory.entries.values()))
+        ordered = [e for e in newest_first if e.business_key == key] + [e for e in newest_first if e.business_key != key]
+        for entry in ordered:
+            block = entry.render()
+            cost = estimate_tokens(block) + 1
+            if used + cost > self.token_budget:
+                if len(lines) == 1:
+                    # Always include the most relevant consultation, with a shorter digest
+                    room = self.token_budget - used - estimate_tokens(entry.render("")) - 1
+                    if room > 10:
+                        lines.append(entry.render(truncate_to_tokens(entry.digest, room)))
+                break
+            lines.append(block)
+            used += cost
+        return "\n".join(lines)
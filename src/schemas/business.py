@@ -0,0 +1,15 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class BusinessInfo(BaseModel):
+    """Core information about the user's business"""
+    business_type: str = Field(..., description="Type/category of business (e.g. cafe, online store, consulting)")
+    business_stage: str = Field(..., description="Current stage (idea, startup, growth, mature)")
+    location: str | None = None
+    team_size: int | None = None
+    monthly_revenue: float | None = Field(None, description="Approximate monthly revenue in USD")
+    monthly_expenses: float | None = None
+    main_goal: str = Field(..., description="Primary business goal right now")
+    other_goals: List[str] = Field(default_factory=list)
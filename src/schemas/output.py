@@ -0,0 +1,173 @@
+"""
+Structured agent outputs.
+
+Agents produce these through the LLM's structured-output (function calling)
+mode. Every item carries a short id (A1, M2, R1, I3 ...) so later nodes can
+refer to items without quoting them. Each model renders two ways:
+- `to_markdown()` for people (API `refined_strategy`, PDF, Streamlit);
+- `compact()` for the next agent's prompt: one terse line per item.
+"""
+from typing import ClassVar, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PlanItem(BaseModel):
+    id: str = Field(..., description="Short id, e.g. A1 for actions, M1 for medium-term, C1 channels, F1 levers")
+    title: str = Field(..., description="The recommendation in a few words")
+    detail: str = Field("", description="One or two sentences: how, who, rough cost")
+    timeframe: Optional[str] = Field(None, description="e.g. 'weeks 1-4'")
+
+
+class Risk(BaseModel):
+    id: str = Field(..., description="Short id, e.g. R1")
+    risk: str
+    mitigation: str = ""
+
+
+class Metric(BaseModel):
+    name: str
+    target: str = Field("", description="Measurable target, e.g. '40 covers/day by month 3'")
+
+
+class StrategyOutput(BaseModel):
+    """Growth strategy for the business."""
+    summary: str = Field(..., description="Two or three sentence overview")
+    short_term_actions: List[PlanItem] = Field(default_factory=list, description="3-5 actions for the next 1-3 months (ids A1..)")
+    medium_term_strategies: List[PlanItem] = Field(default_factory=list, description="2-3 strategies for 3-12 months (ids M1..)")
+    marketing_channels: List[PlanItem] = Field(default_factory=list, description="Channels and tactics (ids C1..)")
+    financial_levers: List[PlanItem] = Field(default_factory=list, description="Levers to improve profitability (ids F1..)")
+    risks: List[Risk] = Field(default_factory=list, description="Early warning risks (ids R1..)")
+    metrics: List[Metric] = Field(default_factory=list, description="Success metrics / early indicators")
+
+    SECTIONS: ClassVar[tuple] = (
+        ("short_term_actions", "Short-term Actions (1–3 months)"),
+        ("medium_term_strategies", "Medium-term Strategies (3–12 months)"),
+        ("marketing_channels", "Marketing Channels & Tactics"),
+        ("financial_levers", "Financial Levers"),
+    )
+
+    def _section_markdown(self) -> List[str]:
+        lines = [self.summary.strip(), ""]
+        for field, heading in self.SECTIONS:
+            items = getattr(self, field)
+            if not items:
+                continue
+            lines.append(f"## {heading}")
+            for item in items:
+                when = f" _({item.timeframe})_" if item.timeframe else ""
+                lines.append(f"- **{item.title}**{when}" + (f" — {item.detail}" if item.detail else ""))
+            lines.append("")
+        if self.risks:
+            lines.append("## Risks & Mitigation")
+            lines += [f"- **{r.risk}**" + (f" — {r.mitigation}" if r.mitigation else "") for r in self.risks]
+            lines.append("")
+        if self.metrics:
+            lines.append("## Success Metrics")
+            lines += [f"- {m.name}" + (f": {m.target}" if m.target else "") for m in self.metrics]
+            lines.append("")
+        return lines
+
+    def to_markdown(self) -> str:
+        return "\n".join(self._section_markdown()).strip()
+
+    def compact(self, fields: Optional[List[str]] = None) -> str:
+        """One line per item, id-tagged; `fields` limits which sections are included."""
+        lines = [f"Summary: {self.summary.strip()}"]
+        for field, _ in self.SECTIONS:
+            if fields and field not in fields:
+                continue
+            for item in getattr(self, field):
+                when = f" [{item.timeframe}]" if item.timeframe else ""
+                lines.append(f"{item.id}: {item.title}{when}" + (f" — {item.detail}" if item.detail else ""))
+        if not fields or "risks" in fields:
+            lines += [f"{r.id}: risk {r.risk}" + (f" → {r.mitigation}" if r.mitigation else "") for r in self.risks]
+        if not fields or "metrics" in fields:
+            lines += [f"KPI: {m.name}" + (f" = {m.target}" if m.target else "") for m in self.metrics]
+        return "\n".join(lines)
+
+
+class Issue(BaseModel):
+    id: str = Field(..., description="Short id, e.g. I1")
+    severity: Literal["high", "medium", "low"] = "medium"
+    refers_to: List[str] = Field(default_factory=list, description="Ids of the plan items concerned, e.g. ['A2']")
+    problem: str
+    suggestion: str = Field("", description="Concrete fix")
+
+
+class CritiqueOutput(BaseModel):
+    """Critique of a proposed strategy."""
+    score: int = Field(..., ge=1, le=10, description="Overall quality 1-10")
+    strengths: List[str] = Field(default_factory=list, description="Item ids or short notes worth keeping")
+    issues: List[Issue] = Field(default_factory=list, description="Weaknesses, red flags and blind spots")
+    suggestions: List[str] = Field(default_factory=list, description="Other concrete improvements not tied to one issue")
+
+    def to_markdown(self) -> str:
+        lines = [f"**Overall quality score:** {self.score}/10", ""]
+        if self.strengths:
+            lines += ["## Strong points"] + [f"- {s}" for s in self.strengths] + [""]
+        if self.issues:
+            lines.append("## Weaknesses & red flags")
+            for issue in self.issues:
+                about = f" ({', '.join(issue.refers_to)})" if issue.refers_to else ""
+                lines.append(f"- **[{issue.severity}]**{about} {issue.problem}"
+                             + (f" — *Fix:* {issue.suggestion}" if issue.suggestion else ""))
+            lines.append("")
+        if self.suggestions:
+            lines += ["## Improvement suggestions"] + [f"- {s}" for s in self.suggestions]
+        return "\n".join(lines).strip()
+
+    def compact(self) -> str:
+        """What the refiner needs: score, what to keep, and every issue with its fix."""
+        lines = [f"Score: {self.score}/10"]
+        if self.strengths:
+            lines.append("Keep: " + "; ".join(self.strengths))
+        for issue in self.issues:
+            about = f" ({','.join(issue.refers_to)})" if issue.refers_to else ""
+            lines.append(f"{issue.id} [{issue.severity}]{about}: {issue.problem}"
+                         + (f" → {issue.suggestion}" if issue.suggestion else ""))
+        lines += [f"+ {s}" for s in self.suggestions]
+        return "\n".join(lines)
+
+
+class Change(BaseModel):
+    issue_id: Optional[str] = Field(None, description="Critique issue addressed, e.g. I2")
+    change: str
+
+
+class RefinedPlan(StrategyOutput):
+    """Improved strategy after critique."""
+    changes: List[Change] = Field(default_factory=list, description="Key changes made and why")
+
+    def to_markdown(self) -> str:
+        lines = self._section_markdown()
+        if self.changes:
+            lines.append("## Key Changes Made & Why")
+            lines += [f"- {c.change}" + (f" ({c.issue_id})" if c.issue_id else "") for c in self.changes]
+        return "\n".join(lines).strip()
+
+
+PlanSection = Literal[
+    "summary", "short_term_actions", "medium_term_strategies", "marketing_channels",
+    "financial_levers", "risks", "metrics",
+]
+
+
+class PlanEdit(BaseModel):
+    """One targeted change to an existing plan."""
+    op: Literal["replace", "insert", "remove"]
+    section: PlanSection
+    target_id: Optional[str] = Field(
+        None, description="Item to replace/remove, or to insert after (metrics use their name). Not used for summary.",
+    )
+    issue_id: Optional[str] = Field(None, description="Critique issue this edit addresses, e.g. I2")
+    reason: str = Field(..., description="What changed and why, one sentence")
+    item: Optional[PlanItem] = Field(None, description="New item for action/strategy/channel/lever sections")
+    risk: Optional[Risk] = Field(None, description="New item for the risks section")
+    metric: Optional[Metric] = Field(None, description="New item for the metrics section")
+    text: Optional[str] = Field(None, description="New summary text (section 'summary' only)")
+
+
+class PlanPatch(BaseModel):
+    """Targeted edits to the current plan; unchanged items are not repeated."""
+    edits: List[PlanEdit] = Field(default_factory=list)
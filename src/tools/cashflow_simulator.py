@@ -0,0 +1,179 @@
+"""
+Vectorized Monte Carlo cash-flow engine.
+
+Simulates many monthly revenue/expense paths at once with NumPy and reduces
+them to percentile bands for the dashboard charts. Arrays are laid out as
+(months, paths) so the cumulative sums and per-month percentiles run along
+contiguous memory.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+PERCENTILES = (10, 50, 90)
+
+
+class ScenarioConfig(BaseModel):
+    """Knobs for one simulation run"""
+    months: int = Field(12, ge=1, le=120)
+    n_paths: int = Field(10_000, ge=1, le=200_000)
+    growth_mean: float = Field(0.05, description="Expected monthly revenue growth (0.05 = +5%/month)")
+    growth_volatility: float = Field(0.08, ge=0, description="Std-dev of monthly log-growth")
+    expense_cut: float = Field(0.10, ge=0, le=0.9, description="Expense reduction reached by the last month")
+    expense_volatility: float = Field(0.03, ge=0, description="Std-dev of monthly expense noise")
+    seasonality: List[float] = Field(
+        default_factory=list,
+        description="Optional 12 monthly multipliers (month 1 = first projected month); normalized to mean 1",
+    )
+    break_even_month: Optional[int] = Field(None, ge=1, description="N for P(break-even by month N); defaults to horizon")
+    seed: int = 0
+
+
+class SimulationResult:
+    """Raw simulated paths, shape (months, paths)"""
+
+    __slots__ = ("revenue", "expenses", "net", "cumulative")
+
+    def __init__(self, revenue: np.ndarray, expenses: np.ndarray):
+        self.revenue = revenue
+        self.expenses = expenses
+        self.net = revenue - expenses
+        self.cumulative = _accumulate_rows(self.net.copy(), np.add)
+
+    def break_even_probability(self) -> np.ndarray:
+        """P(some month <= m had net >= 0), for every month m."""
+        reached = _accumulate_rows(self.net >= 0, np.logical_or)
+        return np.count_nonzero(reached, axis=1) / reached.shape[1]
+
+
+def _accumulate_rows(values: np.ndarray, ufunc: np.ufunc) -> np.ndarray:
+    """
+    In-place running `ufunc` down the month axis. With few months and many paths a
+    row-by-row loop of wide vector ops is several times faster than
+    `ufunc.accumulate(axis=0)`, which walks the array column-wise.
+    """
+    for i in range(1, values.shape[0]):
+        ufunc(values[i - 1], values[i], out=values[i])
+    return values
+
+
+def _seasonal_factors(seasonality: List[float], months: int) -> np.ndarray:
+    if not seasonality:
+        return np.ones(months, dtype=np.float32)
+    s = np.asarray(seasonality, dtype=np.float32)
+    s = s / s.mean()
+    return np.resize(s, months)
+
+
+def simulate(start_revenue: float, monthly_expenses: float, config: ScenarioConfig) -> SimulationResult:
+    """Simulate `config.n_paths` cash-flow paths over `config.months` months."""
+    rng = np.random.default_rng(config.seed)
+    months, paths = config.months, config.n_paths
+
+    # Geometric random walk; drift corrected so E[growth] == growth_mean.
+    # Antithetic pairs: half the normal draws (the expensive part), lower variance.
+    half = (paths + 1) // 2
+    draws = rng.standard_normal((months, half), dtype=np.float32)
+    shocks = np.empty((months, paths), dtype=np.float32)
+    shocks[:, :half] = draws
+    np.negative(draws[:, :paths - half], out=shocks[:, half:])
+    shocks *= np.float32(config.growth_volatility)
+    shocks += np.float32(np.log1p(config.growth_mean) - 0.5 * config.growth_volatility ** 2)
+    shocks[0] = 0.0  # month 1 starts at the current revenue
+    _accumulate_rows(shocks, np.add)
+    revenue = np.exp(shocks, out=shocks)
+    revenue *= np.float32(start_revenue) * _seasonal_factors(config.seasonality, months)[:, None]
+
+    # Expenses: linear efficiency ramp up to `expense_cut`, with symmetric multiplicative noise
+    # (uniform with the requested std-dev; far cheaper to draw than normals).
+    expenses = rng.random((months, paths), dtype=np.float32)
+    expenses -= np.float32(0.5)
+    expenses *= np.float32(2.0 * np.sqrt(3.0) * config.expense_volatility)
+    expenses += np.float32(1.0)
+    expenses *= (np.float32(monthly_expenses) * expense_ramp(config))[:, None]
+
+    return SimulationResult(revenue, expenses)
+
+
+def expense_ramp(config: ScenarioConfig) -> np.ndarray:
+    """Deterministic expense multiplier per month (also the median of the noisy expenses)."""
+    months = config.months
+    return 1.0 - config.expense_cut * np.arange(months, dtype=np.float32) / max(months - 1, 1)
+
+
+def bands(values: np.ndarray) -> np.ndarray:
+    """p10/p50/p90 per month -> array of shape (3, months)."""
+    # A full sort along the contiguous axis is SIMD-accelerated and beats multi-kth
+    # partition (what np.percentile does) by a wide margin at these sizes.
+    ordered = np.sort(values, axis=1)
+    last = values.shape[1] - 1
+    return ordered[:, [round(p / 100 * last) for p in PERCENTILES]].T
+
+
+def summarize(
+        result: SimulationResult,
+        config: ScenarioConfig,
+        current_revenue: float,
+        monthly_expenses: float,
+) -> Dict[str, Any]:
+    """
+    Chart-ready series in the dashboard's snake_case shape. The plain keys
+    (`projected`, `inflow`, `net`, `cumulative`, ...) carry the median so older
+    clients keep working; `*_p10` / `*_p90` add the uncertainty band.
+    """
+    months = config.months
+    rev = bands(result.revenue)
+    # Expense noise is symmetric around the ramp, so its median is known without sorting
+    outflow = np.float32(monthly_expenses) * expense_ramp(config)
+    net = bands(result.net)
+    cum = bands(result.cumulative)
+    prob = result.break_even_probability()
+
+    # One bulk conversion instead of per-element float() calls
+    rev, outflow, net, cum = (np.rint(a).astype(np.int64).tolist() for a in (rev, outflow, net, cum))
+    prob = np.round(prob, 4).tolist()
+    current = round(current_revenue)
+
+    revenue_projection = []
+    cashflow_data = []
+    break_even_timeline = []
+    for i in range(months):
+        label = f"M{i + 1}"
+        revenue_projection.append({
+            "month": label,
+            "projected": rev[1][i],
+            "projected_p10": rev[0][i],
+            "projected_p90": rev[2][i],
+            "current": current,
+        })
+        cashflow_data.append({
+            "month": label,
+            "inflow": rev[1][i],
+            "outflow": outflow[i],
+            "net": net[1][i],
+            "net_p10": net[0][i],
+            "net_p90": net[2][i],
+        })
+        break_even_timeline.append({
+            "month": label,
+            "cumulative": cum[1][i],
+            "cumulative_p10": cum[0][i],
+            "cumulative_p90": cum[2][i],
+            "break_even_point": 0,
+            "break_even_probability": prob[i],
+        })
+
+    horizon = min(config.break_even_month or months, months)
+    return {
+        "revenue_projection": revenue_projection,
+        "cashflow_data": cashflow_data,
+        "break_even_timeline": break_even_timeline,
+        "break_even_probability": {"month": horizon, "probability": prob[horizon - 1]},
+        "simulation": {
+            "paths": config.n_paths,
+            "growth_mean": round(config.growth_mean, 4),
+            "growth_volatility": config.growth_volatility,
+            "expense_cut": config.expense_cut,
+        },
+    }
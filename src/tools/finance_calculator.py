@@ -0,0 +1,240 @@
+"""
+Financial calculator toolkit.
+
+Plain NumPy functions that accept scalars or arrays (broadcasting), so the same
+code answers a single question or a whole grid of scenarios. The `*_tool`
+wrappers at the bottom expose them to the agents as LangChain tools that
+return compact markdown tables.
+"""
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.tools import tool
+
+from src.schemas.business import BusinessInfo
+from src.tools.goal_seek import goal_seek_tool
+from src.utils.markdown import key_value_lines, to_markdown_table
+
+
+# ---------- Core calculators (vectorized) ----------
+def break_even_month(revenue, expenses, revenue_growth=0.0, expense_growth=0.0):
+    """
+    First month (1-based) in which revenue >= expenses, with revenue and
+    expenses compounding monthly. `inf` where break-even is never reached.
+
+    Closed form: R*(1+g)^t >= E*(1+e)^t  <=>  t >= ln(E/R) / ln((1+g)/(1+e))
+    """
+    r = np.asarray(revenue, dtype=float)
+    e = np.asarray(expenses, dtype=float)
+    ratio = np.log1p(np.asarray(revenue_growth, dtype=float)) - np.log1p(np.asarray(expense_growth, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.ceil(np.log(e / r) / ratio - 1e-12)
+    already = r >= e
+    never = (r <= 0) | (~already & (ratio <= 0))
+    months = np.where(already, 1.0, np.where(never, np.inf, t + 1))
+    return months[()] if months.ndim == 0 else months
+
+
+def required_growth(revenue, expenses, months, expense_growth=0.0):
+    """Monthly revenue growth needed so that month `months` breaks even."""
+    r = np.asarray(revenue, dtype=float)
+    e = np.asarray(expenses, dtype=float)
+    n = np.maximum(np.asarray(months, dtype=float) - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g = (1 + np.asarray(expense_growth, dtype=float)) * (e / r) ** (1 / n) - 1
+    g = np.where(r >= e, 0.0, np.where(r > 0, g, np.inf))
+    return g[()] if g.ndim == 0 else g
+
+
+def runway_months(cash, revenue, expenses, revenue_growth=0.0, horizon: int = 120):
+    """
+    Whole months until cash runs out (`inf` if it lasts past `horizon`).
+    Broadcasts over all inputs; evaluated on a (batch, horizon) grid.
+    """
+    cash, revenue, expenses, revenue_growth = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (cash, revenue, expenses, revenue_growth))
+    )
+    shape = cash.shape
+    t = np.arange(horizon, dtype=float)
+    rev = revenue.reshape(-1, 1) * (1 + revenue_growth.reshape(-1, 1)) ** t
+    balance = cash.reshape(-1, 1) + np.cumsum(rev - expenses.reshape(-1, 1), axis=1)
+    out = balance < 0
+    months = np.where(out.any(axis=1), out.argmax(axis=1).astype(float), np.inf).reshape(shape)
+    return months[()] if months.ndim == 0 else months
+
+
+def npv(rate, cashflows):
+    """
+    Net present value; cashflows[..., 0] is undiscounted (t=0).
+    `rate` may be an array to evaluate several discount rates at once.
+    """
+    cf = np.asarray(cashflows, dtype=float)
+    rate = np.asarray(rate, dtype=float)[..., None]
+    discount = (1 + rate) ** -np.arange(cf.shape[-1], dtype=float)
+    value = (cf * discount).sum(axis=-1)
+    return value[()] if value.ndim == 0 else value
+
+
+def _npv_rows(rates: np.ndarray, cf: np.ndarray) -> np.ndarray:
+    """NPV of each row of `cf` at its own rate."""
+    return (cf * (1 + rates[:, None]) ** -np.arange(cf.shape[1], dtype=float)).sum(axis=1)
+
+
+def irr(cashflows, lo: float = -0.99, hi: float = 10.0, iterations: int = 80):
+    """
+    Internal rate of return per row of `cashflows` via batched bisection.
+    NaN where NPV does not change sign on [lo, hi].
+    """
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    a = np.full(cf.shape[0], lo)
+    b = np.full(cf.shape[0], hi)
+    fa = _npv_rows(a, cf)
+    valid = np.sign(fa) != np.sign(_npv_rows(b, cf))
+    for _ in range(iterations):
+        mid = (a + b) / 2
+        fm = _npv_rows(mid, cf)
+        left = np.sign(fm) == np.sign(fa)
+        a = np.where(left, mid, a)
+        fa = np.where(left, fm, fa)
+        b = np.where(left, b, mid)
+    result = np.where(valid, (a + b) / 2, np.nan)
+    return result[0] if np.ndim(cashflows) == 1 else result
+
+
+def unit_economics(price, unit_cost, fixed_costs=0.0) -> Dict[str, np.ndarray]:
+    """Contribution margin per unit, margin %, and units/month needed to cover fixed costs."""
+    price = np.asarray(price, dtype=float)
+    margin = price - np.asarray(unit_cost, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_pct = np.where(price > 0, margin / price, np.nan)
+        units = np.where(margin > 0, np.ceil(np.asarray(fixed_costs, dtype=float) / margin), np.inf)
+    return {"contribution_margin": margin, "margin_pct": margin_pct, "break_even_units": units}
+
+
+def cac_ltv(arpu, gross_margin, monthly_churn, cac) -> Dict[str, np.ndarray]:
+    """Customer lifetime value, LTV:CAC ratio and CAC payback (months)."""
+    monthly_profit = np.asarray(arpu, dtype=float) * np.asarray(gross_margin, dtype=float)
+    churn = np.asarray(monthly_churn, dtype=float)
+    cac = np.asarray(cac, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ltv = np.where(churn > 0, monthly_profit / churn, np.inf)
+        ratio = np.where(cac > 0, ltv / cac, np.inf)
+        payback = np.where(monthly_profit > 0, cac / monthly_profit, np.inf)
+    return {"ltv": ltv, "ltv_cac": ratio, "payback_months": payback}
+
+
+def loan_amortization(principal, annual_rate, months: int) -> Dict[str, np.ndarray]:
+    """Fixed monthly payment, total interest and the remaining balance after each month."""
+    p = np.asarray(principal, dtype=float)
+    r = np.asarray(annual_rate, dtype=float) / 12
+    n = int(months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(r > 0, p * r / (1 - (1 + r) ** -n), p / n)
+    t = np.arange(1, n + 1, dtype=float)
+    growth = (1 + r[..., None]) ** t
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = np.where(
+            r[..., None] > 0,
+            p[..., None] * growth - payment[..., None] * (growth - 1) / r[..., None],
+            p[..., None] - payment[..., None] * t,
+        )
+    return {
+        "payment": payment,
+        "total_interest": payment * n - p,
+        "balance": np.maximum(balance, 0.0),
+    }
+
+
+# ---------- Prompt helpers ----------
+def financial_snapshot(business: BusinessInfo) -> str:
+    """
+    Pre-computed numbers for the business, as compact lines the agents can
+    quote instead of doing arithmetic in prose. Empty when financials are unknown.
+    """
+    revenue = business.monthly_revenue or 0.0
+    expenses = business.monthly_expenses or 0.0
+    if revenue <= 0 and expenses <= 0:
+        return ""
+
+    rows = [("Monthly revenue (USD)", revenue), ("Monthly expenses (USD)", expenses),
+            ("Monthly net (USD)", revenue - expenses)]
+    if revenue > 0:
+        rows.append(("Net margin %", round((revenue - expenses) / revenue * 100, 1)))
+    if revenue > 0 and expenses > revenue:
+        growth_rates = np.array([0.03, 0.05, 0.10])
+        months = break_even_month(revenue, expenses, growth_rates)
+        for g, m in zip(growth_rates, months):
+            rows.append((f"Break-even month at +{g:.0%}/mo revenue", float(m)))
+        horizons = np.array([6, 12])
+        for n, g in zip(horizons, required_growth(revenue, expenses, horizons)):
+            rows.append((f"Growth needed to break even by month {n}", f"{g:.1%}/mo"))
+        rows.append(("Expense cut needed to break even now", f"{(expenses - revenue) / expenses:.1%}"))
+    return key_value_lines(rows)
+
+
+# ---------- LangChain tools ----------
+@tool
+def break_even_tool(
+        monthly_revenue: float,
+        monthly_expenses: float,
+        revenue_growth_rates: List[float],
+        expense_growth: float = 0.0,
+) -> str:
+    """Month (1-based) when revenue first covers expenses for each monthly revenue growth rate (0.05 = 5%)."""
+    months = np.atleast_1d(break_even_month(monthly_revenue, monthly_expenses, revenue_growth_rates, expense_growth))
+    return to_markdown_table(("Revenue growth/mo", "Break-even month"),
+                             [(f"{g:.1%}", float(m)) for g, m in zip(revenue_growth_rates, months)])
+
+
+@tool
+def runway_tool(cash: float, monthly_revenue: float, monthly_expenses: float, revenue_growth: float = 0.0) -> str:
+    """Months of runway until cash runs out, given current revenue, expenses and monthly revenue growth."""
+    months = runway_months(cash, monthly_revenue, monthly_expenses, revenue_growth)
+    return key_value_lines([("Runway (months)", float(months))])
+
+
+@tool
+def npv_irr_tool(cashflows: List[float], discount_rate: float) -> str:
+    """NPV at a per-period discount rate and IRR for a cash-flow series (first value is the upfront amount, usually negative)."""
+    rate = float(irr(cashflows))
+    return key_value_lines([
+        ("NPV", float(npv(discount_rate, cashflows))),
+        ("IRR per period", "n/a" if np.isnan(rate) else f"{rate:.2%}"),
+    ])
+
+
+@tool
+def unit_economics_tool(price: float, unit_cost: float, monthly_fixed_costs: float = 0.0) -> str:
+    """Contribution margin per unit, margin % and units per month needed to cover fixed costs."""
+    u = unit_economics(price, unit_cost, monthly_fixed_costs)
+    return key_value_lines([
+        ("Contribution margin/unit", float(u["contribution_margin"])),
+        ("Margin %", f"{float(u['margin_pct']):.1%}"),
+        ("Break-even units/month", float(u["break_even_units"])),
+    ])
+
+
+@tool
+def cac_ltv_tool(monthly_revenue_per_customer: float, gross_margin: float, monthly_churn: float, cac: float) -> str:
+    """Customer lifetime value, LTV:CAC ratio and CAC payback months (gross_margin and churn as fractions)."""
+    c = cac_ltv(monthly_revenue_per_customer, gross_margin, monthly_churn, cac)
+    return key_value_lines([
+        ("LTV", float(c["ltv"])),
+        ("LTV:CAC", float(c["ltv_cac"])),
+        ("CAC payback (months)", float(c["payback_months"])),
+    ])
+
+
+@tool
+def loan_tool(principal: float, annual_interest_rate: float, months: int) -> str:
+    """Fixed monthly payment and total interest for an amortizing loan (rate as a fraction, e.g. 0.14)."""
+    loan = loan_amortization(principal, annual_interest_rate, months)
+    return key_value_lines([
+        ("Monthly payment", float(loan["payment"])),
+        ("Total interest", float(loan["total_interest"])),
+    ])
+
+
+FINANCE_TOOLS = [
+    break_even_tool, runway_tool, npv_irr_tool, unit_economics_tool, cac_ltv_tool, loan_tool, goal_seek_tool,
+]
@@ -0,0 +1,198 @@
+"""
+Goal-seek solver for break-even and target-revenue planning.
+
+Answers "what monthly growth / expense cut / starting revenue do I need to
+reach the goal by month N" for a whole grid of horizons x one other lever at
+once. The model is the deterministic core of the cash-flow simulator (the
+median path of src/tools/cashflow_simulator.py): month m = 1..N has
+
+    revenue  = R0 * (1 + g)^(m - 1)
+    expenses = E * (1 - c * (m - 1) / max(N - 1, 1))     (cut reached by month N)
+
+Goals:
+- "break_even":            month N's revenue covers month N's expenses;
+- "cumulative_break_even": total net over months 1..N is >= 0;
+- "target_revenue":        month N's revenue reaches a target.
+
+Every goal is monotonic in each lever, so the answer is closed form except
+growth for the cumulative goal (a geometric sum), which uses batched
+bisection inside a tight bracket. All inputs broadcast, so a 200 x 200 grid
+takes milliseconds (`python benchmarks/planning_grid.py`).
+Results are the minimum needed (0 when the goal is already met) and NaN
+where the goal is out of reach within the lever's bounds.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.tools import tool
+
+from src.utils.markdown import to_markdown_table
+
+GOALS = ("break_even", "cumulative_break_even", "target_revenue")
+LEVERS = ("growth", "expense_cut", "start_revenue")
+MAX_EXPENSE_CUT = 0.9  # as ScenarioConfig.expense_cut
+BISECTION_ITERATIONS = 30
+
+
+def _expense_factors(horizon: np.ndarray, cut: np.ndarray):
+    """(last-month, summed over months 1..N) expense multipliers of the linear cut ramp."""
+    n = horizon
+    ramp = np.maximum(n - 1, 1)
+    last = 1 - cut * (n - 1) / ramp
+    total = n - cut * n * (n - 1) / (2 * ramp)
+    return last, total
+
+
+def _growth_sum(growth: np.ndarray, horizon: np.ndarray) -> np.ndarray:
+    """sum_{m=1..N} (1 + g)^(m - 1), exact at g = 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.expm1(horizon * np.log1p(growth)) / growth
+    return np.where(np.abs(growth) > 1e-12, s, horizon)
+
+
+def _bisect_growth(needed: np.ndarray, horizon: np.ndarray, max_growth: float) -> np.ndarray:
+    """Smallest g in [0, max_growth] with _growth_sum(g, N) >= needed (NaN if none)."""
+    needed, horizon = np.broadcast_arrays(needed, horizon)
+    # Bracket from N (1+g)^((N-1)/2) <= S_N(g) <= N (1+g)^(N-1) (AM-GM), so few iterations are needed
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        per_month = np.maximum(needed / horizon, 1.0)
+        steps = np.maximum(horizon - 1, 1)
+        lo = np.clip(per_month ** (1 / steps) - 1, 0.0, max_growth)
+        hi = np.clip(per_month ** (2 / steps) - 1, 0.0, max_growth)
+    for _ in range(BISECTION_ITERATIONS):
+        mid = (lo + hi) / 2
+        short = _growth_sum(mid, horizon) < needed
+        lo = np.where(short, mid, lo)
+        hi = np.where(short, hi, mid)
+    reachable = _growth_sum(np.float64(max_growth), horizon) >= needed
+    return np.where(needed <= horizon, 0.0, np.where(reachable, hi, np.nan))
+
+
+def solve(
+        goal: str,
+        solve_for: str,
+        horizon,
+        start_revenue=0.0,
+        monthly_expenses=0.0,
+        growth=0.0,
+        expense_cut=0.0,
+        target_revenue=None,
+        max_growth: float = 0.5,
+):
+    """
+    Minimum `solve_for` ("growth", "expense_cut" or "start_revenue") that meets `goal`
+    by month `horizon`; the other levers are taken as given. Broadcasts over all inputs.
+    """
+    if goal not in GOALS:
+        raise ValueError(f"goal must be one of {', '.join(GOALS)}")
+    if solve_for not in LEVERS:
+        raise ValueError(f"solve_for must be one of {', '.join(LEVERS)}")
+    if goal == "target_revenue":
+        if solve_for == "expense_cut":
+            raise ValueError("expense cuts do not change revenue; solve the target for growth or start_revenue")
+        if not target_revenue or target_revenue <= 0:
+            raise ValueError("target_revenue is required for the target_revenue goal")
+
+    n = np.asarray(horizon, dtype=float)
+    r0 = np.asarray(start_revenue, dtype=float)
+    e = np.asarray(monthly_expenses, dtype=float)
+    g = np.asarray(growth, dtype=float)
+    c = np.asarray(expense_cut, dtype=float)
+    last, total = _expense_factors(n, c)
+    # Revenue the goal needs in month N (or in total over 1..N for the cumulative goal)
+    if goal == "target_revenue":
+        needed = np.asarray(float(target_revenue))
+    else:
+        needed = e * (total if goal == "cumulative_break_even" else last)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if solve_for == "start_revenue":
+            reach = _growth_sum(g, n) if goal == "cumulative_break_even" else (1 + g) ** (n - 1)
+            result = needed / reach
+        elif solve_for == "growth":
+            if goal == "cumulative_break_even":
+                result = _bisect_growth(np.where(r0 > 0, needed / r0, np.inf), n, max_growth)
+            else:
+                # (1 + g)^(N - 1) >= needed / R0; month 1 has no growth to work with
+                ratio = np.where(r0 > 0, needed / r0, np.inf)
+                g_needed = np.where(ratio <= 1, 0.0, ratio ** (1 / np.maximum(n - 1, 1)) - 1)
+                reachable = (ratio <= 1) | ((n > 1) & (g_needed <= max_growth))
+                result = np.where(reachable, g_needed, np.nan)
+        else:
+            # Revenue over the horizon at the given growth, against expenses with cut c:
+            # monthly:    R0 (1+g)^(N-1) >= E (1 - c (N-1)/ramp)
+            # cumulative: R0 S_N(g)      >= E (N - c N (N-1) / (2 ramp))
+            ramp = np.maximum(n - 1, 1)
+            if goal == "cumulative_break_even":
+                shortfall = n - r0 * _growth_sum(g, n) / e
+                per_cut = n * (n - 1) / (2 * ramp)
+            else:
+                shortfall = 1 - r0 * (1 + g) ** (n - 1) / e
+                per_cut = (n - 1) / ramp
+            c_needed = np.where(shortfall <= 0, 0.0, shortfall / per_cut)
+            result = np.where((shortfall <= 0) | (c_needed <= MAX_EXPENSE_CUT), c_needed, np.nan)
+    result = np.asarray(result, dtype=float)
+    return result[()] if result.ndim == 0 else result
+
+
+def solve_grid(
+        goal: str,
+        solve_for: str,
+        horizons: np.ndarray,
+        axis: str,
+        axis_values: np.ndarray,
+        levers: Dict[str, float],
+        monthly_expenses: float,
+        target_revenue: Optional[float] = None,
+        max_growth: float = 0.5,
+) -> np.ndarray:
+    """
+    Sensitivity grid of shape (len(axis_values), len(horizons)): `solve_for` needed for every
+    horizon (columns) and value of the `axis` lever (rows); `levers` fixes the remaining one.
+    """
+    if axis == solve_for or axis not in LEVERS:
+        raise ValueError("axis must be a lever other than solve_for")
+    inputs = {**levers, axis: np.asarray(axis_values, dtype=float)[:, None]}
+    grid = solve(
+        goal,
+        solve_for,
+        np.asarray(horizons, dtype=float)[None, :],
+        start_revenue=inputs.get("start_revenue", 0.0),
+        monthly_expenses=monthly_expenses,
+        growth=inputs.get("growth", 0.0),
+        expense_cut=inputs.get("expense_cut", 0.0),
+        target_revenue=target_revenue,
+        max_growth=max_growth,
+    )
+    # An axis lever the goal ignores (expense cut for a revenue target) leaves a single row
+    return np.broadcast_to(grid, (len(axis_values), len(horizons)))
+
+
+# ---------- LangChain tool ----------
+@tool
+def goal_seek_tool(
+        monthly_revenue: float,
+        monthly_expenses: float,
+        horizons: List[int],
+        solve_for: str = "growth",
+        goal: str = "break_even",
+        growth: float = 0.0,
+        expense_cut: float = 0.0,
+        target_revenue: Optional[float] = None,
+) -> str:
+    """
+    Minimum monthly revenue growth, expense cut (fraction reached by month N) or starting revenue
+    (solve_for) needed to reach the goal by each month N in horizons. goal: "break_even" (month N
+    revenue covers expenses), "cumulative_break_even" (total net by month N >= 0) or "target_revenue".
+    """
+    values = np.atleast_1d(solve(
+        goal, solve_for, np.asarray(horizons, dtype=float),
+        start_revenue=monthly_revenue, monthly_expenses=monthly_expenses,
+        growth=growth, expense_cut=expense_cut, target_revenue=target_revenue,
+    ))
+    label = {"growth": "Growth needed/mo", "expense_cut": "Expense cut needed", "start_revenue": "Revenue needed now"}
+    fmt = (lambda v: f"{v:,.0f}") if solve_for == "start_revenue" else (lambda v: f"{v:.1%}")
+    return to_markdown_table(
+        ("By month", label[solve_for]),
+        [(int(n), "out of reach" if np.isnan(v) else fmt(v)) for n, v in zip(horizons, values)],
+    )
@@ -0,0 +1,375 @@
+"""
+Local industry-knowledge retrieval (BM25) over documents in RESEARCH_CORPUS_DIR.
+
+Drop `.md` / `.txt` benchmark documents into the corpus directory and run
+
+    python -m src.tools.simple_research build          # incremental
+    python -m src.tools.simple_research build --full   # rebuild from scratch
+    python -m src.tools.simple_research search "cafe gross margin"
+
+Index layout (RESEARCH_INDEX_DIR):
+- `manifest.json`: indexed files (mtime/size -> segment) and the live segments.
+- One directory per segment, written once and never modified. Each holds the
+  sorted term dictionary, CSR postings (doc ids + term frequencies), passage
+  lengths and the passage text, all as flat `.npy` / `.bin` files that are
+  memory-mapped on load, so opening the index costs a few milliseconds and
+  only the postings a query touches are paged in.
+
+Incremental builds index new or changed files into a new segment and mark the
+old copies of changed/deleted files as dead in the manifest. When segments pile
+up the whole corpus is merged back into one.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from langchain_core.tools import tool
+
+from src.config.settings import settings
+from src.schemas.business import BusinessInfo
+from src.utils.terms import BM25_B, BM25_K1, MAX_TERM_BYTES, tokenize
+
+INDEX_VERSION = 1
+DOC_SUFFIXES = {".md", ".txt"}
+MAX_SEGMENTS = 8
+PASSAGE_WORDS = 160
+
+
+class Passage(NamedTuple):
+    source: str
+    title: str
+    text: str
+    score: float
+
+
+# ---------- Building ----------
+def _split_passages(text: str) -> List[str]:
+    """Paragraph-aligned chunks of roughly PASSAGE_WORDS words."""
+    passages, current, words = [], [], 0
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        n = len(para.split())
+        if current and words + n > PASSAGE_WORDS:
+            passages.append("\n\n".join(current))
+            current, words = [], 0
+        current.append(para)
+        words += n
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+def _title(path: Path, text: str) -> str:
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            return line.lstrip("#").strip()[:120] or path.stem
+    return path.stem
+
+
+def _write_segment(seg_dir: Path, corpus_dir: Path, files: List[str]) -> Dict[str, int]:
+    """Index `files` (paths relative to the corpus) into a fresh segment directory."""
+    vocab: Dict[bytes, int] = {}
+    term_ids: List[int] = []
+    tfs: List[int] = []
+    doc_ids: List[int] = []
+    doc_len: List[int] = []
+    passage_source: List[int] = []
+    texts: List[bytes] = []
+    sources = []
+
+    for source_idx, rel in enumerate(files):
+        text = (corpus_dir / rel).read_text(encoding="utf-8", errors="replace")
+        sources.append({"path": rel, "title": _title(Path(rel), text)})
+        for passage in _split_passages(text):
+            tokens = tokenize(passage)
+            if not tokens:
+                continue
+            doc = len(doc_len)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term.encode("utf-8"), len(vocab)))
+                tfs.append(tf)
+                doc_ids.append(doc)
+            doc_len.append(len(tokens))
+            passage_source.append(source_idx)
+            texts.append(passage.encode("utf-8"))
+
+    # Sorted term dictionary; postings grouped by term (CSR), doc ids ascending within a term
+    terms = sorted(vocab)
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[[vocab[t] for t in terms]] = np.arange(len(terms))
+    term_rank = rank[np.asarray(term_ids, dtype=np.int64)] if term_ids else np.zeros(0, dtype=np.int64)
+    order = np.argsort(term_rank, kind="stable")
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_rank, minlength=len(terms)), out=offsets[1:])
+    text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in texts], out=text_offsets[1:])
+
+    seg_dir.mkdir(parents=True)
+    np.save(seg_dir / "terms.npy", np.array(terms, dtype=f"S{MAX_TERM_BYTES}"))
+    np.save(seg_dir / "offsets.npy", offsets)
+    np.save(seg_dir / "docs.npy", np.asarray(doc_ids, dtype=np.int32)[order])
+    np.save(seg_dir / "tfs.npy", np.minimum(np.asarray(tfs, dtype=np.int64), 65535).astype(np.uint16)[order])
+    np.save(seg_dir / "doc_len.npy", np.asarray(doc_len, dtype=np.int32))
+    np.save(seg_dir / "passage_source.npy", np.asarray(passage_source, dtype=np.int32))
+    np.save(seg_dir / "text_offsets.npy", text_offsets)
+    (seg_dir / "text.bin").write_bytes(b"".join(texts))
+    (seg_dir / "sources.json").write_text(json.dumps(sources), encoding="utf-8")
+    return {"passages": len(doc_len), "tokens": int(sum(doc_len))}
+
+
+def _read_manifest(index_dir: Path) -> Optional[dict]:
+    try:
+        manifest = json.loads((index_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == INDEX_VERSION else None
+
+
+def _write_manifest(index_dir: Path, manifest: dict) -> None:
+    tmp = index_dir / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp, index_dir / "manifest.json")
+
+
+def _scan_corpus(corpus_dir: Path) -> Dict[str, List[int]]:
+    found = {}
+    for path in sorted(corpus_dir.rglob("*")):
+        if path.suffix.lower() in DOC_SUFFIXES and path.is_file():
+            st = path.stat()
+            found[path.relative_to(corpus_dir).as_posix()] = [st.st_mtime_ns, st.st_size]
+    return found
+
+
+def build_index(corpus_dir: Optional[str] = None, index_dir: Optional[str] = None, full: bool = False) -> Dict[str, int]:
+    """
+    (Re)build the index. Only new or modified files are read unless `full`
+    is set or the segment count exceeds MAX_SEGMENTS. Returns build stats.
+    """
+    corpus = Path(corpus_dir or settings.RESEARCH_CORPUS_DIR)
+    root = Path(index_dir or settings.RESEARCH_INDEX_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    found = _scan_corpus(corpus) if corpus.is_dir() else {}
+
+    previous = _read_manifest(root)
+    manifest = None if full else previous
+    if manifest is None:
+        # Segment names keep counting up so a rebuild never collides with a live directory
+        next_segment = previous["next_segment"] if previous else 0
+        manifest = {"version": INDEX_VERSION, "next_segment": next_segment, "segments": {}, "files": {}}
+
+    # Mark old copies of changed or removed files as dead
+    changed = [rel for rel, stamp in found.items() if manifest["files"].get(rel, {}).get("stamp") != stamp]
+    stale = set(changed)
+    for rel in [r for r in manifest["files"] if r not in found or r in stale]:
+        entry = manifest["files"].pop(rel)
+        manifest["segments"][entry["segment"]]["deleted"].append(entry["source"])
+
+    if len(manifest["segments"]) + bool(changed) > MAX_SEGMENTS:
+        return build_index(str(corpus), str(root), full=True)
+
+    if changed:
+        name = f"seg-{manifest['next_segment']:06d}"
+        manifest["next_segment"] += 1
+        stats = _write_segment(root / name, corpus, changed)
+        manifest["segments"][name] = {**stats, "sources": len(changed), "deleted": []}
+        for source_idx, rel in enumerate(changed):
+            manifest["files"][rel] = {"stamp": found[rel], "segment": name, "source": source_idx}
+
+    # Segments whose files are all gone are dropped. Readers of the previous manifest keep
+    # working: their files are memory-mapped and stay readable after unlink.
+    for name, seg in list(manifest["segments"].items()):
+        if len(seg["deleted"]) >= seg["sources"]:
+            del manifest["segments"][name]
+    _write_manifest(root, manifest)
+    for path in root.iterdir():
+        if path.is_dir() and path.name.startswith("seg-") and path.name not in manifest["segments"]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    return {
+        "files": len(manifest["files"]),
+        "indexed_files": len(changed),
+        "segments": len(manifest["segments"]),
+        "passages": sum(s["passages"] for s in manifest["segments"].values()),
+    }
+
+
+# ---------- Searching ----------
+class _Segment:
+    def __init__(self, path: Path, deleted: List[int]):
+        load = lambda name: np.load(path / name, mmap_mode="r")  # noqa: E731
+        self.terms = load("terms.npy")
+        self.offsets = load("offsets.npy")
+        self.docs = load("docs.npy")
+        self.tfs = load("tfs.npy")
+        self.doc_len = load("doc_len.npy")
+        self.text_offsets = load("text_offsets.npy")
+        self.text = np.memmap(path / "text.bin", dtype=np.uint8, mode="r") if os.path.getsize(path / "text.bin") else b""
+        self.sources = json.loads((path / "sources.json").read_text(encoding="utf-8"))
+        self.passage_source = load("passage_source.npy")
+        self.live = None
+        if deleted:
+            self.live = ~np.isin(self.passage_source, np.asarray(deleted, dtype=np.int32))
+        self.norm = None  # BM25 length normalization, set by ResearchIndex
+
+    def postings(self, term: bytes):
+        i = int(np.searchsorted(self.terms, term))
+        if i < len(self.terms) and self.terms[i] == term:
+            return int(self.offsets[i]), int(self.offsets[i + 1])
+        return None
+
+    def live_count(self, rng) -> int:
+        """Passages in a postings range that are not masked as deleted."""
+        if self.live is None:
+            return rng[1] - rng[0]
+        return int(self.live[self.docs[rng[0]:rng[1]]].sum())
+
+    def passage(self, doc: int, score: float) -> Passage:
+        source = self.sources[int(self.passage_source[doc])]
+        raw = bytes(self.text[int(self.text_offsets[doc]):int(self.text_offsets[doc + 1])])
+        return Passage(source["path"], source["title"], raw.decode("utf-8"), score)
+
+
+class ResearchIndex:
+    """Read-only view of one manifest generation; cheap to open, safe to share between threads."""
+
+    def __init__(self, index_dir: Path, manifest: dict):
+        self.segments = [
+            _Segment(index_dir / name, seg["deleted"]) for name, seg in sorted(manifest["segments"].items())
+        ]
+        # Corpus statistics over live passages only, so scores match a clean rebuild
+        # (passages of changed/deleted files stay in their segment until the next merge)
+        self.n_docs = sum(int(s.live.sum()) if s.live is not None else len(s.doc_len) for s in self.segments)
+        total_len = sum(
+            int(np.asarray(s.doc_len, dtype=np.int64)[s.live].sum()) if s.live is not None else seg["tokens"]
+            for s, seg in zip(self.segments, (m for _, m in sorted(manifest["segments"].items())))
+        )
+        avgdl = total_len / max(self.n_docs, 1)
+        for seg in self.segments:
+            # tf-independent part of the BM25 denominator, once per passage
+            seg.norm = (BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(seg.doc_len, dtype=np.float32) / avgdl)).astype(np.float32)
+
+    @classmethod
+    def open(cls, index_dir: Optional[str] = None) -> Optional["ResearchIndex"]:
+        root = Path(index_dir or settings.RESEARCH_INDEX_DIR)
+        manifest = _read_manifest(root)
+        return cls(root, manifest) if manifest and manifest["segments"] else None
+
+    def search(self, query: str, k: int = 3) -> List[Passage]:
+        terms = [t.encode("utf-8") for t in dict.fromkeys(tokenize(query))]
+        if not terms or not self.segments:
+            return []
+
+        # Locate postings once; document frequency is summed across segments, live passages only
+        ranges = [[seg.postings(t) for t in terms] for seg in self.segments]
+        df = [sum(seg.live_count(r[i]) for seg, r in zip(self.segments, ranges) if r[i]) for i in range(len(terms))]
+        idf = [math.log(1 + (self.n_docs - n + 0.5) / (n + 0.5)) if n else 0.0 for n in df]
+
+        hits = []
+        for seg, seg_ranges in zip(self.segments, ranges):
+            doc_parts, score_parts = [], []
+            for weight, rng in zip(idf, seg_ranges):
+                if not rng:
+                    continue
+                docs = seg.docs[rng[0]:rng[1]]
+                tf = seg.tfs[rng[0]:rng[1]].astype(np.float32)
+                doc_parts.append(docs)
+                score_parts.append(np.float32(weight * (BM25_K1 + 1)) * tf / (tf + seg.norm[docs]))
+            if not doc_parts:
+                continue
+            if len(doc_parts) > 1:
+                # Sum per passage over the query terms: one dense pass beats sorting the hits
+                dense = np.bincount(np.concatenate(doc_parts), weights=np.concatenate(score_parts),
+                                    minlength=len(seg.norm))
+                docs = np.flatnonzero(dense)
+                scores = dense[docs]
+            else:
+                docs, scores = np.asarray(doc_parts[0]), score_parts[0]
+            if seg.live is not None:
+                keep = seg.live[docs]
+                docs, scores = docs[keep], scores[keep]
+            if len(docs) > k:
+                top = np.argpartition(-scores, k)[:k]
+                docs, scores = docs[top], scores[top]
+            hits.extend((float(s), seg, int(d)) for s, d in zip(scores, docs))
+
+        hits.sort(key=lambda h: -h[0])
+        return [seg.passage(doc, round(score, 3)) for score, seg, doc in hits[:k]]
+
+
+_index_lock = threading.Lock()
+_index_state: Dict[str, object] = {"stamp": None, "index": None}
+
+
+def get_index() -> Optional[ResearchIndex]:
+    """Process-wide index, reopened when a build replaces the manifest."""
+    manifest_path = Path(settings.RESEARCH_INDEX_DIR) / "manifest.json"
+    try:
+        st = manifest_path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+    with _index_lock:
+        if _index_state["stamp"] != stamp:
+            _index_state["index"] = ResearchIndex.open()
+            _index_state["stamp"] = stamp
+        return _index_state["index"]
+
+
+def search(query: str, k: Optional[int] = None) -> List[Passage]:
+    index = get_index()
+    return index.search(query, k or settings.RESEARCH_TOP_K) if index else []
+
+
+def format_passages(passages: List[Passage], max_chars: int = 700) -> str:
+    lines = []
+    for p in passages:
+        text = p.text if len(p.text) <= max_chars else p.text[:max_chars].rsplit(" ", 1)[0] + " ..."
+        lines.append(f"[{p.title} — {p.source}]\n{text}")
+    return "\n\n".join(lines)
+
+
+def research_context(business: BusinessInfo, k: Optional[int] = None) -> str:
+    """Top industry passages for the business, formatted for a prompt. Empty when nothing is indexed."""
+    query = " ".join(filter(None, [business.business_type, business.business_stage, business.location, business.main_goal]))
+    return format_passages(search(query, k))
+
+
+@tool
+def industry_research(query: str, k: int = 3) -> str:
+    """Search the local industry benchmark library (margins, costs, pricing, seasonality) and return the top passages."""
+    passages = search(query, max(1, min(k, 8)))
+    return format_passages(passages) if passages else "No matching industry documents."
+
+
+RESEARCH_TOOLS = [industry_research]
+
+
+def main(argv: List[str]) -> int:
+    if not argv or argv[0] not in ("build", "search"):
+        print("usage: python -m src.tools.simple_research build [--full] | search <query>")
+        return 2
+    start = time.perf_counter()
+    if argv[0] == "build":
+        stats = build_index(full="--full" in argv[1:])
+        print(json.dumps(stats), f"({time.perf_counter() - start:.2f}s)")
+    else:
+        for p in search(" ".join(argv[1:])):
+            print(f"{p.score:8.3f}  {p.source}\n{p.text[:300]}\n")
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
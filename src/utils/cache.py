@@ -0,0 +1,80 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU cache.
+
+    Bounded by entry count and, optionally, by total weight (e.g. bytes) using
+    `weigher(value)`. Least recently used entries are evicted first.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 128,
+            max_weight: Optional[int] = None,
+            weigher: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weigher = weigher or (lambda _v: 1)
+        self.weight = 0
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        w = int(self.weigher(value))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.weight -= old[1]
+            if self.max_weight is not None and w > self.max_weight:
+                return  # never cache something bigger than the whole budget
+            self._data[key] = (value, w)
+            self.weight += w
+            while len(self._data) > self.maxsize or (
+                    self.max_weight is not None and self.weight > self.max_weight
+            ):
+                _, (_, ew) = self._data.popitem(last=False)
+                self.weight -= ew
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self.weight -= entry[1]
+            return entry[0]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`; returns how many were removed."""
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                self.weight -= self._data.pop(k)[1]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
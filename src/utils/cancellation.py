@@ -0,0 +1,76 @@
+"""
+Cooperative cancellation for graph runs.
+
+The API creates a `CancelToken` per consultation and runs the graph inside
+`cancel_scope(token)`. Code on the run's path checks `current_cancel_token()`:
+- the graph node wrapper, before every node (between LLM calls);
+- BaseAgent, between streamed response chunks and tool rounds, so a pending
+  LLM request is dropped mid-generation rather than awaited.
+
+Cancelling is just setting a flag; the run raises `OperationCancelled` at its
+next check. A token set outside a scope (e.g. from the event loop) is seen by
+the graph thread because the flag is a threading.Event.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class OperationCancelled(Exception):
+    """The run was cancelled (client disconnected, job deleted ...)."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    __slots__ = ("_event", "reason")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Request cancellation; returns False if it was already requested (first reason wins)."""
+        if self._event.is_set():
+            return False
+        self.reason = reason
+        self._event.set()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds, waking early on cancel; True if cancelled."""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise OperationCancelled(self.reason or "cancelled")
+
+
+_current: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_cancel_token() -> Optional[CancelToken]:
+    return _current.get()
+
+
+def check_cancelled() -> None:
+    """Raise OperationCancelled if the current run was cancelled; no-op outside a scope."""
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def cancel_scope(token: CancelToken) -> Iterator[CancelToken]:
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
@@ -0,0 +1,168 @@
+"""
+Record/replay of LLM calls ("cassettes") at the BaseAgent boundary.
+
+- record: every model call goes to the real LLM; the reply and its latency are
+  appended to a JSON cassette file.
+- replay: replies are served from the cassette without any network access,
+  after `latency_scale` x the recorded latency (0 = immediately), so timings
+  measure only our own code (state copying, serialization, storage).
+
+Each interaction is stored with the agent name and a digest of the request
+(messages + bound tools). Replay serves the next unused interaction with the
+same digest; when a prompt changed since recording it falls back to the next
+unused interaction of the same agent, or raises CassetteMiss with `strict`.
+
+Activate with `use_cassette(path, mode)` (process-wide, so the API's worker
+threads see it), or for a whole process with LLM_CASSETTE_MODE / LLM_CASSETTE_PATH.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+
+from src.config.settings import settings
+from src.utils.cancellation import current_cancel_token
+
+MODES = ("record", "replay")
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded interaction for a request."""
+
+
+def request_digest(agent: str, llm, conversation: List[BaseMessage]) -> str:
+    """Stable hash of what the model is asked: messages plus the tools bound to the runnable."""
+    bound = getattr(llm, "kwargs", None) or {}
+    tools = [t.get("function", {}).get("name", "") if isinstance(t, dict) else str(t) for t in bound.get("tools", [])]
+    payload = {
+        "agent": agent,
+        "tools": tools,
+        "tool_choice": bound.get("tool_choice"),
+        "messages": [
+            [m.type, m.content, getattr(m, "tool_calls", None) or None, getattr(m, "tool_call_id", None)]
+            for m in conversation
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:24]
+
+
+def _as_message(response: BaseMessage) -> AIMessage:
+    """Streamed replies are AIMessageChunk sums; store them as plain AIMessages."""
+    if type(response) is AIMessage:
+        return response
+    return AIMessage(
+        content=response.content,
+        additional_kwargs=response.additional_kwargs,
+        tool_calls=getattr(response, "tool_calls", []),
+        usage_metadata=getattr(response, "usage_metadata", None),
+        response_metadata=response.response_metadata,
+        id=response.id,
+    )
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str, latency_scale: float = 0.0, strict: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.interactions: List[dict] = []
+        self._used: set = set()
+        self._lock = threading.Lock()
+        if mode == "replay":
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"cassette {path} not found; record it first")
+            with open(path, encoding="utf-8") as f:
+                self.interactions = json.load(f)["interactions"]
+        # record mode always starts a fresh cassette
+
+    def call(self, agent: str, llm, conversation: List[BaseMessage], live: Callable[[], BaseMessage]) -> BaseMessage:
+        digest = request_digest(agent, llm, conversation)
+        if self.mode == "replay":
+            return self._play(agent, digest)
+
+        started = time.perf_counter()
+        response = live()
+        latency = time.perf_counter() - started
+        with self._lock:
+            self.interactions.append({
+                "agent": agent,
+                "digest": digest,
+                "latency_s": round(latency, 4),
+                "response": message_to_dict(_as_message(response)),
+            })
+            self._save()
+        return response
+
+    def _play(self, agent: str, digest: str) -> AIMessage:
+        with self._lock:
+            index = next((i for i, x in enumerate(self.interactions) if i not in self._used and x["digest"] == digest), None)
+            if index is None and not self.strict:
+                index = next((i for i, x in enumerate(self.interactions) if i not in self._used and x["agent"] == agent), None)
+            if index is None:
+                raise CassetteMiss(f"no recorded {agent} call for request {digest} in {self.path}")
+            self._used.add(index)
+            interaction = self.interactions[index]
+
+        delay = interaction["latency_s"] * self.latency_scale
+        token = current_cancel_token()
+        if token is not None:
+            token.raise_if_cancelled()
+            if delay:
+                token.wait(delay)
+            token.raise_if_cancelled()
+        elif delay:
+            time.sleep(delay)
+        return messages_from_dict([interaction["response"]])[0]
+
+    @property
+    def unused(self) -> int:
+        return len(self.interactions) - len(self._used)
+
+    def _save(self) -> None:
+        """Atomic rewrite, so an interrupted recording never leaves a truncated file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600; cassettes are checked in
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": CASSETTE_VERSION, "interactions": self.interactions}, f, indent=1)
+        os.replace(tmp, self.path)
+
+
+_active: Optional[Cassette] = None
+_from_settings = False
+
+
+def active_cassette() -> Optional[Cassette]:
+    global _active, _from_settings
+    if _active is None and not _from_settings:
+        _from_settings = True
+        if settings.LLM_CASSETTE_MODE in MODES:
+            _active = Cassette(settings.LLM_CASSETTE_PATH, settings.LLM_CASSETTE_MODE, settings.LLM_CASSETTE_LATENCY_SCALE)
+    return _active
+
+
+def replaying() -> bool:
+    cassette = active_cassette()
+    return cassette is not None and cassette.mode == "replay"
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", latency_scale: float = 0.0, strict: bool = False) -> Iterator[Cassette]:
+    global _active
+    previous = active_cassette()
+    cassette = _active = Cassette(path, mode, latency_scale=latency_scale, strict=strict)
+    try:
+        yield cassette
+    finally:
+        _active = previous
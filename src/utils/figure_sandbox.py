@@ -0,0 +1,285 @@
+"""
+Sandboxed rendering of LLM-generated Plotly code (`visualization_code`).
+
+Two layers:
+1. `validate_code` parses the code and checks every AST node, import and
+   attribute against allow-lists before anything runs; string subscripts are
+   only allowed on the code's own data.
+2. `FigureRenderer` runs the validated code in long-lived subprocess workers
+   (src/utils/figure_worker.py) with CPU, memory and wall-clock limits and
+   returns `fig.to_json()`. A worker that crashes or times out is replaced.
+   Workers run without network and with a read-only filesystem (Linux
+   namespaces where available), and an audit hook refuses sockets, process
+   creation, native-library loading and writes either way.
+
+The web / Streamlit process never executes the generated code itself.
+"""
+import ast
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from typing import Optional
+
+# Full module paths that may be imported; anything reachable from them still has to pass ALLOWED_ATTRIBUTES
+ALLOWED_MODULES = {
+    "plotly", "plotly.express", "plotly.graph_objects", "plotly.subplots",
+    "pandas", "numpy", "math", "datetime", "random", "statistics", "calendar",
+}
+
+FORBIDDEN_NAMES = {
+    "__import__", "eval", "exec", "compile", "open", "input", "breakpoint", "globals", "locals",
+    "vars", "getattr", "setattr", "delattr", "dir", "help", "exit", "quit", "memoryview",
+    "__builtins__", "__loader__", "__spec__", "object", "type", "super", "classmethod", "staticmethod",
+}
+
+# Every attribute (and from-import) the code may use, whatever object it is on. An allow-list:
+# no file/network readers or writers, no plotting backends, no `ctypes`/`ctypeslib`/`io`.
+ALLOWED_ATTRIBUTES = frozenset("""
+express graph_objects subplots make_subplots
+line bar scatter area pie histogram box violin funnel funnel_area timeline sunburst treemap icicle
+scatter_polar line_polar bar_polar density_heatmap density_contour imshow strip ecdf
+colors qualitative sequential diverging Plotly D3 G10 T10 Set1 Set2 Set3 Pastel Pastel1 Pastel2 Dark2
+Dark24 Light24 Safe Vivid Bold Prism Antique Blues Greens Reds Oranges Purples Viridis Plasma RdBu RdYlGn
+Figure Bar Scatter Pie Indicator Waterfall Funnel Heatmap Table Box Histogram Sunburst Treemap
+Candlestick Scatterpolar Barpolar Layout
+update_layout update_traces update_xaxes update_yaxes update_annotations update_shapes update
+add_trace add_traces add_annotation add_shape add_hline add_vline add_hrect add_vrect
+add_bar add_scatter add_pie add_indicator add_waterfall add_funnel for_each_trace
+layout data title text xaxis yaxis legend font showlegend template height width margin marker
+color name x y orientation
+DataFrame Series date_range to_datetime Timestamp DateOffset concat melt merge cut
+head tail copy assign groupby sum mean median min max count cumsum cumprod pct_change diff shift
+rolling sort_values sort_index reset_index set_index rename drop dropna fillna pivot pivot_table
+apply map astype tolist to_list to_dict iloc loc at iat columns index values dt year month day
+strftime str upper lower capitalize strip lstrip rstrip split join replace startswith endswith zfill
+clip abs agg nlargest nsmallest unique nunique value_counts T shape size empty
+append extend insert pop items keys get sort reverse
+array arange linspace zeros ones full zeros_like ones_like full_like std var minimum maximum round
+sqrt exp log log10 log1p expm1 power where percentile quantile sin cos pi e nan inf isnan interp
+ceil floor tile repeat concatenate reshape flatten argmax argmin polyfit polyval
+random default_rng normal uniform seed randint rand randn choice integers gauss shuffle sample
+isclose fabs fsum pow
+datetime date timedelta now today isoformat weekday
+month_name month_abbr day_name
+stdev pstdev
+""".split())
+
+# Calls whose result is data a string subscript may index ("revenue" column, dict key)
+DATA_CONSTRUCTORS = {"DataFrame", "Series", "dict"}
+
+ALLOWED_NODES = (
+    ast.Module, ast.Expr, ast.Assign, ast.AugAssign, ast.AnnAssign, ast.For, ast.While, ast.If,
+    ast.Break, ast.Continue, ast.Pass, ast.FunctionDef, ast.Return, ast.Lambda, ast.arguments, ast.arg,
+    ast.Import, ast.ImportFrom, ast.alias, ast.Call, ast.keyword, ast.Name, ast.Load, ast.Store, ast.Del,
+    ast.Attribute, ast.Subscript, ast.Slice, ast.Constant, ast.JoinedStr, ast.FormattedValue,
+    ast.List, ast.Tuple, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp, ast.GeneratorExp,
+    ast.comprehension, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp, ast.Starred,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop, ast.Delete,
+)
+
+
+class UnsafeCodeError(ValueError):
+    """Generated code uses something outside the allow-list."""
+
+
+def _strip_fences(code: str) -> str:
+    code = code.strip()
+    if code.startswith("```"):
+        code = code.split("\n", 1)[1] if "\n" in code else ""
+        code = code.rsplit("```", 1)[0]
+    return code
+
+
+def validate_code(code: str) -> ast.Module:
+    """
+    Parse and check `code`. Returns the (lightly rewritten) AST ready to compile:
+    a top-level `return <expr>` becomes `fig = <expr>`, and `fig.show()` statements are dropped.
+    """
+    try:
+        tree = ast.parse(_strip_fences(code))
+    except SyntaxError:
+        # The prompt allows ending with `return fig`, which is not valid at module level
+        tree = ast.parse(_strip_fences(code).replace("\nreturn ", "\nfig = "))
+
+    body = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Return) and stmt.value is not None:
+            stmt = ast.Assign(targets=[ast.Name(id="fig", ctx=ast.Store())], value=stmt.value)
+        if (
+                isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+                and isinstance(stmt.value.func, ast.Attribute) and stmt.value.func.attr == "show"
+        ):
+            continue
+        body.append(stmt)
+    tree.body = body
+    ast.fix_missing_locations(tree)
+
+    imported = _imported_names(tree)
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise UnsafeCodeError(f"{type(node).__name__} is not allowed")
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                _check_module(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                raise UnsafeCodeError("relative imports are not allowed")
+            _check_module(node.module or "")
+            for alias in node.names:
+                if alias.name not in ALLOWED_ATTRIBUTES:
+                    raise UnsafeCodeError(f"import of {alias.name!r} is not allowed")
+        elif isinstance(node, ast.Name):
+            if node.id in FORBIDDEN_NAMES or node.id.startswith("__"):
+                raise UnsafeCodeError(f"name {node.id!r} is not allowed")
+        elif isinstance(node, ast.Attribute):
+            if node.attr not in ALLOWED_ATTRIBUTES:
+                raise UnsafeCodeError(f"attribute {node.attr!r} is not allowed")
+        elif isinstance(node, ast.Subscript):
+            if _has_string_key(node.slice) and not _is_data(node.value, imported):
+                raise UnsafeCodeError("string subscripts are only allowed on data (DataFrames, dicts, lists)")
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and "__" in node.value:
+            # Also keeps format strings ("{0.__class__}") from walking attributes
+            raise UnsafeCodeError("dunder strings are not allowed")
+    return tree
+
+
+def _check_module(name: str) -> None:
+    if name not in ALLOWED_MODULES:
+        raise UnsafeCodeError(f"import of {name!r} is not allowed")
+
+
+def _imported_names(tree: ast.Module) -> set:
+    """Names bound to modules or library objects by the code's imports."""
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add(alias.asname or alias.name.split(".", 1)[0])
+    return names
+
+
+def _has_string_key(node: ast.AST) -> bool:
+    parts = node.elts if isinstance(node, ast.Tuple) else [node]
+    return any(isinstance(p, ast.Constant) and isinstance(p.value, str) for p in parts)
+
+
+def _is_data(node: ast.AST, imported: set) -> bool:
+    """
+    Whether an indexed expression is rooted in data: a variable of the code itself,
+    a literal, or a DataFrame/Series/dict constructor -- not a module or a library object.
+    """
+    while True:
+        if isinstance(node, (ast.Attribute, ast.Subscript)):
+            node = node.value
+        elif isinstance(node, ast.Call):
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in DATA_CONSTRUCTORS:
+                return True
+            node = func
+        elif isinstance(node, ast.Name):
+            return node.id not in imported
+        else:
+            return isinstance(node, (ast.Dict, ast.List, ast.Tuple, ast.Constant, ast.DictComp, ast.ListComp))
+
+
+class _Worker:
+    """One sandbox subprocess plus a reader thread (portable timeouts on pipes)."""
+
+    def __init__(self, cpu_seconds: int, memory_mb: int):
+        self.workdir = tempfile.mkdtemp(prefix="figure-worker-")
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        # Nothing from our environment (API keys etc.) leaks into the sandbox;
+        # -I also ignores PYTHON* variables and the user site-packages.
+        env = {"PATH": os.environ.get("PATH", ""), "HOME": self.workdir}
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", "-B", "-c", "import sys; sys.path.insert(0, sys.argv[1]); "
+             "from src.utils.figure_worker import main; main(int(sys.argv[2]), int(sys.argv[3]))",
+             project_root, str(cpu_seconds), str(memory_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.workdir,
+            env=env,
+            text=True,
+        )
+        self.replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self.replies.put(line)
+        self.replies.put(None)  # EOF: worker died
+
+    def request(self, code: str, timeout: float) -> dict:
+        self.proc.stdin.write(json.dumps({"code": code}) + "\n")
+        self.proc.stdin.flush()
+        line = self.replies.get(timeout=timeout)
+        if line is None:
+            raise RuntimeError("figure worker exited (resource limit exceeded?)")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class FigureRenderer:
+    """Bounded pool of sandbox workers; thread-safe, blocking API."""
+
+    def __init__(self, workers: int = 2, timeout_seconds: float = 10.0, cpu_seconds: int = 5, memory_mb: int = 1024):
+        self.size = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(None)  # slots; workers start on first use
+
+    def render(self, code: str) -> str:
+        """
+        Validate and run `code`, returning the figure as Plotly JSON.
+        Raises UnsafeCodeError for rejected code and RuntimeError for runtime failures.
+        """
+        validate_code(code)  # fail fast without occupying a worker
+
+        worker = self._idle.get()
+        try:
+            if worker is None or worker.proc.poll() is not None:
+                worker = _Worker(self.cpu_seconds, self.memory_mb)
+            try:
+                reply = worker.request(code, self.timeout_seconds)
+            except (queue.Empty, RuntimeError, OSError, ValueError) as e:
+                worker.kill()
+                worker = None
+                if isinstance(e, queue.Empty):
+                    raise RuntimeError(f"figure rendering timed out after {self.timeout_seconds}s")
+                raise RuntimeError(str(e))
+        finally:
+            self._idle.put(worker)
+
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "figure rendering failed"))
+        return reply["figure"]
+
+    def shutdown(self) -> None:
+        """Stop idle workers (busy ones are replaced by fresh slots when they return)."""
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in idle:
+            if worker is not None:
+                worker.kill()
+            self._idle.put(None)
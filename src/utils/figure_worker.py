@@ -0,0 +1,194 @@
+"""
+Sandbox worker process for FigureRenderer (see figure_sandbox.py).
+
+Protocol: one JSON request per stdin line ({"code": ...}), one JSON reply per
+stdout line ({"ok": true, "figure": "<plotly json>"} or {"ok": false, "error": ...}).
+Resource limits and isolation are applied here, inside the child, before any
+code runs:
+- Linux: new user/mount/network namespaces, so the worker has no network
+  interfaces and sees every filesystem read-only (skipped where unprivileged
+  namespaces are unavailable);
+- everywhere: an audit hook refusing sockets, process creation, native-library
+  loading (ctypes), file writes and reads outside the Python installation.
+"""
+import builtins
+import json
+import os
+import sys
+
+from src.utils.figure_sandbox import ALLOWED_MODULES, validate_code
+
+try:
+    import resource
+except ImportError:  # not available on Windows; wall-clock timeout still applies
+    resource = None
+
+SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in (
+        "abs", "all", "any", "bool", "dict", "enumerate", "filter", "float", "format", "int", "isinstance",
+        "len", "list", "map", "max", "min", "pow", "range", "reversed", "round", "set", "slice", "sorted",
+        "str", "sum", "tuple", "zip", "True", "False", "None", "Exception", "ValueError", "TypeError",
+        "KeyError", "IndexError", "ZeroDivisionError",
+    )
+}
+
+
+def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name not in ALLOWED_MODULES:
+        raise ImportError(f"import of {name!r} is not allowed")
+    return __import__(name, globals, locals, fromlist, level)
+
+
+# unshare(2) / mount(2) flags
+_CLONE_NEWNS, _CLONE_NEWUSER, _CLONE_NEWNET = 0x00020000, 0x10000000, 0x40000000
+_MS_RDONLY, _MS_REMOUNT, _MS_BIND, _MS_REC, _MS_PRIVATE = 1, 32, 4096, 16384, 1 << 18
+# statvfs flags that a remount inside a user namespace must keep (same bits as MS_NOSUID etc.)
+_LOCKED_MOUNT_FLAGS = 2 | 4 | 8 | 1024 | 2048  # nosuid, nodev, noexec, noatime, nodiratime
+_ST_RELATIME, _MS_RELATIME = 4096, 1 << 21
+
+
+def _isolate() -> bool:
+    """
+    Move into fresh user, mount and network namespaces and remount every filesystem read-only.
+    Must run before any thread starts (numpy's BLAS pool), as unshare(CLONE_NEWUSER) requires.
+    Returns False where namespaces are unavailable; the audit hook still applies.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return False
+    if libc.unshare(_CLONE_NEWUSER | _CLONE_NEWNS | _CLONE_NEWNET) != 0:
+        # Already privileged (e.g. root in a container) without user namespaces
+        if libc.unshare(_CLONE_NEWNS | _CLONE_NEWNET) != 0:
+            return False
+
+    def mount(target: str, flags: int) -> int:
+        return libc.mount(None, target.encode(), None, flags, None)
+
+    # Keep our remounts out of the parent's namespace, then make "/" and every mount below it read-only
+    if mount("/", _MS_REC | _MS_PRIVATE) != 0:
+        return False
+    libc.mount(b"/", b"/", None, _MS_BIND | _MS_REC, None)
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as f:
+            targets = [line.split()[4].encode().decode("unicode_escape") for line in f]
+    except OSError:
+        targets = ["/"]
+    for target in targets:
+        try:
+            current = os.statvfs(target).f_flag
+        except OSError:
+            continue
+        flags = current & _LOCKED_MOUNT_FLAGS | (_MS_RELATIME if current & _ST_RELATIME else 0)
+        mount(target, _MS_BIND | _MS_REMOUNT | _MS_RDONLY | flags)  # best effort per mount
+    return True
+
+
+_BLOCKED_EVENTS = (
+    "socket.", "subprocess.", "os.system", "os.exec", "os.posix_spawn", "os.spawn", "os.fork",
+    "os.kill", "os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.symlink", "os.link",
+    "os.truncate", "os.chmod", "os.chown", "ctypes.",
+)
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+
+def _install_audit_hook(readable_roots) -> None:
+    """Refuse dangerous operations from here on, whatever object the code reached them through."""
+    roots = tuple(os.path.join(os.path.realpath(r), "") for r in readable_roots if r)
+
+    def hook(event: str, args: tuple) -> None:
+        if event.startswith(_BLOCKED_EVENTS):
+            raise RuntimeError(f"{event} is not allowed in the figure sandbox")
+        if event == "open":
+            path, mode, flags = args
+            if isinstance(path, int):
+                return  # fdopen of an already open descriptor
+            writing = any(c in (mode or "") for c in "wax+") or (flags or 0) & _WRITE_FLAGS
+            if writing or not os.path.realpath(os.fsdecode(path)).startswith(roots):
+                raise RuntimeError(f"opening {os.fsdecode(path)!r} is not allowed in the figure sandbox")
+
+    sys.addaudithook(hook)
+
+
+def _apply_base_limits(memory_mb: int) -> None:
+    if resource is None:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    # No file may be written (stdout is a pipe, unaffected)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+
+
+def _arm_cpu_limit(cpu_seconds: int) -> None:
+    """RLIMIT_CPU counts the whole process lifetime, so re-arm it relative to usage before each job."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+
+
+def _run(code: str, cpu_seconds: int) -> dict:
+    from plotly.basedatatypes import BaseFigure
+
+    try:
+        tree = validate_code(code)
+        compiled = compile(tree, "<visualization_code>", "exec")
+    except Exception as e:
+        return {"ok": False, "error": f"rejected: {e}"}
+
+    namespace = {
+        "__builtins__": {**SAFE_BUILTINS, "__import__": _safe_import, "print": lambda *a, **k: None},
+        "__name__": "__visualization__",
+    }
+    _arm_cpu_limit(cpu_seconds)
+    try:
+        exec(compiled, namespace)
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    fig = namespace.get("fig")
+    if not isinstance(fig, BaseFigure):
+        # Fall back to the last figure object the code created
+        figures = [v for v in namespace.values() if isinstance(v, BaseFigure)]
+        fig = figures[-1] if figures else None
+    if fig is None:
+        return {"ok": False, "error": "code did not produce a plotly figure"}
+    return {"ok": True, "figure": fig.to_json()}
+
+
+def main(cpu_seconds: int, memory_mb: int) -> None:
+    _isolate()
+    _apply_base_limits(memory_mb)
+    # Import the usual libraries once so each job only pays for its own code
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import plotly.express  # noqa: F401
+    import plotly.graph_objects  # noqa: F401
+    import plotly.subplots  # noqa: F401
+    from plotly.basedatatypes import BaseFigure  # noqa: F401
+
+    # Replies go to a private copy of fd 1; fd 1 itself (and sys.stdout) now point at stderr,
+    # so nothing a library or native code prints can corrupt the protocol
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    # Library code stays readable (lazy imports, plotly templates); the project root (.env) does not
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    project_root = os.path.dirname(src_dir)
+    _install_audit_hook([sys.prefix, sys.base_prefix, sys.exec_prefix, src_dir, "/usr/share/zoneinfo",
+                         *(p for p in sys.path if p and os.path.realpath(p) != os.path.realpath(project_root))])
+    for line in sys.stdin:
+        try:
+            reply = _run(json.loads(line)["code"], cpu_seconds)
+        except MemoryError:
+            reply = {"ok": False, "error": "memory limit exceeded"}
+        protocol.write(json.dumps(reply) + "\n")
+        protocol.flush()
@@ -0,0 +1,43 @@
+"""
+Time-ordered, collision-free ids (ULID: 48-bit millisecond timestamp + 80 random bits,
+Crockford base32, 26 characters).
+
+Ids sort lexicographically in creation order, so "newest first" and resumable
+cursors (`after=<id>`) are plain string comparisons. Within one millisecond the
+random part is incremented, keeping ids from this process strictly increasing.
+"""
+import os
+import threading
+import time
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        chars.append(_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+def new_ulid() -> str:
+    global _last_ms, _last_random
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms <= _last_ms:
+            # Same millisecond (or the clock stepped back): stay monotonic
+            ms = _last_ms
+            rnd = _last_random + 1
+            if rnd >> _RANDOM_BITS:
+                ms, rnd = ms + 1, int.from_bytes(os.urandom(10), "big")
+        else:
+            rnd = int.from_bytes(os.urandom(10), "big")
+        _last_ms, _last_random = ms, rnd
+    return _encode((ms << _RANDOM_BITS) | rnd, 26)
+
@@ -1,10 +1,35 @@
+import os
+import threading
+from typing import Optional
+
+import httpx
 from langchain_groq import ChatGroq
 from src.config.settings import settings
+from src.utils.cassettes import replaying
+from src.utils.tracing import note_http_request
+
+GROQ_API_BASE = os.environ.get("GROQ_API_BASE", "https://api.groq.com")
+
+_http_client: Optional[httpx.Client] = None
+_http_lock = threading.Lock()
+
+
+def _shared_http_client() -> httpx.Client:
+    """One connection pool for every agent's LLM, so a warmed-up connection is reused by all of them."""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                # Counted per run trace: more than one request per LLM call means the SDK retried
+                event_hooks={"request": [lambda request: note_http_request()]},
+            )
+        return _http_client
 
 
 def get_llm(temperature: float | None = None, max_tokens: int | None = None):
     """Central place to create LLM instance"""
-    if not settings.GROQ_API_KEY:
+    if not settings.GROQ_API_KEY and not replaying():
         raise RuntimeError(
             "GROQ_API_KEY is not set. Configure it in your environment or .env before running consultations."
         )
@@ -12,11 +37,29 @@ def get_llm(temperature: float | None = None, max_tokens: int | None = None):
         model=settings.LLM_MODEL,
         temperature=temperature if temperature is not None else settings.TEMPERATURE,
         max_tokens=max_tokens if max_tokens is not None else settings.MAX_TOKENS,
-        api_key=settings.GROQ_API_KEY,
+        # Replaying cassettes never reaches the API, so no key is needed
+        api_key=settings.GROQ_API_KEY or "cassette-replay",
+        base_url=GROQ_API_BASE,
+        http_client=_shared_http_client(),
     )
 
 
+def warm_connection(timeout: float = 5.0) -> bool:
+    """Open (DNS + TLS) a pooled connection to the LLM API ahead of the first real call."""
+    if not settings.GROQ_API_KEY:
+        return False
+    try:
+        response = _shared_http_client().get(
+            f"{GROQ_API_BASE}/openai/v1/models",
+            headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+            timeout=timeout,
+        )
+        return response.status_code < 500
+    except httpx.HTTPError:
+        return False
+
+
 # Convenience exports
 fast_llm = lambda: get_llm(temperature=0.4, max_tokens=1200)
 thinking_llm = lambda: get_llm(temperature=0.7, max_tokens=4096)
-creative_llm = lambda: get_llm(temperature=0.9, max_tokens=3000)
\ No newline at end of file
+creative_llm = lambda: get_llm(temperature=0.9, max_tokens=3000)
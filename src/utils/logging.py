@@ -0,0 +1,134 @@
+"""
+Structured, non-blocking logging (structlog on top of the stdlib).
+
+- Every event is rendered as one JSON line (or a readable console line in
+  development) in the calling thread, then handed to a QueueHandler. A single
+  QueueListener thread does the actual I/O, so a slow stdout/pipe never blocks
+  the event loop or the graph threads.
+- Context is bound per request / consultation / graph node with contextvars
+  (`bind_context`, `bound_context`) and merged into every line automatically.
+- Debug events are sampled (`LOG_DEBUG_SAMPLE_RATE`); a call can override the
+  rate with `sample_rate=...`. Disabled levels cost a no-op method call.
+
+The stdlib root logger is routed through the same queue, so uvicorn and
+library logs share the writer thread.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Any, Optional
+
+import structlog
+import structlog.tracebacks
+from structlog.contextvars import bind_contextvars, bound_contextvars, clear_contextvars
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Re-exported so callers only import this module
+bind_context = bind_contextvars
+bound_context = bound_contextvars
+clear_context = clear_contextvars
+
+
+def _sampler(rate: float):
+    def sample(logger: Any, method_name: str, event_dict: dict) -> dict:
+        event_rate = event_dict.pop("sample_rate", rate if method_name == "debug" else 1.0)
+        if event_rate < 1.0:
+            if random.random() >= event_rate:
+                raise structlog.DropEvent
+            event_dict["sampled"] = event_rate
+        return event_dict
+    return sample
+
+
+def configure_logging(level: str = "INFO", json_output: bool = True, debug_sample_rate: float = 1.0) -> None:
+    """Idempotent; call once at process start."""
+    global _listener
+    if _listener is not None:
+        return
+
+    numeric_level = logging.getLevelName(level.upper())
+    if not isinstance(numeric_level, int):
+        numeric_level = logging.INFO
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(logging.Formatter("%(message)s"))
+    _listener = logging.handlers.QueueListener(records, writer, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    shared = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+    ]
+    renderer = (
+        # Tracebacks as structured frames, without local variables (cost, and secrets)
+        [structlog.processors.ExceptionRenderer(structlog.tracebacks.ExceptionDictTransformer(show_locals=False)),
+         structlog.processors.JSONRenderer()]
+        if json_output else [structlog.dev.ConsoleRenderer()]
+    )
+
+    # stdlib loggers (uvicorn, libraries): same format, same queue
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(records)]
+    root.handlers[0].setFormatter(structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=shared,
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, *renderer],
+    ))
+    root.setLevel(numeric_level)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers[:] = []
+        logging.getLogger(name).propagate = True
+
+    structlog.configure(
+        processors=[
+            *shared,
+            _sampler(debug_sample_rate),
+            structlog.processors.StackInfoRenderer(),
+            *renderer,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(numeric_level),
+        logger_factory=_QueueLoggerFactory(records),
+        cache_logger_on_first_use=True,
+    )
+
+
+class _QueueLogger:
+    """Final structlog sink: enqueue the rendered line; the listener thread writes it."""
+
+    __slots__ = ("_queue", "_name")
+
+    def __init__(self, records: "queue.SimpleQueue", name: str):
+        self._queue = records
+        self._name = name
+
+    def _emit(self, message: str) -> None:
+        record = logging.LogRecord(self._name, logging.INFO, "", 0, message, None, None)
+        self._queue.put_nowait(record)
+
+    debug = info = warning = warn = error = critical = exception = msg = _emit
+
+
+class _QueueLoggerFactory:
+    def __init__(self, records: "queue.SimpleQueue"):
+        self._records = records
+
+    def __call__(self, *args: Any) -> _QueueLogger:
+        return _QueueLogger(self._records, args[0] if args else "app")
+
+
+def get_logger(name: Optional[str] = None, **initial_values: Any):
+    return structlog.get_logger(name, **initial_values)
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the writer thread (registered with atexit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
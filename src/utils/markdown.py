@@ -0,0 +1,33 @@
+from typing import Any, Iterable, Sequence
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return "-"
+        if value in (float("inf"), float("-inf")):
+            return "never" if value > 0 else "-"
+        if value.is_integer():
+            return f"{int(value):,}"
+        return f"{value:,.2f}" if abs(value) < 1000 else f"{value:,.0f}"
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f"{value:,}"
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def to_markdown_table(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
+    """Render a compact GitHub-style markdown table (used to feed numbers to the LLM)."""
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "|".join("---" for _ in headers) + "|",
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(_cell(v) for v in row) + " |")
+    return "\n".join(lines)
+
+
+def key_value_lines(pairs: Iterable[tuple]) -> str:
+    """Metric/value pairs as "label: value" lines (about half the tokens of a two-column table)."""
+    return "\n".join(f"{label}: {_cell(value)}" for label, value in pairs)
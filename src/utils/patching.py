@@ -0,0 +1,73 @@
+"""
+Deterministic application of refiner patches (PlanPatch) to a structured plan.
+
+The applier never guesses: an edit that targets a missing item, carries the
+wrong payload for its section or would duplicate an id raises PatchError, and
+the caller falls back to a full rewrite.
+"""
+from typing import List, Optional
+
+from src.schemas.output import Change, PlanEdit, PlanPatch, RefinedPlan, StrategyOutput
+
+ITEM_SECTIONS = ("short_term_actions", "medium_term_strategies", "marketing_channels", "financial_levers")
+
+
+class PatchError(ValueError):
+    """A patch edit cannot be applied unambiguously."""
+
+
+def _key(section: str, entry) -> str:
+    return entry.name if section == "metrics" else entry.id
+
+
+def _payload(edit: PlanEdit):
+    if edit.section in ITEM_SECTIONS:
+        payload = edit.item
+    elif edit.section == "risks":
+        payload = edit.risk
+    else:
+        payload = edit.metric
+    if payload is None:
+        raise PatchError(f"{edit.op} in {edit.section} needs the new entry")
+    return payload
+
+
+def _index(entries: list, section: str, target_id: Optional[str]) -> int:
+    for i, entry in enumerate(entries):
+        if _key(section, entry) == target_id:
+            return i
+    raise PatchError(f"{section} has no item {target_id!r}")
+
+
+def apply_plan_patch(plan: StrategyOutput, patch: PlanPatch) -> RefinedPlan:
+    """Return a new RefinedPlan with every edit applied (in order) and logged in `changes`."""
+    data = plan.model_dump()
+    result = RefinedPlan.model_validate(data)
+    changes: List[Change] = list(result.changes)
+
+    for edit in patch.edits:
+        if edit.section == "summary":
+            if edit.op != "replace" or not (edit.text or "").strip():
+                raise PatchError("summary only supports replace with text")
+            result.summary = edit.text.strip()
+        else:
+            entries = getattr(result, edit.section)
+            if edit.op == "remove":
+                del entries[_index(entries, edit.section, edit.target_id)]
+            else:
+                new = _payload(edit)
+                existing = {_key(edit.section, e) for e in entries}
+                if edit.op == "replace":
+                    i = _index(entries, edit.section, edit.target_id)
+                    if _key(edit.section, new) != edit.target_id and _key(edit.section, new) in existing:
+                        raise PatchError(f"{edit.section} already has {_key(edit.section, new)!r}")
+                    entries[i] = new
+                else:
+                    if _key(edit.section, new) in existing:
+                        raise PatchError(f"{edit.section} already has {_key(edit.section, new)!r}")
+                    at = _index(entries, edit.section, edit.target_id) + 1 if edit.target_id else len(entries)
+                    entries.insert(at, new)
+        changes.append(Change(issue_id=edit.issue_id, change=edit.reason))
+
+    result.changes = changes
+    return result
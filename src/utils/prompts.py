@@ -0,0 +1,82 @@
+"""
+Prompt assembly shared by the agents.
+
+- `business_context(business)`: the business as a few labelled lines, with
+  unknown fields left out (a fraction of the tokens of its indented JSON).
+- `fit_sections(sections, budget)`: joins titled prompt sections, shrinking the
+  trimmable ones (lowest `priority` first, never below `min_tokens`) until the
+  estimate fits the budget. Required sections are never cut; if they alone
+  exceed the budget the prompt is sent anyway and the overrun is logged.
+
+The per-run pieces (business context, financial snapshot, research notes) are
+rendered once by the first agent and cached in the graph state; see
+`src.agents.base_agent.prompt_context`.
+"""
+from typing import List, NamedTuple, Optional, Sequence
+
+from src.schemas.business import BusinessInfo
+from src.utils.logging import get_logger
+from src.utils.tokens import estimate_tokens, truncate_to_tokens
+
+log = get_logger("src.agents")
+
+
+class Section(NamedTuple):
+    title: Optional[str]
+    body: str
+    # None: required, never shortened; otherwise the floor for trimming
+    min_tokens: Optional[int] = None
+    # Trimmable sections are shortened in ascending priority
+    priority: int = 0
+
+    def render(self, body: Optional[str] = None) -> str:
+        body = self.body if body is None else body
+        return f"{self.title}:\n{body}" if self.title else body
+
+
+def _amount(value: float) -> str:
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+
+def business_context(business: BusinessInfo) -> str:
+    head = f"Business: {business.business_type} ({business.business_stage})"
+    if business.location:
+        head += f", {business.location}"
+    lines = [head]
+    if business.team_size is not None:
+        lines.append(f"Team size: {business.team_size}")
+    money = [
+        f"{label} {_amount(value)} USD"
+        for label, value in (("revenue", business.monthly_revenue), ("expenses", business.monthly_expenses))
+        if value is not None
+    ]
+    if money:
+        lines.append("Monthly " + ", ".join(money))
+    lines.append(f"Main goal: {business.main_goal}")
+    if business.other_goals:
+        lines.append("Other goals: " + "; ".join(business.other_goals))
+    return "\n".join(lines)
+
+
+def fit_sections(sections: Sequence[Section], budget: Optional[int], agent: str = "") -> str:
+    """Join non-empty sections with blank lines, within `budget` estimated tokens (None = no limit)."""
+    sections = [s for s in sections if s.body]
+    bodies: List[str] = [s.body for s in sections]
+    # Two tokens per section for the title line break and the blank line between sections
+    total = sum(estimate_tokens(s.render()) + 2 for s in sections)
+    if budget is not None and total > budget:
+        over = total - budget
+        trimmable = sorted((i for i, s in enumerate(sections) if s.min_tokens is not None), key=lambda i: sections[i].priority)
+        for i in trimmable:
+            if over <= 0:
+                break
+            current = estimate_tokens(bodies[i])
+            target = max(sections[i].min_tokens, current - over)
+            if target < current:
+                bodies[i] = truncate_to_tokens(bodies[i], target)
+                over -= current - estimate_tokens(bodies[i])
+        if over > 0:
+            log.warning("prompt_over_budget", agent=agent, budget=budget, over_tokens=over)
+        else:
+            log.debug("prompt_trimmed", agent=agent, budget=budget, trimmed_tokens=total - budget - over)
+    return "\n\n".join(s.render(body) for s, body in zip(sections, bodies))
@@ -0,0 +1,27 @@
+"""
+Text tokenization and BM25 parameters shared by the search indexes
+(industry research in src/tools/simple_research.py, consultation search in
+app/api/search.py). Dependency-free, so the API can import it cheaply.
+"""
+import re
+from typing import List
+
+MAX_TERM_BYTES = 32
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do for from had has have how i if in into is it its
+of on or our so than that the their them then there these they this to was we were what
+when which who will with you your
+""".split())
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; very long tokens (hashes, URLs) are dropped."""
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if t not in STOPWORDS and len(t.encode("utf-8")) <= MAX_TERM_BYTES
+    ]
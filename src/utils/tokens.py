@@ -0,0 +1,31 @@
+"""Cheap token estimates for prompt budgeting (no tokenizer dependency)."""
+
+from typing import Iterable
+
+# Llama/GPT-style BPE averages about 4 characters per token on English prose
+CHARS_PER_TOKEN = 4
+# Role markers and separators the chat template adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_messages_tokens(messages: Iterable) -> int:
+    """Chat messages as sent: text content plus a few tokens of per-message framing and any tool calls."""
+    total = 0
+    for m in messages:
+        content = m.content if isinstance(m.content, str) else str(m.content)
+        total += estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        for call in getattr(m, "tool_calls", None) or ():
+            total += estimate_tokens(str(call.get("args", "")))
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to about `max_tokens`, on a word boundary, marking the cut with an ellipsis."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:max(limit - 4, 0)].rsplit(" ", 1)[0].rstrip() + " ..."
@@ -0,0 +1,232 @@
+"""
+Per-run execution trace: graph node spans and one record per LLM call.
+
+The API creates a `RunTrace` per consultation and runs the graph inside
+`trace_scope(trace)`; the graph node wrapper opens `node_span(...)` and
+BaseAgent wraps every model call in `llm_call(...)`. Outside a scope all of
+these are no-ops. Times are milliseconds since the trace started, so the
+first node's `start_ms` is the time the run spent queued before it began.
+
+HTTP requests to the LLM API are counted through an httpx event hook
+(src/utils/llm.py); requests beyond one per call are the SDK's retries.
+"""
+import bisect
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.cancellation import OperationCancelled
+
+
+class RunTrace:
+    __slots__ = ("started", "nodes", "llm_calls", "http_requests")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.nodes: List[dict] = []
+        self.llm_calls: List[dict] = []
+        self.http_requests = 0
+
+    def _ms(self, t: Optional[float] = None) -> float:
+        return round(((t if t is not None else time.perf_counter()) - self.started) * 1000, 1)
+
+    @contextmanager
+    def node(self, name: str, round_no: int) -> Iterator[None]:
+        span = {"node": name, "round": round_no, "start_ms": self._ms()}
+        reset = _node.set(name)
+        status = "ok"
+        try:
+            yield
+        except OperationCancelled:
+            status = "cancelled"
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            _node.reset(reset)
+            span["end_ms"] = self._ms()
+            span["status"] = status
+            self.nodes.append(span)
+
+    @contextmanager
+    def llm_call(self, agent: str, model: Optional[str], estimated_input_tokens: Optional[int] = None) -> Iterator[dict]:
+        """Yields the call record; pass the model's reply to `record_response`."""
+        call = {
+            "node": _node.get(), "agent": agent, "model": model, "start_ms": self._ms(),
+            "estimated_input_tokens": estimated_input_tokens,
+            "input_tokens": None, "output_tokens": None, "queue_ms": None,
+        }
+        requests_before = self.http_requests
+        status = "ok"
+        try:
+            yield call
+        except OperationCancelled:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            call["duration_ms"] = round(self._ms() - call["start_ms"], 1)
+            call["retries"] = max(0, self.http_requests - requests_before - 1)
+            call["status"] = status
+            self.llm_calls.append(call)
+
+    def to_dict(self) -> dict:
+        calls = self.llm_calls
+        return {
+            "total_ms": self._ms(),
+            "queued_ms": self.nodes[0]["start_ms"] if self.nodes else None,
+            "nodes": self.nodes,
+            "llm_calls": calls,
+            "totals": {
+                "llm_calls": len(calls),
+                "estimated_input_tokens": sum(c.get("estimated_input_tokens") or 0 for c in calls),
+                "input_tokens": sum(c["input_tokens"] or 0 for c in calls),
+                "output_tokens": sum(c["output_tokens"] or 0 for c in calls),
+                "retries": sum(c["retries"] for c in calls),
+                "models": sorted({c["model"] for c in calls if c["model"]}),
+            },
+        }
+
+
+def record_response(call: dict, message: Any) -> None:
+    """Fill model, token counts and provider queue time from an AIMessage."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    meta = getattr(message, "response_metadata", None) or {}
+    call["input_tokens"] = usage.get("input_tokens")
+    call["output_tokens"] = usage.get("output_tokens")
+    call["model"] = meta.get("model_name") or call["model"]
+    queue_time = (meta.get("token_usage") or {}).get("queue_time")
+    if queue_time is not None:
+        call["queue_ms"] = round(queue_time * 1000, 1)
+
+
+_current: ContextVar[Optional[RunTrace]] = ContextVar("run_trace", default=None)
+_node: ContextVar[Optional[str]] = ContextVar("trace_node", default=None)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current.get()
+
+
+@contextmanager
+def trace_scope(trace: RunTrace) -> Iterator[RunTrace]:
+    reset = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(reset)
+
+
+def node_span(name: str, round_no: int):
+    trace = _current.get()
+    return trace.node(name, round_no) if trace is not None else nullcontext()
+
+
+def note_http_request() -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.http_requests += 1
+
+
+def _percentile(ordered: List[float], q: int) -> Optional[float]:
+    """statistics.quantiles(..., n=100, method="inclusive")[q - 1] on an already sorted list."""
+    if not ordered:
+        return None
+    if len(ordered) == 1:
+        return ordered[0]
+    j, delta = divmod(q * (len(ordered) - 1), 100)
+    return round((ordered[j] * (100 - delta) + ordered[j + 1] * delta) / 100, 1)
+
+
+class _GroupTotals:
+    __slots__ = ("durations", "calls", "inputs", "outputs", "retries", "node_ms")
+
+    def __init__(self):
+        self.durations: List[float] = []  # sorted, for percentiles
+        self.calls = self.inputs = self.outputs = self.retries = 0
+        self.node_ms: Dict[str, List[float]] = {}  # node -> [ms summed over runs, runs with the node]
+
+    def apply(self, run: tuple, sign: int) -> None:
+        duration, calls, inputs, outputs, retries, node_ms = run
+        if sign > 0:
+            bisect.insort(self.durations, duration)
+        else:
+            del self.durations[bisect.bisect_left(self.durations, duration)]
+        self.calls += sign * calls
+        self.inputs += sign * inputs
+        self.outputs += sign * outputs
+        self.retries += sign * retries
+        for node, ms in node_ms.items():
+            entry = self.node_ms.setdefault(node, [0.0, 0])
+            entry[0] += sign * ms
+            entry[1] += sign
+            if not entry[1]:
+                del self.node_ms[node]
+
+
+class TraceAggregates:
+    """
+    Running per-group (plan) totals of run traces. `add()` as runs complete and
+    `remove()` when they are deleted; `summary()` then costs O(1) in the number of
+    runs, so nothing rereads (or decompresses) stored traces per request.
+    """
+
+    def __init__(self):
+        self._runs: Dict[Any, Tuple[str, tuple]] = {}
+        self._groups: Dict[str, _GroupTotals] = {}
+
+    def add(self, run_id: Any, group: str, trace: dict) -> None:
+        self.remove(run_id)
+        node_ms: Dict[str, float] = {}
+        for span in trace["nodes"]:
+            node_ms[span["node"]] = node_ms.get(span["node"], 0.0) + span["end_ms"] - span["start_ms"]
+        totals = trace["totals"]
+        run = (trace["total_ms"], totals["llm_calls"], totals["input_tokens"], totals["output_tokens"],
+               totals["retries"], node_ms)
+        self._runs[run_id] = (group, run)
+        self._groups.setdefault(group, _GroupTotals()).apply(run, 1)
+
+    def remove(self, run_id: Any) -> None:
+        entry = self._runs.pop(run_id, None)
+        if entry is None:
+            return
+        group, run = entry
+        totals = self._groups[group]
+        totals.apply(run, -1)
+        if not totals.durations:
+            del self._groups[group]
+
+    def summary(self, group: str, input_price_per_mtok: float = 0.0, output_price_per_mtok: float = 0.0) -> Dict[str, Any]:
+        """Run count, latency percentiles, mean tokens/cost per run and mean time per node reached."""
+        totals = self._groups.get(group)
+        if totals is None:
+            return {"runs": 0}
+        runs = len(totals.durations)
+        mean_in, mean_out = totals.inputs / runs, totals.outputs / runs
+        return {
+            "runs": runs,
+            "duration_ms": {
+                "p50": _percentile(totals.durations, 50),
+                "p95": _percentile(totals.durations, 95),
+                "max": totals.durations[-1],
+            },
+            "llm_calls_per_run": round(totals.calls / runs, 2),
+            "input_tokens_per_run": round(mean_in),
+            "output_tokens_per_run": round(mean_out),
+            "retries_per_run": round(totals.retries / runs, 2),
+            "cost_usd_per_run": round((mean_in * input_price_per_mtok + mean_out * output_price_per_mtok) / 1e6, 5),
+            # Per node: the runs that reached it and their mean total time in it (a node runs once per
+            # refinement round; runs that pass critique early never reach "refine")
+            "nodes": {
+                name: {"runs": reached, "ms_per_run": round(ms / reached, 1)}
+                for name, (ms, reached) in totals.node_ms.items()
+            },
+        }
+
+    def summaries(self, input_price_per_mtok: float = 0.0, output_price_per_mtok: float = 0.0) -> Dict[str, Any]:
+        return {group: self.summary(group, input_price_per_mtok, output_price_per_mtok) for group in sorted(self._groups)}
+
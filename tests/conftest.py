@@ -0,0 +1,50 @@
+"""
+Offline test suite: every LLM call is served from a cassette (tests/cassettes),
+so the full graph and the API run without network access or GROQ_API_KEY.
+Re-record the cassettes with `python -m tests.record_cassettes`.
+"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config.settings import settings
+from src.utils.cassettes import use_cassette
+from tests.scenarios import cassette_path
+
+
+@pytest.fixture(autouse=True, scope="session")
+def offline_settings(tmp_path_factory):
+    # No industry index, so prompts match the recorded ones whatever is on this machine
+    settings.RESEARCH_INDEX_DIR = str(tmp_path_factory.mktemp("research_index"))
+    settings.WARMUP_ON_STARTUP = False
+    settings.PDF_PRERENDER_ON_COMPLETE = False
+    settings.RECORD_SPILL_DIR = str(tmp_path_factory.mktemp("records"))
+
+
+@pytest.fixture
+def replay(request):
+    """Replay a cassette (default "basic"; parametrize indirectly with another name)."""
+    name = getattr(request, "param", "basic")
+    with use_cassette(cassette_path(name), "replay") as cassette:
+        yield cassette
+
+
+@pytest.fixture(scope="session")
+def api():
+    from app.api.main import app, rate_limiter
+    # Every test signs up and logs in from the same address; test_rate_limit turns it back on
+    rate_limiter.enabled = False
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(api):
+    """The API client, signed in as a fresh free-plan user."""
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    api.post("/api/auth/signup", json={"email": email, "password": "correct-horse", "name": "Test"})
+    response = api.post("/api/auth/login", json={"email": email, "password": "correct-horse"})
+    assert response.status_code == 200
+    yield api
+    api.cookies.clear()
@@ -0,0 +1,25 @@
+"""
+Re-record the cassettes in tests/cassettes against the live LLM (needs GROQ_API_KEY).
+
+    python -m tests.record_cassettes            # all scenarios
+    python -m tests.record_cassettes premium    # just one
+
+Re-record after changing prompts, schemas or the graph's flow; replay falls
+back to call order when a prompt no longer matches, which keeps old cassettes
+usable but no longer exact.
+"""
+import sys
+
+from src.utils.cassettes import use_cassette
+from tests.scenarios import SCENARIOS, cassette_path, run_pipeline
+
+
+def main(names) -> None:
+    for name in names or SCENARIOS:
+        with use_cassette(cassette_path(name), "record") as cassette:
+            run_pipeline(SCENARIOS[name])
+        print(f"{name}: {len(cassette.interactions)} calls -> {cassette.path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+"""Shared inputs for the offline suite and for re-recording its cassettes."""
+import os
+import uuid
+
+from src.schemas.business import BusinessInfo
+
+CASSETTE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes")
+
+# Consultation request body (POST /api/consultations); the pipeline tests use the same business
+CONSULTATION_REQUEST = {
+    "business_type": "specialty coffee shop",
+    "business_stage": "startup",
+    "location": "Anuradhapura, Sri Lanka",
+    "team_size": 4,
+    "monthly_revenue_usd": 2500,
+    "monthly_expenses_usd": 3200,
+    "main_goal": "Reach break-even point within next 6 months",
+    "other_goals": ["Build loyal customer base", "Start online sales"],
+}
+
+# Cassette name -> max refinement rounds (basic plan: 1, premium/ultra: 3)
+SCENARIOS = {"basic": 1, "premium": 3}
+
+
+def cassette_path(name: str) -> str:
+    return os.path.join(CASSETTE_DIR, f"{name}.json")
+
+
+def business_info() -> BusinessInfo:
+    data = CONSULTATION_REQUEST
+    return BusinessInfo(
+        business_type=data["business_type"],
+        business_stage=data["business_stage"],
+        location=data["location"],
+        team_size=data["team_size"],
+        monthly_revenue=data["monthly_revenue_usd"],
+        monthly_expenses=data["monthly_expenses_usd"],
+        main_goal=data["main_goal"],
+        other_goals=data["other_goals"],
+    )
+
+
+def run_pipeline(rounds: int) -> dict:
+    """One full get_graph() run, as the API drives it."""
+    from langchain_core.messages import HumanMessage
+    from src.graphs.main_consultant_graph import get_graph
+    from src.graphs.state import AgentState
+
+    state = AgentState(
+        business=business_info(),
+        user_context=None,
+        messages=[HumanMessage(content=f"Help me with: {CONSULTATION_REQUEST['main_goal']}")],
+        needs_refinement=True,
+        max_refinement_rounds=rounds,
+        current_refinement_round=0,
+    )
+    config = {"configurable": {"thread_id": f"test_{uuid.uuid4().hex}"}}
+    final_state = None
+    for final_state in get_graph().stream(state, config, stream_mode="values"):
+        pass
+    return final_state
@@ -0,0 +1,110 @@
+"""The consultation API end to end, with LLM calls replayed from cassettes."""
+import threading
+import time
+
+import pytest
+
+from src.config.settings import settings
+from src.utils.cassettes import use_cassette
+from tests.scenarios import CONSULTATION_REQUEST, cassette_path
+
+
+def test_create_consultation(client, replay):
+    response = client.post("/api/consultations", json=CONSULTATION_REQUEST)
+    assert response.status_code == 200
+    consultation = response.json()
+    assert consultation["status"] == "completed"
+    assert consultation["id"].startswith("c-")
+    assert consultation["model_used"] == settings.LLM_MODEL
+    assert consultation["strategy_sections"]["short_term_actions"]
+    assert consultation["visualization_data"]["revenue_projection"]
+    assert replay.unused == 0
+
+    fetched = client.get(f"/api/consultations/{consultation['id']}")
+    assert fetched.status_code == 200
+    assert fetched.json()["refined_strategy"] == consultation["refined_strategy"]
+
+
+def test_trace_endpoints(client, replay, monkeypatch):
+    consultation = client.post("/api/consultations", json=CONSULTATION_REQUEST).json()
+
+    trace = client.get(f"/api/consultations/{consultation['id']}/trace").json()
+    assert trace["totals"]["llm_calls"] == 4
+    assert trace["totals"]["input_tokens"] > 0
+    assert [call["agent"] for call in trace["llm_calls"]] == ["StrategyGenerator", "Critic", "Refiner", "Visualizer"]
+
+    # Cross-user metrics are for operators only
+    assert client.get("/api/traces/aggregates").status_code == 403
+    monkeypatch.setattr(settings, "OPERATOR_API_KEY", "ops-key")
+    assert client.get("/api/traces/aggregates", headers={"X-Operator-Key": "wrong"}).status_code == 403
+    operator = {"X-Operator-Key": "ops-key"}
+    aggregates = client.get("/api/traces/aggregates", headers=operator).json()
+    assert aggregates["basic"]["runs"] >= 1
+    assert aggregates["basic"]["llm_calls_per_run"] == 4
+
+    # Kept incrementally: a deleted run leaves the aggregates
+    client.delete(f"/api/consultations/{consultation['id']}")
+    after = client.get("/api/traces/aggregates", headers=operator).json()
+    assert after.get("basic", {"runs": 0})["runs"] == aggregates["basic"]["runs"] - 1
+
+
+def test_idempotent_retry_does_not_run_again(client, replay):
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/api/consultations", json=CONSULTATION_REQUEST, headers=headers)
+    # The cassette holds one run; a second run would find nothing to replay
+    retry = client.post("/api/consultations", json=CONSULTATION_REQUEST, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    changed = client.post("/api/consultations", json={**CONSULTATION_REQUEST, "team_size": 5}, headers=headers)
+    assert changed.status_code == 422
+
+
+def test_free_quota_is_enforced_before_any_llm_call(client, replay):
+    assert client.post("/api/consultations", json=CONSULTATION_REQUEST).status_code == 200
+    second = client.post("/api/consultations", json=CONSULTATION_REQUEST)
+    assert second.status_code == 403
+    assert client.get("/api/user").json()["consultations_used"] == 1
+
+
+def test_delete_cancels_a_running_consultation(client):
+    from app.api.main import jobs
+
+    # Recorded latencies make the run take a few seconds
+    with use_cassette(cassette_path("basic"), "replay", latency_scale=1.0):
+        result = {}
+        worker = threading.Thread(
+            target=lambda: result.setdefault("response", client.post("/api/consultations", json=CONSULTATION_REQUEST)),
+        )
+        worker.start()
+        running = job = None
+        for _ in range(100):
+            running = next((c for c in client.get("/api/consultations").json() if c["status"] == "processing"), None)
+            job = jobs.get(running["id"]) if running else None
+            # The record exists before the graph starts; wait until it is inside the first LLM call
+            if job is not None and job.state is not None:
+                break
+            time.sleep(0.05)
+        assert job is not None and job.state is not None
+        time.sleep(0.2)
+
+        deleted = client.delete(f"/api/consultations/{running['id']}")
+        worker.join(timeout=10)
+
+    assert deleted.status_code == 202
+    assert result["response"].status_code == 409
+    cancelled = client.get(f"/api/consultations/{running['id']}").json()
+    assert cancelled["status"] == "cancelled"
+    assert cancelled["trace"]["llm_calls"][-1]["status"] == "cancelled"
+    # Nothing was charged for the cancelled run
+    assert client.get("/api/user").json()["consultations_used"] == 0
+
+
+@pytest.mark.parametrize("replay", ["premium"], indirect=True)
+def test_paid_plan_runs_more_rounds(client, replay):
+    client.post("/api/billing/upgrade", json={"plan": "pro"})
+    consultation = client.post("/api/consultations", json=CONSULTATION_REQUEST).json()
+    assert consultation["plan_used"] == "premium"
+    assert consultation["refinement_count"] == 2
+    assert replay.unused == 0
@@ -0,0 +1,88 @@
+import json
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agents.base_agent import BaseAgent
+from src.utils.cancellation import CancelToken, OperationCancelled, cancel_scope
+from src.utils.cassettes import CassetteMiss, use_cassette
+
+
+class EchoAgent(BaseAgent):
+    def run(self, state):
+        raise NotImplementedError
+
+
+class ExplodingModel(GenericFakeChatModel):
+    def _generate(self, *args, **kwargs):
+        raise AssertionError("replay must not reach the model")
+
+
+def make_agent(*replies: str, name: str = "Echo") -> EchoAgent:
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=r) for r in replies]))
+    return EchoAgent(name, "You are a test agent.", llm=model)
+
+
+def exploding_agent(name: str = "Echo") -> EchoAgent:
+    return EchoAgent(name, "You are a test agent.", llm=ExplodingModel(messages=iter([])))
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "echo.json")
+    with use_cassette(path, "record") as cassette:
+        agent = make_agent("first answer", "second answer")
+        assert agent.invoke("question one") == "first answer"
+        assert agent.invoke("question two") == "second answer"
+    assert len(cassette.interactions) == 2
+
+    with use_cassette(path, "replay", strict=True) as cassette:
+        agent = exploding_agent()
+        # Matched by request, not by order
+        assert agent.invoke("question two") == "second answer"
+        assert agent.invoke("question one") == "first answer"
+        assert cassette.unused == 0
+
+
+def test_changed_prompt_falls_back_to_call_order(tmp_path):
+    path = str(tmp_path / "echo.json")
+    with use_cassette(path, "record"):
+        make_agent("recorded").invoke("original prompt")
+
+    with use_cassette(path, "replay"):
+        assert exploding_agent().invoke("edited prompt") == "recorded"
+
+    with use_cassette(path, "replay", strict=True):
+        with pytest.raises(CassetteMiss):
+            exploding_agent().invoke("edited prompt")
+
+
+def test_replay_only_serves_the_same_agent(tmp_path):
+    path = str(tmp_path / "echo.json")
+    with use_cassette(path, "record"):
+        make_agent("from echo").invoke("hello")
+
+    with use_cassette(path, "replay"):
+        with pytest.raises(CassetteMiss):
+            exploding_agent(name="Other").invoke("hello")
+
+
+def test_replay_latency_and_cancellation(tmp_path):
+    path = tmp_path / "echo.json"
+    with use_cassette(str(path), "record"):
+        make_agent("slow answer").invoke("hello")
+    data = json.loads(path.read_text())
+    data["interactions"][0]["latency_s"] = 0.2
+    path.write_text(json.dumps(data))
+
+    with use_cassette(str(path), "replay", latency_scale=1.0):
+        started = time.perf_counter()
+        assert exploding_agent().invoke("hello") == "slow answer"
+        assert time.perf_counter() - started >= 0.2
+
+    token = CancelToken()
+    token.cancel("test")
+    with use_cassette(str(path), "replay"), cancel_scope(token):
+        with pytest.raises(OperationCancelled):
+            exploding_agent().invoke("hello")
@@ -0,0 +1,53 @@
+"""Dashboard aggregates: incremental counters, and the API route against a full listing."""
+from app.api.dashboard import DashboardStats
+from tests.scenarios import CONSULTATION_REQUEST
+
+
+def test_counters_follow_state_changes():
+    stats = DashboardStats(activity_limit=3)
+    a = {"id": "c-1", "user_id": "u-1", "status": "processing", "business_name": "A"}
+    b = {"id": "c-2", "user_id": "u-1", "status": "processing", "business_name": "B"}
+    stats.track(a, "created")
+    stats.track(b, "created")
+    a.update(status="completed", processing_time=30)
+    stats.track(a, "completed")
+    b.update(status="completed", processing_time=50, feedback={"rating": 4})
+    stats.track(b, "completed")
+    stats.track(b)  # nothing changed: no double counting
+
+    summary = stats.summary("u-1")
+    assert summary["consultations"] == {
+        "total": 2, "by_status": {"processing": 0, "completed": 2, "failed": 0, "cancelled": 0},
+    }
+    assert summary["processing_time"] == {"completed": 2, "average_seconds": 40.0}
+    assert summary["ratings"]["distribution"]["4"] == 1 and summary["ratings"]["average"] == 4.0
+    assert [e["type"] for e in summary["recent_activity"]] == ["completed", "completed", "created"]  # bounded, newest first
+    assert stats.recent_ids("u-1", 5) == ["c-2", "c-1"]
+
+    stats.forget("c-2")
+    summary = stats.summary("u-1")
+    assert summary["consultations"]["total"] == 1 and summary["ratings"]["count"] == 0
+    assert summary["processing_time"]["average_seconds"] == 30.0
+    assert all(e["consultation_id"] == "c-1" for e in summary["recent_activity"])
+    assert stats.summary("u-2")["consultations"]["total"] == 0
+
+
+def test_dashboard_route_matches_the_listing(client, replay):
+    consultation = client.post("/api/consultations", json=CONSULTATION_REQUEST).json()
+    client.post(f"/api/consultations/{consultation['id']}/feedback", json={"rating": 5, "comment": "Great"})
+
+    stats = client.get("/api/dashboard/stats").json()
+    listing = client.get("/api/consultations").json()
+    assert stats["consultations"]["total"] == len(listing) == 1
+    assert stats["consultations"]["by_status"]["completed"] == 1
+    assert stats["ratings"]["distribution"]["5"] == 1
+    assert stats["usage"] == {"plan": "free", "used": 1, "limit": 1, "remaining": 0}
+    assert [e["type"] for e in stats["recent_activity"]] == ["feedback", "completed", "created"]
+    card = stats["recent_consultations"][0]
+    assert card["id"] == consultation["id"] and card["business"]["main_goal"] == CONSULTATION_REQUEST["main_goal"]
+    assert "refined_strategy" not in card and "trace" not in card
+
+    client.delete(f"/api/consultations/{consultation['id']}")
+    stats = client.get("/api/dashboard/stats").json()
+    assert stats["consultations"]["total"] == 0 and stats["recent_consultations"] == []
+    assert stats["ratings"]["count"] == 0
@@ -0,0 +1,41 @@
+"""Bulk export: a failed PDF render still leaves a valid, resumable ZIP."""
+import io
+import json
+import zipfile
+
+from src.utils.ids import new_ulid
+from tests.test_records import consultation
+
+
+def test_zip_stops_cleanly_at_a_failed_render(client, monkeypatch):
+    from app.api import main
+
+    user_id = client.get("/api/user").json()["id"]
+    ids = [f"c-{new_ulid()}" for _ in range(3)]
+    for cid in ids:
+        main.consultations_store.add(consultation(cid, user_id=user_id))
+
+    async def get(record):
+        if record["id"] == ids[1]:
+            raise RuntimeError("render worker crashed")
+        return await _pdf(record)
+
+    monkeypatch.setattr(main.pdf_renderer, "get", get)
+    response = client.get("/api/consultations/export?format=zip")
+    assert response.status_code == 200 and response.headers["X-Export-Count"] == "3"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert archive.namelist() == [f"consultation-{ids[0]}.pdf", "export-incomplete.json"]
+    note = json.loads(archive.read("export-incomplete.json"))
+    assert note["failed_id"] == ids[1] and note["resume_after"] == ids[0]
+    assert "render worker crashed" in note["error"]
+
+    # Resuming from the note's cursor picks up at the failed entry
+    monkeypatch.setattr(main.pdf_renderer, "get", _pdf)
+    resumed = client.get(f"/api/consultations/export?format=zip&after={note['resume_after']}")
+    assert zipfile.ZipFile(io.BytesIO(resumed.content)).namelist() == [f"consultation-{cid}.pdf" for cid in ids[1:]]
+
+
+async def _pdf(record):
+    return "key", b"%PDF-1.4 " + record["id"].encode()
@@ -0,0 +1,96 @@
+"""Figure sandbox: allow-list validation, and the worker's OS-level isolation."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.utils.figure_sandbox import FigureRenderer, UnsafeCodeError, validate_code
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLAN_CHART = """
+import plotly.graph_objects as go
+months = ["M1", "M2", "M3"]
+revenue = [2500, 2800, 3300]
+expenses = [3200, 3100, 3000]
+fig = go.Figure()
+fig.add_trace(go.Bar(x=months, y=revenue, name="Revenue"))
+fig.add_trace(go.Scatter(x=months, y=expenses, name="Expenses", mode="lines+markers"))
+fig.update_layout(title="Path to break-even (USD / month)", barmode="group")
+"""
+
+
+@pytest.mark.parametrize("code", [
+    'import numpy as np\nnp.ctypeslib.ctypes.CDLL(None)["system"](b"exit 7")',
+    'import numpy as np\nlib = np.ctypeslib\n',
+    'import pandas as pd\npd.read_xml("http://example.com/x.xml")',
+    'import pandas as pd\npd.read_stata("/etc/passwd")',
+    'import pandas as pd\npd.read_feather("/tmp/x")',
+    'import pandas as pd\npd.read_hdf("/tmp/x")',
+    'import pandas as pd\npd.read_clipboard()',
+    'import pandas as pd\npd.io.common.get_handle("/etc/passwd", "r")',
+    'import pandas as pd\npd.DataFrame({"a": [1]}).to_csv("/tmp/x.csv")',
+    'from pandas import read_csv',
+    'import plotly.io as pio',
+    'import plotly.express as px\npx.line(x=[1], y=[2])["data"]',
+    'import numpy as np\nnp["ctypeslib"]',
+    'x = "{0.__class__}".format(1)',
+])
+def test_rejects_escapes(code):
+    with pytest.raises(UnsafeCodeError):
+        validate_code(code)
+
+
+def test_accepts_plan_charts_and_data_subscripts():
+    validate_code(PLAN_CHART)
+    validate_code(
+        "import pandas as pd\nimport plotly.express as px\n"
+        'df = pd.DataFrame({"month": [1, 2], "revenue": [3, 4]})\n'
+        'df["cumulative"] = df["revenue"].cumsum()\n'
+        'totals = {"a": 1}["a"] + pd.Series({"b": 2})["b"] + df.loc[0, "revenue"]\n'
+        'fig = px.line(df, x="month", y=["revenue", "cumulative"])\n'
+    )
+
+
+def test_renders_in_worker():
+    renderer = FigureRenderer(workers=1)
+    try:
+        assert '"Revenue"' in renderer.render(PLAN_CHART)
+    finally:
+        renderer.shutdown()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="namespaces are Linux-only")
+def test_worker_has_no_network_or_writable_filesystem(tmp_path):
+    # Bypasses validation on purpose: this is the layer that holds if validation is ever escaped
+    probe = f"""
+import os, socket, sys
+sys.path.insert(0, {ROOT!r})
+from src.utils import figure_worker
+if not figure_worker._isolate():
+    print("unsupported"); sys.exit()
+try:
+    socket.create_connection(("1.1.1.1", 80), timeout=2)
+    print("network")
+except OSError:
+    pass
+try:
+    open({str(tmp_path / "escape")!r}, "w")
+    print("writable")
+except OSError:
+    pass
+figure_worker._install_audit_hook([sys.prefix])
+for attempt in (lambda: __import__("ctypes").CDLL(None), lambda: os.system("true"), lambda: open("/etc/hostname")):
+    try:
+        attempt()
+        print("allowed")
+    except RuntimeError:
+        pass
+print("done")
+"""
+    out = subprocess.run([sys.executable, "-I", "-c", probe], capture_output=True, text=True, timeout=60).stdout
+    if out.strip() == "unsupported":
+        pytest.skip("unprivileged namespaces unavailable")
+    assert out.strip() == "done"
+    assert not (tmp_path / "escape").exists()
@@ -0,0 +1,92 @@
+"""Goal-seek solver: answers checked against a month-by-month forward run, and the planning route."""
+import numpy as np
+import pytest
+
+from src.tools.goal_seek import solve, solve_grid
+
+REVENUE, EXPENSES = 2500.0, 3200.0
+
+
+def forward(start_revenue, growth, expense_cut, months):
+    """Month-by-month revenue and expenses, as the simulator's median path."""
+    m = np.arange(months)
+    revenue = start_revenue * (1 + growth) ** m
+    expenses = EXPENSES * (1 - expense_cut * m / max(months - 1, 1))
+    return revenue, expenses
+
+
+@pytest.mark.parametrize("goal", ["break_even", "cumulative_break_even"])
+@pytest.mark.parametrize("months", [2, 6, 12, 36])
+def test_solutions_meet_the_goal_exactly(goal, months):
+    def gap(start_revenue, growth, expense_cut):
+        revenue, expenses = forward(start_revenue, growth, expense_cut, months)
+        net = revenue - expenses
+        return net[-1] if goal == "break_even" else net.sum()
+
+    # Each answer closes the gap to within a cent
+    growth = solve(goal, "growth", months, REVENUE, EXPENSES, expense_cut=0.1)
+    assert gap(REVENUE, growth, 0.1) == pytest.approx(0, abs=0.01)
+    start = solve(goal, "start_revenue", months, REVENUE, EXPENSES, growth=0.02, expense_cut=0.1)
+    assert gap(start, 0.02, 0.1) == pytest.approx(0, abs=0.01)
+    cut = solve(goal, "expense_cut", months, REVENUE, EXPENSES, growth=0.01)
+    if cut > 0:
+        assert gap(REVENUE, 0.01, cut) == pytest.approx(0, abs=0.01)
+    else:
+        assert gap(REVENUE, 0.01, 0.0) >= 0
+
+
+def test_edge_cases():
+    # Already profitable: nothing needed; out of reach: NaN
+    assert solve("break_even", "growth", 6, 4000, EXPENSES) == 0
+    assert np.isnan(solve("break_even", "growth", 2, 100, EXPENSES, max_growth=0.5))
+    assert np.isnan(solve("break_even", "expense_cut", 6, 100, EXPENSES))
+    assert solve("target_revenue", "growth", 13, 1000, target_revenue=2000) == pytest.approx(2 ** (1 / 12) - 1)
+    with pytest.raises(ValueError):
+        solve("target_revenue", "expense_cut", 6, 1000, target_revenue=2000)
+
+
+def test_grid_matches_pointwise_solves():
+    horizons = np.arange(1, 201)
+    cuts = np.linspace(0, 0.9, 200)
+    grid = solve_grid("cumulative_break_even", "growth", horizons, "expense_cut", cuts,
+                      {"start_revenue": REVENUE}, EXPENSES)
+    assert grid.shape == (200, 200)
+    for i, j in [(0, 5), (57, 11), (199, 199)]:
+        expected = solve("cumulative_break_even", "growth", horizons[j], REVENUE, EXPENSES, expense_cut=cuts[i])
+        np.testing.assert_allclose(grid[i, j], expected, equal_nan=True)
+
+
+def test_planning_route(client):
+    body = {"monthly_revenue_usd": REVENUE, "monthly_expenses_usd": EXPENSES, "horizon_max": 12, "axis_steps": 5}
+    result = client.post("/api/planning/solve", json=body).json()
+    assert result["axis"]["name"] == "expense_cut" and len(result["axis"]["values"]) == 5
+    assert result["horizons"] == list(range(2, 13))
+    assert len(result["values"]) == 5 and len(result["values"][0]) == 11
+    # More cut, less growth needed; a longer horizon, less growth per month
+    assert result["values"][0][-1] > result["values"][-1][-1]
+    assert result["values"][0][1] > result["values"][0][-1]
+
+    target = client.post("/api/planning/solve", json={
+        "goal": "target_revenue", "monthly_revenue_usd": 1000, "target_revenue_usd": 2000,
+        "solve_for": "start_revenue", "horizon_min": 1, "horizon_max": 1, "axis_steps": 1,
+    }).json()
+    assert target["values"] == [[2000.0]]
+
+    too_big = client.post("/api/planning/solve", json={**body, "axis_steps": 1000})
+    assert too_big.status_code == 400
+    no_target = client.post("/api/planning/solve", json={**body, "goal": "target_revenue"})
+    assert no_target.status_code == 400
+
+
+def test_planning_route_rejects_axis_outside_lever_bounds(client):
+    body = {"monthly_revenue_usd": REVENUE, "monthly_expenses_usd": EXPENSES, "horizon_max": 12, "axis_steps": 5}
+    # growth -100% would need infinite starting revenue; a cut above 90% is not a valid lever value
+    for axis in ({"solve_for": "start_revenue", "axis": "growth", "axis_min": -1, "axis_max": 0.1},
+                 {"axis": "expense_cut", "axis_max": 3}):
+        assert client.post("/api/planning/solve", json={**body, **axis}).status_code == 400
+
+    edge = client.post("/api/planning/solve", json={
+        **body, "solve_for": "start_revenue", "axis": "growth", "axis_min": -0.5, "axis_max": 1.0,
+    })
+    assert edge.status_code == 200
+    assert all(v is None or v >= 0 for row in edge.json()["values"] for v in row)
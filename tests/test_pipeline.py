@@ -0,0 +1,59 @@
+"""The full get_graph() pipeline, replayed from cassettes."""
+import statistics
+import time
+
+import pytest
+
+from src.utils.cassettes import use_cassette
+from src.utils.tracing import RunTrace, trace_scope
+from tests.scenarios import SCENARIOS, cassette_path, run_pipeline
+
+# Refine rounds each recorded run went through
+EXPECTED_ROUNDS = {"basic": 1, "premium": 2}
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_pipeline_replays_exactly(name):
+    with use_cassette(cassette_path(name), "replay", strict=True) as cassette:
+        trace = RunTrace()
+        with trace_scope(trace):
+            state = run_pipeline(SCENARIOS[name])
+
+    assert cassette.unused == 0
+    assert state["current_refinement_round"] == EXPECTED_ROUNDS[name]
+    assert state["refined_plan"] is not None
+    assert state["critique_score"] is not None
+    assert "go.Figure" in state["visualization_code"]
+
+    recorded = trace.to_dict()
+    assert recorded["totals"]["llm_calls"] == len(cassette.interactions)
+    assert [span["node"] for span in recorded["nodes"]][:3] == ["generate", "critique", "refine"]
+    assert recorded["nodes"][-1]["node"] == "visualize"
+
+
+def test_premium_patch_round_edits_the_plan():
+    with use_cassette(cassette_path("premium"), "replay", strict=True):
+        state = run_pipeline(SCENARIOS["premium"])
+    levers = {item.id: item.title for item in state["refined_plan"].financial_levers}
+    assert "two 4% steps" in levers["F2"]
+    # Items the critic did not question are carried over untouched
+    assert [a.id for a in state["refined_plan"].short_term_actions] == ["A1", "A2", "A3", "A4"]
+
+
+def test_pipeline_overhead(record_property):
+    """Our own cost per run (state handling, prompts, parsing) with zero-latency replay."""
+    path = cassette_path("premium")
+    with use_cassette(path, "replay"):
+        run_pipeline(SCENARIOS["premium"])  # graph build and imports
+
+    timings = []
+    for _ in range(5):
+        with use_cassette(path, "replay"):
+            started = time.perf_counter()
+            run_pipeline(SCENARIOS["premium"])
+            timings.append((time.perf_counter() - started) * 1000)
+
+    median_ms = statistics.median(timings)
+    record_property("pipeline_overhead_ms", round(median_ms, 1))
+    # Seven LLM calls replayed instantly: everything left is our code
+    assert median_ms < 1000
@@ -0,0 +1,56 @@
+"""Prompt assembly: compact business context and per-agent input budgets."""
+from src.schemas.business import BusinessInfo
+from src.utils.prompts import Section, business_context, fit_sections
+from src.utils.tokens import estimate_tokens
+from tests.scenarios import business_info
+
+
+def test_business_context_is_smaller_than_json_and_skips_unknowns():
+    business = business_info()
+    context = business_context(business)
+    assert "Team size: 4" in context
+    assert "Main goal: Reach break-even point within next 6 months" in context
+    assert estimate_tokens(context) < estimate_tokens(business.model_dump_json(indent=2)) * 0.75
+
+    sparse = business_context(BusinessInfo(business_type="bakery", business_stage="idea", main_goal="Open"))
+    assert sparse == "Business: bakery (idea)\nMain goal: Open"
+
+
+def test_fit_sections_trims_lowest_priority_first_and_keeps_required():
+    required = Section("Plan", "A1: keep this line " * 20)
+    notes = Section("Notes", "filler words " * 400, min_tokens=50, priority=0)
+    history = Section("History", "earlier advice " * 100, min_tokens=100, priority=1)
+
+    prompt = fit_sections([required, notes, history], budget=600)
+    assert estimate_tokens(prompt) <= 600
+    assert required.body in prompt
+    assert "earlier advice " * 100 in prompt  # fitted by trimming the notes alone
+
+    tight = fit_sections([required, notes, history], budget=100)
+    assert required.body in tight  # over budget is logged, never cut from required sections
+    assert fit_sections([Section("Empty", ""), required], budget=None) == required.render()
+
+
+def test_plans_under_review_are_never_trimmed(monkeypatch):
+    import src.agents.base_agent as base_agent
+    from src.agents.critic import CritiqueAgent
+    from src.agents.refiner import RefinerAgent
+
+    monkeypatch.setattr(base_agent, "get_llm", lambda **kwargs: None)
+    plan = "\n".join(f"A{i}: action item number {i} with enough words to matter" for i in range(200))
+    state = {
+        "generated_recommendations": plan,
+        "current_strategy": plan,
+        "critique": "Too vague.",
+        "messages": [],
+        "prompt_context": {"business": "Business: cafe", "financials": "Runway: 4 months",
+                           "references": "benchmark note " * 300},
+    }
+    for agent in (CritiqueAgent(), RefinerAgent()):
+        prompts = []
+        monkeypatch.setattr(agent, "invoke_structured", lambda prompt, schema: prompts.append(prompt))
+        monkeypatch.setattr(agent, "invoke", lambda prompt: "Score: 5/10")
+        agent.run(state)
+        assert plan in prompts[0], agent.name
+    # The refiner gives up its reference notes instead
+    assert "benchmark note " * 300 not in prompts[0]
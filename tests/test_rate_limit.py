@@ -0,0 +1,77 @@
+"""Token-bucket rate limiting in front of the API routes."""
+import pytest
+
+from app.api.rate_limit import Limit, RateLimiter, RateLimitMiddleware, route_class
+
+
+@pytest.fixture
+def limited(api):
+    from app.api.main import rate_limiter
+    rate_limiter.reset()
+    rate_limiter.enabled = True
+    yield rate_limiter
+    rate_limiter.enabled = False
+    rate_limiter.reset()
+
+
+def test_route_classes():
+    assert route_class("POST", "/api/auth/login") == "auth"
+    assert route_class("POST", "/api/consultations") == "consultations"
+    assert route_class("GET", "/api/consultations/c-1/export/pdf") == "export"
+    assert route_class("GET", "/api/consultations/export") == "export"
+    assert route_class("POST", "/api/consultations/c-1/feedback") == "api"
+    assert route_class("GET", "/api/health") is None
+
+
+def test_bucket_refills_and_idle_buckets_are_compacted():
+    limiter = RateLimiter({"api": {"default": "2/10"}})
+    limit = limiter.limit_for("api", "free")
+    assert [limiter.hit("api", "k", limit, now=0.0).allowed for _ in range(3)] == [True, True, False]
+    denied = limiter.hit("api", "k", limit, now=1.0)
+    assert not denied.allowed and denied.retry_after == 4 and denied.remaining == 0
+    assert limiter.hit("api", "k", limit, now=5.0).allowed  # one token back after 5 s
+    assert limiter.compact(now=9.0) == 0
+    assert limiter.compact(now=15.0) == 1 and len(limiter) == 0
+    with pytest.raises(ValueError):
+        Limit.parse("0/60")
+
+
+def test_login_is_throttled_with_rate_limit_headers(api, limited):
+    body = {"email": "nobody@example.com", "password": "wrong"}
+    allowed = limited.limit_for("auth", "anonymous").requests
+    responses = [api.post("/api/auth/login", json=body) for _ in range(allowed + 1)]
+    assert all(r.status_code == 401 for r in responses[:-1])
+    assert responses[0].headers["RateLimit-Limit"] == str(allowed)
+    assert int(responses[-2].headers["RateLimit-Remaining"]) == 0
+
+    throttled = responses[-1]
+    assert throttled.status_code == 429
+    assert int(throttled.headers["Retry-After"]) >= 1
+    assert throttled.headers["RateLimit-Policy"].startswith(f"{allowed};w=")
+
+
+def test_signed_in_users_are_limited_by_their_tier(client, limited):
+    # Invalid bodies: rejected cheaply by validation, but still charged to the user's bucket
+    allowed = limited.limit_for("consultations", "free").requests
+    statuses = [client.post("/api/consultations", json={}).status_code for _ in range(allowed + 1)]
+    assert statuses == [422] * allowed + [429]
+    # Other route classes have their own buckets
+    assert client.get("/api/user").status_code == 200
+
+
+def test_spoofed_forwarded_for_does_not_pick_the_bucket():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    inner = FastAPI()
+    inner.post("/api/auth/login")(lambda: {"ok": True})
+    limiter = RateLimiter({"auth": {"default": "3/60"}})
+    guarded = TestClient(RateLimitMiddleware(inner, limiter, identify=lambda s: None, trust_forwarded=True))
+    # The proxy appends the real peer (10.0.0.7) to whatever the client sent
+    statuses = [
+        guarded.post("/api/auth/login", headers={"X-Forwarded-For": f"198.51.100.{i}, 10.0.0.7"}).status_code
+        for i in range(4)
+    ]
+    assert statuses == [200, 200, 200, 429]
+    # Fewer entries than trusted proxies: the peer address is used
+    assert guarded.post("/api/auth/login").status_code == 200
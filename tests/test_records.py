@@ -0,0 +1,87 @@
+"""Compact consultation records: packed fields, mapping behaviour, spill to disk."""
+import os
+
+import pytest
+
+from app.api.records import ConsultationStore
+
+
+def consultation(cid: str = "c-1", **overrides) -> dict:
+    data = {
+        "id": cid,
+        "user_id": "u-1",
+        "status": "completed",
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-01T00:00:00Z",
+        "business": {"business_type": "cafe", "business_stage": "startup", "main_goal": "Break even", "other_goals": []},
+        "plan_used": "basic",
+        "refined_strategy": "## Short-term actions\n" + "- Launch a loyalty card for regulars\n" * 200,
+        "visualization_code": "import plotly.express as px\nfig = px.line(x=[1, 2], y=[3, 4])\n",
+        "refinement_count": 1,
+        "strategy_sections": {"summary": "Grow", "short_term_actions": [{"id": "A1", "title": "Loyalty"}] * 30},
+        "critique_score": 7,
+        "business_name": None,
+        "feedback": None,
+        "trace": {"total_ms": 12.5, "llm_calls": [{"agent": "Critic", "input_tokens": 800}] * 7},
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConsultationStore(spill_dir=str(tmp_path), cold_after_seconds=60, segment_max_bytes=4096)
+    yield store
+    store.close()
+
+
+def test_record_reads_and_writes_like_the_dict(store):
+    data = consultation()
+    record = store.add(data)
+    assert record.to_dict() == data
+    assert list(record) == list(data)
+    assert dict(record) == data
+    assert record.get("cancel_reason") is None and "cancel_reason" not in record
+
+    record.update({"status": "cancelled", "cancel_reason": "deleted_by_user", "extra": [1]})
+    assert record["status"] == "cancelled" and record["extra"] == [1]
+    assert list(record)[-2:] == ["cancel_reason", "extra"]
+    # Large text is stored compressed
+    assert record.packed_bytes() < len(data["refined_strategy"]) / 5
+
+
+def test_idle_records_spill_to_disk_and_load_back(store, tmp_path):
+    records = [store.add(consultation(f"c-{i}")) for i in range(5)]
+    store.add(consultation("c-running", status="processing"))
+    assert store.spill_cold(now=records[-1].touched + 61) == 5
+    stats = store.stats()
+    assert stats["cold"] == 5 and stats["segment_bytes"] > 0
+    assert os.listdir(tmp_path)
+
+    # Listing reads a cold record without loading it back
+    cold = store.peek("c-0")
+    assert cold.to_dict() == consultation("c-0")
+    assert store.stats()["cold"] == 5
+
+    # get() counts as an access; writing a packed field also loads it
+    assert store.get("c-1")["refined_strategy"] == consultation()["refined_strategy"]
+    store.peek("c-2")["trace"] = {"total_ms": 1}
+    assert store.stats()["cold"] == 3
+    assert store.peek("c-2")["business"]["business_type"] == "cafe"
+
+    for cid in ("c-0", "c-3", "c-4"):
+        del store[cid]
+    stats = store.stats()
+    assert stats["cold"] == 0 and stats["segment_bytes"] == 0
+    assert len(os.listdir(tmp_path)) <= 1  # only the segment still being appended to
+
+
+def test_discarded_cold_record_stays_readable_for_holders(store):
+    record = store.add(consultation())
+    assert store.spill_cold(now=record.touched + 61) == 1
+    # An export peeks the record, then awaits its PDF while the consultation is deleted
+    held = store.peek("c-1")
+    del store["c-1"]
+    assert held["refined_strategy"] == consultation()["refined_strategy"]
+    assert held.to_dict() == consultation()
+    assert store.stats()["segment_bytes"] == 0
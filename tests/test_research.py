@@ -0,0 +1,27 @@
+"""Industry research index: incremental builds score like a clean rebuild."""
+import pytest
+
+from src.tools.simple_research import ResearchIndex, build_index
+
+
+def test_incremental_build_scores_match_full_rebuild(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "cafe.md").write_text("# Cafes\n\nCafe gross margin is about 65 percent on coffee drinks.\n")
+    (corpus / "bakery.md").write_text("# Bakeries\n\n" + "Bakery flour costs and bread margin vary by season. " * 30)
+    (corpus / "salon.md").write_text("# Salons\n\nSalon rent is the largest fixed cost; margin depends on chairs.\n")
+    build_index(str(corpus), str(tmp_path / "incremental"))
+    # Change one file and delete another: their old passages stay in the first segment, masked
+    (corpus / "bakery.md").write_text("# Bakeries\n\nBakery margin is thin.\n")
+    (corpus / "salon.md").unlink()
+    stats = build_index(str(corpus), str(tmp_path / "incremental"))
+    assert stats["segments"] == 2
+    build_index(str(corpus), str(tmp_path / "full"), full=True)
+
+    incremental = ResearchIndex.open(str(tmp_path / "incremental"))
+    full = ResearchIndex.open(str(tmp_path / "full"))
+    for query in ("margin", "cafe coffee margin", "bakery"):
+        got = [(p.source, p.score) for p in incremental.search(query, k=5)]
+        expected = [(p.source, p.score) for p in full.search(query, k=5)]
+        assert [s for s, _ in got] == [s for s, _ in expected]
+        assert [v for _, v in got] == pytest.approx([v for _, v in expected], abs=1e-3)
@@ -0,0 +1,70 @@
+"""Consultation search: inverted index ranking, prefixes, upkeep, and the API route."""
+from app.api.search import ConsultationSearchIndex
+from tests.scenarios import CONSULTATION_REQUEST
+
+
+def doc(cid: str, user_id: str = "u-1", name=None, business_type="cafe", goal="", strategy="", industry=None) -> dict:
+    return {
+        "id": cid,
+        "user_id": user_id,
+        "business_name": name,
+        "industry": industry,
+        "business": {"business_type": business_type, "main_goal": goal},
+        "refined_strategy": strategy,
+    }
+
+
+def test_ranking_prefixes_and_per_user_isolation():
+    index = ConsultationSearchIndex()
+    index.add(doc("c-1", name="Bean There", strategy="Open a coffee cart at the market."))
+    index.add(doc("c-2", business_type="coffee roastery", goal="Wholesale coffee contracts"))
+    index.add(doc("c-3", business_type="bakery", strategy="Sell sourdough loaves."))
+    index.add(doc("c-4", user_id="u-2", business_type="coffee shop"))
+
+    # Type and goal fields weigh more than one mention in the strategy
+    assert [cid for cid, _ in index.search("u-1", "coffee")] == ["c-2", "c-1"]
+    # "coff" expands to coffee; "sour" to sourdough
+    assert [cid for cid, _ in index.search("u-1", "coff")] == ["c-2", "c-1"]
+    assert [cid for cid, _ in index.search("u-1", "sour")] == ["c-3"]
+    # OR semantics: a consultation matching more query words ranks first
+    assert index.search("u-1", "coffee market")[0][0] == "c-1"
+    # Other users' consultations are never returned; stopwords alone match nothing
+    assert [cid for cid, _ in index.search("u-2", "coffee")] == ["c-4"]
+    assert index.search("u-1", "the and") == []
+    assert index.search("u-3", "coffee") == []
+
+
+def test_reindex_and_remove_keep_postings_exact():
+    index = ConsultationSearchIndex()
+    index.add(doc("c-1", strategy="loyalty card"))
+    index.add(doc("c-1", strategy="delivery partners"))  # edited / completed: replaces the old text
+    assert index.search("u-1", "loyalty") == []
+    assert [cid for cid, _ in index.search("u-1", "deliv")] == ["c-1"]
+
+    index.add(doc("c-2", strategy="delivery"))
+    index.remove("c-1")
+    assert [cid for cid, _ in index.search("u-1", "delivery")] == ["c-2"]
+    assert index.stats("u-1") == {"consultations": 1, "terms": 2, "postings": 2}  # cafe, delivery
+    index.remove("c-2")
+    index.remove("c-2")
+    assert index.stats() == {"consultations": 0, "terms": 0, "postings": 0}
+
+
+def test_search_route(client, replay):
+    consultation = client.post(
+        "/api/consultations", json={**CONSULTATION_REQUEST, "business_name": "Lion Rock Roasters"}
+    ).json()
+
+    found = client.get("/api/consultations/search", params={"q": "lion roast"}).json()
+    assert found["count"] == 1
+    result = found["results"][0]
+    assert result["id"] == consultation["id"] and result["business_name"] == "Lion Rock Roasters"
+    assert result["business_type"] == CONSULTATION_REQUEST["business_type"] and result["score"] > 0
+
+    client.patch(f"/api/consultations/{consultation['id']}", json={"business_name": "Sigiriya Beans"})
+    assert client.get("/api/consultations/search", params={"q": "lion"}).json()["count"] == 0
+    assert client.get("/api/consultations/search", params={"q": "sigiriya"}).json()["count"] == 1
+
+    client.delete(f"/api/consultations/{consultation['id']}")
+    assert client.get("/api/consultations/search", params={"q": "sigiriya"}).json()["count"] == 0
+    assert client.get("/api/consultations/search", params={"q": ""}).status_code == 422
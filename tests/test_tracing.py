@@ -0,0 +1,30 @@
+"""Incremental trace aggregates."""
+from src.utils.tracing import TraceAggregates
+
+
+def trace(total_ms, nodes):
+    spans, at = [], 0.0
+    for node, ms in nodes:
+        spans.append({"node": node, "start_ms": at, "end_ms": at + ms})
+        at += ms
+    totals = {"llm_calls": len(nodes), "input_tokens": 1000, "output_tokens": 200, "retries": 0}
+    return {"total_ms": total_ms, "nodes": spans, "totals": totals}
+
+
+def test_nodes_are_averaged_over_the_runs_that_reach_them():
+    aggregates = TraceAggregates()
+    aggregates.add("c-1", "basic", trace(100, [("generate", 40), ("critique", 20)]))
+    aggregates.add("c-2", "basic", trace(300, [("generate", 60), ("critique", 20), ("refine", 90), ("refine", 30)]))
+
+    summary = aggregates.summary("basic", input_price_per_mtok=1.0)
+    assert summary["runs"] == 2 and summary["duration_ms"]["max"] == 300
+    assert summary["nodes"]["generate"] == {"runs": 2, "ms_per_run": 50.0}
+    # Only the second run was refined (twice): not averaged down by the first
+    assert summary["nodes"]["refine"] == {"runs": 1, "ms_per_run": 120.0}
+    assert summary["cost_usd_per_run"] == 0.001
+
+    aggregates.remove("c-2")
+    summary = aggregates.summary("basic")
+    assert "refine" not in summary["nodes"] and summary["duration_ms"]["p95"] == 100
+    aggregates.remove("c-1")
+    assert aggregates.summaries() == {} and aggregates.summary("basic") == {"runs": 0}